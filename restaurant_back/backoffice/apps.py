@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class BackofficeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backoffice'
+
+    def ready(self):
+        # Enregistrement des signaux (calendrier d'ouverture, ...)
+        from backoffice import signals  # noqa: F401
+
+        # Métriques : comptage des requêtes SQL sur chaque connexion ouverte
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+        from backoffice import metrics
+        if settings.METRICS_ENABLED:
+            connection_created.connect(metrics.install_query_wrapper, dispatch_uid='backoffice_metrics_query_wrapper')
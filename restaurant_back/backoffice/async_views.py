@@ -0,0 +1,152 @@
+# backoffice/async_views.py
+
+import json
+import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.middleware.csrf import get_token
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import exceptions
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from backoffice.authentication import CachedJWTAuthentication
+from backoffice.models import PasswordResetToken
+from backoffice.password_reset import aconsume_token, create_reset_request, valid_tokens
+from backoffice.throttling import PasswordResetRateThrottle
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+def select_view(sync_view, async_view):
+    """Vue async si ASYNC_VIEWS (serveur ASGI), sinon la vue DRF synchrone équivalente."""
+    return async_view if settings.ASYNC_VIEWS else sync_view
+
+
+def parse_body(request):
+    """Corps JSON ou formulaire, comme request.data de DRF pour ces vues."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+def check_throttle(throttle_class, request, data):
+    """Même limitation que `throttle_class` sur la vue DRF équivalente. Retourne la réponse 429 ou None."""
+    throttle = throttle_class()
+    if throttle.allow(request, data):
+        return None
+    wait = throttle.wait()
+    response = JsonResponse({'detail': str(exceptions.Throttled(wait).detail)}, status=429)
+    if wait is not None:
+        response['Retry-After'] = str(int(wait))
+    return response
+
+
+# ======================
+# Réinitialisation du mot de passe (async)
+# ======================
+
+@csrf_exempt  # Comme les APIView DRF : authentification JWT, pas de session
+@require_POST
+async def password_reset_request(request):
+    """
+    Version async de PasswordResetRequestView (mêmes réponses).
+
+    - Aucune authentification requise, limitation par IP et par email
+    - L'email part par la file d'envoi : aucun appel SMTP pendant la requête
+    """
+    data = parse_body(request)
+    if data is None:
+        return JsonResponse({'detail': 'JSON invalide.'}, status=400)
+    throttled = await sync_to_async(check_throttle)(PasswordResetRateThrottle, request, data)
+    if throttled is not None:
+        return throttled
+    email = data.get('email')
+
+    # 🔍 Log : Début de la demande
+    logger.info("Demande de réinitialisation du mot de passe reçue", extra={'email': email})
+
+    if not email:
+        logger.warning("Email non fourni dans la demande de réinitialisation")
+        return JsonResponse({'error': 'Email requis'}, status=400)
+
+    try:
+        user = await User.objects.aget(email=email)
+        logger.info(f"Utilisateur trouvé pour l'email {email}", extra={'user_id': user.id})
+    except User.DoesNotExist:
+        # 🚫 Log : Email inconnu
+        logger.warning(f"Aucun utilisateur trouvé pour l'email {email}")
+        return JsonResponse({'message': 'Si cet email existe, un lien a été envoyé'}, status=200)
+
+    # 💾 Token et email en file dans une transaction (non disponible en ORM async : thread dédié)
+    try:
+        await sync_to_async(create_reset_request)(user, email)
+        logger.info(f"Token stocké et e-mail mis en file pour l'utilisateur ID {user.id}")
+        return JsonResponse({'message': 'Un email vous a été envoyé avec un lien de réinitialisation.'}, status=200)
+    except Exception as e:
+        logger.error(f"Échec de la mise en file de l'email pour {email} : {str(e)}", exc_info=True)
+        return JsonResponse({'error': "Une erreur est survenue lors de l'envoi de l'email."}, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def password_reset_confirm(request, user_id, token):
+    """Version async de PasswordResetConfirmView (mêmes réponses), hachage du mot de passe hors boucle d'événements."""
+    data = parse_body(request)
+    if data is None:
+        return JsonResponse({'detail': 'JSON invalide.'}, status=400)
+    new_password = data.get('new_password')
+
+    logger.info(f"Validation du token reçu pour l'utilisateur ID {user_id}", extra={'token': token})
+
+    if not new_password:
+        logger.warning("Mot de passe non fourni dans la validation")
+        return JsonResponse({'error': 'Mot de passe requis'}, status=400)
+
+    try:
+        reset_token = await valid_tokens(user_id, token).aget()
+        await aconsume_token(reset_token, new_password)
+        logger.info(f"Mot de passe mis à jour pour l'utilisateur ID {user_id}")
+        return JsonResponse({'message': 'Votre mot de passe a été mis à jour.'}, status=200)
+    except PasswordResetToken.DoesNotExist:
+        logger.warning(f"Token introuvable ou expiré pour l'utilisateur ID {user_id}", extra={'token': token})
+        return JsonResponse({'error': 'Token invalide ou expiré'}, status=400)
+    except Exception as e:
+        logger.error(f"Erreur lors de la réinitialisation du mot de passe : {str(e)}", exc_info=True)
+        return JsonResponse({'error': 'Une erreur est survenue lors de la mise à jour.'}, status=500)
+
+
+# ======================
+# Vérification admin et CSRF (async)
+# ======================
+
+@require_GET
+async def check_admin(request):
+    """Version async de check_admin : JWT (via le cache des tokens vérifiés) et droits admin."""
+    authentication = CachedJWTAuthentication()
+    try:
+        result = await sync_to_async(authentication.authenticate)(request)
+    except (InvalidToken, exceptions.AuthenticationFailed) as e:
+        response = JsonResponse(e.detail if isinstance(e.detail, dict) else {'detail': e.detail}, status=401)
+        response['WWW-Authenticate'] = authentication.authenticate_header(request)
+        return response
+
+    if result is None:
+        response = JsonResponse({'detail': exceptions.NotAuthenticated.default_detail}, status=401)
+        response['WWW-Authenticate'] = authentication.authenticate_header(request)
+        return response
+    if not result[0].is_staff:
+        return JsonResponse({'detail': exceptions.PermissionDenied.default_detail}, status=403)
+    return JsonResponse({'is_admin': True})
+
+
+async def get_csrf_token(request):
+    """Version async de get_csrf_token (aucun accès à la base)."""
+    return JsonResponse({'csrfToken': get_token(request)})
@@ -0,0 +1,124 @@
+# backoffice/authentication.py
+
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from backoffice.models import CacheVersion
+
+
+def epoch_name(user_id):
+    return f'auth:{user_id}'
+
+
+def new_epoch():
+    return {'etag': uuid.uuid4().hex, 'updated_at': timezone.now()}
+
+
+def get_epoch(user_id):
+    """
+    Époque courante de l'utilisateur, créée au premier appel.
+
+    Lue en base (CacheVersion, une requête sur un index unique) et non dans le cache :
+    le cache par défaut est propre à chaque processus, alors qu'une invalidation
+    doit être vue par tous les workers dès la requête suivante.
+    """
+    name = epoch_name(user_id)
+    epoch = CacheVersion.objects.filter(name=name).values_list('etag', flat=True).first()
+    if epoch is None:
+        version, _ = CacheVersion.objects.get_or_create(name=name, defaults=new_epoch())
+        epoch = version.etag
+    return epoch
+
+
+def invalidate_user(user_id):
+    """
+    Époque supprimée, recréée avec une nouvelle valeur à la lecture suivante : les tokens déjà
+    vérifiés de cet utilisateur repassent par la base, dans tous les processus. Aucune ligne
+    ne reste après la suppression d'un utilisateur.
+    """
+    CacheVersion.objects.filter(name=epoch_name(user_id)).delete()
+
+
+class TokenCache:
+    """
+    LRU en mémoire {token brut: (expiration, utilisateur, token validé, époque)}.
+
+    Propre à chaque processus ; l'époque, elle, est lue en base
+    pour qu'une invalidation soit vue de tous les workers.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            entry = self.entries.get(raw_token)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self.entries[raw_token]
+                return None
+            self.entries.move_to_end(raw_token)
+            return entry
+
+    def set(self, raw_token, expires_at, user, validated_token, epoch):
+        with self.lock:
+            self.entries[raw_token] = (expires_at, user, validated_token, epoch)
+            self.entries.move_to_end(raw_token)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication avec cache des tokens déjà vérifiés (signature et utilisateur).
+
+    - Un token déjà vu est servi sans vérification de signature ni chargement de
+      l'utilisateur : une seule lecture de son époque, sur un index unique
+    - Durée de vie d'une entrée : AUTH_TOKEN_CACHE_TTL, jamais au-delà de l'expiration du token
+    - Invalidation à chaque enregistrement de l'utilisateur (mot de passe, is_staff,
+      is_active, ...) via une époque par utilisateur en base (CacheVersion),
+      vue par tous les workers dès la requête suivante
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return self.authenticate_token(raw_token)
+
+    def authenticate_token(self, raw_token):
+        """(utilisateur, token validé) pour un token brut ; lève InvalidToken / AuthenticationFailed comme le parent."""
+        entry = token_cache.get(raw_token)
+        if entry is not None:
+            _, user, validated_token, epoch = entry
+            if epoch == get_epoch(user.pk):
+                # Copie : la vue peut modifier l'utilisateur sans altérer l'entrée partagée
+                return copy.copy(user), validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        # Époque lue avant l'utilisateur : une modification concurrente invalide l'entrée créée ici
+        epoch = get_epoch(validated_token[jwt_settings.USER_ID_CLAIM])
+        user = self.get_user(validated_token)
+        expires_at = min(validated_token['exp'], time.time() + settings.AUTH_TOKEN_CACHE_TTL)
+        token_cache.set(raw_token, expires_at, copy.copy(user), validated_token, epoch)
+        return user, validated_token
@@ -0,0 +1,82 @@
+# backoffice/availability.py
+
+from datetime import time, timedelta
+from django.conf import settings
+
+from backoffice.models import SlotOccupancy
+from backoffice.opening_calendar import is_moment_open
+from backoffice.schedule_cache import cached_overrides
+
+# Statuts qui occupent des couverts (une réservation refusée libère sa place)
+ACTIVE_STATUSES = ('pending', 'accepted')
+
+
+def get_services():
+    """
+    Services configurés dans settings.RESTAURANT_SERVICES, créneaux convertis en `time`.
+
+    Retourne {'lunch': {'slots': [time, ...], 'capacity': int, 'table_duration': int}, ...}
+    """
+    return {
+        name: {
+            'slots': sorted(time.fromisoformat(slot.strip()) for slot in conf['slots']),
+            'capacity': conf['capacity'],
+            'table_duration': conf.get('table_duration', 120),
+        }
+        for name, conf in settings.RESTAURANT_SERVICES.items()
+    }
+
+
+def service_for_time(slot_time, services=None):
+    """Service (lunch/dinner) auquel appartient un créneau, None si le créneau n'existe pas."""
+    services = services or get_services()
+    for name, conf in services.items():
+        if slot_time in conf['slots']:
+            return name
+    return None
+
+
+def get_booked_covers(start, end):
+    """
+    Couverts occupés par (date, time) sur la période, en une seule requête.
+
+    Lus dans les compteurs SlotOccupancy, ceux que la réservation publique
+    vérifie : les places annoncées sont exactement celles qui peuvent être réservées.
+    """
+    rows = SlotOccupancy.objects.filter(date__range=(start, end)).values_list('date', 'time', 'booked_covers')
+    return {(day, slot_time): booked for day, slot_time, booked in rows}
+
+
+def compute_availability(start, end):
+    """
+    Calcule les créneaux réservables entre `start` et `end` (inclus).
+
+    Deux requêtes au plus, quelle que soit la taille de la période : le
+    calendrier d'ouverture de la période (en cache tant que les horaires ne
+    changent pas) et les compteurs de couverts des créneaux.
+    """
+    services = get_services()
+    overrides = cached_overrides(start, end)
+    booked = get_booked_covers(start, end)
+
+    days = []
+    day = start
+    while day <= end:
+        day_services = []
+        for name, conf in services.items():
+            is_open = is_moment_open(day, name, overrides)
+            slots = []
+            if is_open:
+                for slot_time in conf['slots']:
+                    booked_covers = booked.get((day, slot_time), 0)
+                    slots.append({
+                        'time': slot_time.strftime('%H:%M'),
+                        'capacity': conf['capacity'],
+                        'booked': booked_covers,
+                        'remaining': max(conf['capacity'] - booked_covers, 0),
+                    })
+            day_services.append({'service': name, 'open': is_open, 'slots': slots})
+        days.append({'date': day.isoformat(), 'services': day_services})
+        day += timedelta(days=1)
+
+    return days
@@ -0,0 +1,163 @@
+# backoffice/benchmarking.py
+
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from backoffice.availability import get_services
+from backoffice.importers import import_schedules
+from backoffice.models import Reservation
+from backoffice.opening_calendar import REGULAR_CLOSED_WEEKDAYS
+
+
+@contextmanager
+def temporary_database(keepdb=False, verbosity=0):
+    """
+    Base de test jetable pour les benchmarks et tests de charge (jamais la base réelle).
+
+    Avec SQLite, la base de test est un fichier temporaire plutôt qu'une base
+    en mémoire partagée, et les transactions prennent le verrou d'écriture dès
+    leur ouverture (IMMEDIATE), pour que plusieurs threads puissent écrire en
+    parallèle en attendant leur tour au lieu d'échouer.
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    temporary_name = None
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['OPTIONS'].setdefault('transaction_mode', 'IMMEDIATE')
+        connection.settings_dict['OPTIONS'].setdefault('timeout', 60)
+        if not test_settings.get('NAME'):
+            fd, temporary_name = tempfile.mkstemp(prefix='backoffice_bench_', suffix='.sqlite3')
+            os.close(fd)
+            test_settings['NAME'] = temporary_name
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity, interactive=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity, keepdb=keepdb)
+        teardown_test_environment()
+        if temporary_name:
+            test_settings['NAME'] = None
+            if os.path.exists(temporary_name):
+                os.remove(temporary_name)
+
+
+# ======================
+# Jeux de données et mesure de charge
+# ======================
+
+def seed_reservations(count, start, days, rng, batch_size=5000):
+    """Crée `count` réservations réparties sur `days` jours à partir de `start` (bulk_create, sans signaux)."""
+    slots = [slot for service in get_services().values() for slot in service['slots']]
+    statuses = ('pending', 'accepted', 'accepted', 'accepted', 'rejected')
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        Reservation.objects.bulk_create([
+            Reservation(
+                name=f"Client {created + i}",
+                email=f"client{created + i}@example.com",
+                date=start + timedelta(days=rng.randrange(days)),
+                time=rng.choice(slots),
+                party_size=rng.randint(1, 8),
+                status=rng.choice(statuses),
+            )
+            for i in range(size)
+        ])
+        created += size
+    return created
+
+
+def seed_schedules(start, days, rng):
+    """
+    Horaires exceptionnels réalistes sur la période : quelques fermetures
+    par mois (mardi à samedi) et des ouvertures le lundi, via l'import en masse.
+    """
+    rows = []
+    day = start
+    while day < start + timedelta(days=days):
+        if day.weekday() in REGULAR_CLOSED_WEEKDAYS:
+            if rng.random() < 0.1:
+                rows.append({'type': 'open', 'start_date': day.isoformat(), 'moment': rng.choice(['full_day', 'lunch', 'dinner'])})
+        elif rng.random() < 0.04:
+            length = rng.randint(0, 3)
+            end = day + timedelta(days=length)
+            row = {'type': 'closed', 'start_date': day.isoformat()}
+            if length:
+                row['end_date'] = end.isoformat()
+            rows.append(row)
+            day = end
+        day += timedelta(days=1)
+    return import_schedules(rows).created
+
+
+def percentile(sorted_values, fraction):
+    """Percentile par rang le plus proche sur une liste déjà triée."""
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize(latencies, wall_time, status_codes):
+    """Statistiques d'un scénario : latences en millisecondes, débit en requêtes par seconde."""
+    ordered = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 3) if value is not None else None  # noqa: E731
+    return {
+        'requests': len(ordered),
+        'throughput_rps': round(len(ordered) / wall_time, 2) if wall_time else None,
+        'p50_ms': to_ms(percentile(ordered, 0.50)),
+        'p90_ms': to_ms(percentile(ordered, 0.90)),
+        'p99_ms': to_ms(percentile(ordered, 0.99)),
+        'mean_ms': to_ms(sum(ordered) / len(ordered)) if ordered else None,
+        'max_ms': to_ms(ordered[-1]) if ordered else None,
+        'status_codes': dict(sorted(Counter(map(str, status_codes)).items())),
+    }
+
+
+def run_load(make_request, total, concurrency):
+    """
+    Exécute `total` appels de make_request(index) répartis sur `concurrency` threads.
+
+    Chaque thread a sa propre connexion à la base, fermée à la fin (sinon la
+    base de test ne pourrait pas être supprimée sous PostgreSQL).
+    Retourne (latences en secondes, codes de statut, durée totale).
+    """
+    counter = iter(range(total))
+    lock = threading.Lock()
+    latencies, status_codes = [], []
+
+    def worker():
+        try:
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    return
+                start = time.perf_counter()
+                try:
+                    code = make_request(index)
+                except Exception as e:
+                    code = type(e).__name__
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    status_codes.append(code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, status_codes, time.perf_counter() - start
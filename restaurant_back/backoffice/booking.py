@@ -0,0 +1,89 @@
+# backoffice/booking.py
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from backoffice.availability import ACTIVE_STATUSES, get_services, service_for_time
+from backoffice.models import Reservation, SlotOccupancy
+from backoffice.schedule_cache import is_open
+
+
+class SlotUnavailable(Exception):
+    """Créneau inexistant, passé ou fermé (horaires habituels ou exceptionnels)."""
+
+
+class SlotFull(Exception):
+    """Plus assez de couverts disponibles sur le créneau."""
+
+
+def reserve_covers(day, slot_time, covers, capacity):
+    """
+    Réserve `covers` couverts sur le créneau si la capacité le permet.
+
+    Un seul UPDATE conditionnel (booked_covers + covers <= capacity) :
+    la vérification et l'incrément sont atomiques, deux réservations
+    concurrentes ne peuvent pas dépasser la capacité.
+    """
+    SlotOccupancy.objects.get_or_create(date=day, time=slot_time)
+    updated = SlotOccupancy.objects.filter(
+        date=day,
+        time=slot_time,
+        booked_covers__lte=capacity - covers,
+    ).update(booked_covers=F('booked_covers') + covers)
+    return updated == 1
+
+
+def check_slot(date, time, services):
+    """Service du créneau s'il est réservable (existant, à venir, ouvert), SlotUnavailable sinon."""
+    service = service_for_time(time, services)
+    if service is None:
+        raise SlotUnavailable("Ce créneau n'existe pas.")
+    if date < timezone.localdate():
+        raise SlotUnavailable("Impossible de réserver à une date passée.")
+    if not is_open(date, service):
+        raise SlotUnavailable("Le restaurant est fermé pour ce service.")
+    return service
+
+
+def book(name, email, date, time, party_size, phone=None):
+    """
+    Crée une réservation publique (statut « en attente ») sans jamais surréserver.
+
+    Lève SlotUnavailable si le créneau n'est pas réservable, SlotFull s'il est complet.
+    """
+    services = get_services()
+    service = check_slot(date, time, services)
+
+    with transaction.atomic():
+        if not reserve_covers(date, time, party_size, services[service]['capacity']):
+            raise SlotFull("Ce créneau est complet.")
+        reservation = Reservation(name=name, email=email, phone=phone, date=date, time=time, party_size=party_size)
+        reservation._skip_slot_refresh = True  # Compteur déjà incrémenté ci-dessus
+        reservation.save()
+    return reservation
+
+
+def refresh_slots(slots):
+    """
+    Recalcule le compteur de couverts des créneaux {(date, time), ...} à partir des réservations.
+
+    La ligne du compteur est verrouillée avant l'agrégat pour ne pas écraser
+    un incrément concurrent de `reserve_covers`.
+
+    Retourne les créneaux dont des couverts se sont libérés (pour la liste d'attente).
+    """
+    freed = set()
+    for day, slot_time in slots:
+        with transaction.atomic():
+            SlotOccupancy.objects.get_or_create(date=day, time=slot_time)
+            slot = SlotOccupancy.objects.select_for_update().get(date=day, time=slot_time)
+            booked = Reservation.objects.filter(
+                date=day, time=slot_time, status__in=ACTIVE_STATUSES
+            ).aggregate(total=Sum('party_size'))['total'] or 0
+            if slot.booked_covers != booked:
+                if booked < slot.booked_covers:
+                    freed.add((day, slot_time))
+                slot.booked_covers = booked
+                slot.save(update_fields=['booked_covers'])
+    return freed
@@ -0,0 +1,91 @@
+# backoffice/export.py
+
+import csv
+import json
+from asgiref.sync import sync_to_async
+from datetime import date, datetime, time
+from rest_framework.negotiation import BaseContentNegotiation
+
+# Colonnes exportées, dans l'ordre
+EXPORT_FIELDS = ('id', 'name', 'email', 'phone', 'date', 'time', 'party_size', 'status', 'created_at')
+
+# Lignes lues par aller-retour base et regroupées par morceau envoyé au client
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """
+    L'export répond en CSV / NDJSON hors des renderers DRF : les erreurs restent
+    en JSON quel que soit l'en-tête Accept, et ?format= n'est pas interprété par DRF.
+    """
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+class Echo:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de l'écrire."""
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset):
+    """Tuples de valeurs lus par morceaux côté base : la mémoire reste constante."""
+    return (
+        queryset.order_by('date', 'time', 'id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def export_value(value):
+    """Dates et heures en ISO 8601 complet (microsecondes comprises) : mêmes valeurs en CSV et en NDJSON."""
+    return value.isoformat() if isinstance(value, (date, time, datetime)) else value
+
+
+def stream_csv(queryset):
+    writer = csv.writer(Echo())
+    buffer = [writer.writerow(EXPORT_FIELDS)]
+    for row in iter_rows(queryset):
+        buffer.append(writer.writerow([export_value(value) for value in row]))
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    yield ''.join(buffer)
+
+
+def stream_ndjson(queryset):
+    buffer = []
+    for row in iter_rows(queryset):
+        buffer.append(json.dumps({field: export_value(value) for field, value in zip(EXPORT_FIELDS, row)}) + '\n')
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+async def async_stream(stream):
+    """
+    Flux synchrone servi en ASGI sans mise en mémoire : chaque morceau est lu dans le thread
+    de la requête (sync_to_async), là où vit le curseur base. Flux fermé si le client se déconnecte.
+    """
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(stream, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(stream.close)()
+
+
+EXPORT_STREAMS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
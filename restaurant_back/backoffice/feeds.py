@@ -0,0 +1,55 @@
+# backoffice/feeds.py
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from backoffice.models import Reservation
+
+
+class InvalidCursor(ValueError):
+    """Curseur du flux illisible."""
+
+
+def encode_cursor(updated_at, pk):
+    raw = f"{updated_at.isoformat()}|{pk}"
+    return urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+
+def decode_cursor(value):
+    try:
+        updated_at, pk = urlsafe_b64decode(value.encode('ascii')).decode('ascii').split('|')
+        return datetime.fromisoformat(updated_at), int(pk)
+    except (TypeError, ValueError, UnicodeError):
+        raise InvalidCursor("Curseur invalide.")
+
+
+def head_cursor():
+    """Curseur positionné après la dernière modification connue (pour ne suivre que les suivantes)."""
+    last = Reservation.objects.order_by('-updated_at', '-id').values_list('updated_at', 'id').first()
+    if last is None:
+        return encode_cursor(timezone.now() - timedelta(seconds=settings.CHANGE_FEED_SETTLE), 0)
+    return encode_cursor(*last)
+
+
+def changes_since(cursor, limit=100):
+    """
+    Réservations créées ou modifiées après le curseur, dans l'ordre (updated_at, id).
+
+    Lecture sur l'index (updated_at, id). Les lignes plus récentes que
+    CHANGE_FEED_SETTLE secondes sont laissées pour la lecture suivante :
+    une transaction encore ouverte peut écrire un updated_at antérieur à
+    celui d'une ligne déjà validée, et serait sinon sautée.
+
+    Retourne (réservations, [curseur de chaque réservation]).
+    """
+    updated_at, pk = decode_cursor(cursor)
+    settled = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_SETTLE)
+    reservations = list(
+        Reservation.objects.filter(Q(updated_at__gte=updated_at) & (Q(updated_at__gt=updated_at) | Q(id__gt=pk)))
+        .filter(updated_at__lte=settled)
+        .order_by('updated_at', 'id')[:limit]
+    )
+    return reservations, [encode_cursor(reservation.updated_at, reservation.pk) for reservation in reservations]
@@ -0,0 +1,96 @@
+# backoffice/filters.py
+
+from datetime import date
+from rest_framework.exceptions import ValidationError
+
+from backoffice.models import Reservation, WaitlistEntry
+
+# Statuts acceptés dans le filtre ?status=pending,accepted
+RESERVATION_STATUSES = {value for value, _ in Reservation.STATUS_CHOICES}
+WAITLIST_STATUSES = {value for value, _ in WaitlistEntry.STATUS_CHOICES}
+
+# Paramètres reconnus par filter_reservations
+RESERVATION_FILTERS = ('date', 'date_from', 'date_to', 'status', 'party_size_min', 'party_size_max')
+
+
+def _parse_date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: "Date invalide, format attendu : AAAA-MM-JJ."})
+
+
+def _parse_positive_int(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValidationError({name: "Doit être un entier."})
+    if number < 1:
+        raise ValidationError({name: "Doit être supérieur ou égal à 1."})
+    return number
+
+
+def filter_reservations(queryset, params):
+    """
+    Applique les filtres de la liste des réservations directement en base.
+
+    Paramètres reconnus (tous optionnels) :
+    - date : une date précise
+    - date_from / date_to : bornes incluses d'une période
+    - status : un ou plusieurs statuts séparés par des virgules
+    - party_size_min / party_size_max : bornes incluses du nombre de couverts
+    """
+    exact_date = _parse_date(params, 'date')
+    date_from = _parse_date(params, 'date_from')
+    date_to = _parse_date(params, 'date_to')
+    if date_from and date_to and date_to < date_from:
+        raise ValidationError({"date_to": "La date de fin ne peut pas être antérieure à la date de début."})
+
+    if exact_date:
+        queryset = queryset.filter(date=exact_date)
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+
+    status_param = params.get('status')
+    if status_param:
+        statuses = {value.strip() for value in status_param.split(',') if value.strip()}
+        if not statuses:
+            raise ValidationError({"status": "Au moins un statut est requis."})
+        unknown = statuses - RESERVATION_STATUSES
+        if unknown:
+            raise ValidationError({"status": f"Statut(s) invalide(s) : {', '.join(sorted(unknown))}."})
+        queryset = queryset.filter(status__in=statuses)
+
+    party_size_min = _parse_positive_int(params, 'party_size_min')
+    party_size_max = _parse_positive_int(params, 'party_size_max')
+    if party_size_min:
+        queryset = queryset.filter(party_size__gte=party_size_min)
+    if party_size_max:
+        queryset = queryset.filter(party_size__lte=party_size_max)
+
+    return queryset
+
+
+def filter_waitlist(queryset, params):
+    """
+    Filtres de la liste d'attente (admin), tous optionnels :
+    - date : une date précise
+    - status : waiting / promoted / cancelled
+    """
+    exact_date = _parse_date(params, 'date')
+    if exact_date:
+        queryset = queryset.filter(date=exact_date)
+    status_param = params.get('status')
+    if status_param:
+        if status_param not in WAITLIST_STATUSES:
+            raise ValidationError({"status": f"Statut invalide : {status_param}."})
+        queryset = queryset.filter(status=status_param)
+    return queryset
@@ -0,0 +1,94 @@
+# backoffice/idempotency.py
+
+import functools
+import hashlib
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from backoffice.models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def request_scope(request):
+    """Une clé n'est valable que pour un utilisateur, une méthode et une URL."""
+    return f"{request.user.pk}:{request.method}:{request.path}"[:255]
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def stored_response(scope, key, fingerprint):
+    """
+    Réponse déjà enregistrée pour cette clé (rejouée), réponse d'erreur si la clé
+    a servi à une autre requête, None si la clé est inconnue ou expirée.
+    """
+    stored = IdempotencyKey.objects.filter(scope=scope, key=key, expires_at__gt=timezone.now()).first()
+    if stored is None:
+        return None
+    if stored.fingerprint != fingerprint:
+        return Response(
+            {'error': "Cette clé d'idempotence a déjà servi pour une requête différente."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored.response, status=stored.status_code, headers={REPLAY_HEADER: 'true'})
+
+
+def idempotent(view_method):
+    """
+    Rend une action de ViewSet rejouable avec l'en-tête Idempotency-Key.
+
+    - Sans en-tête : comportement inchangé
+    - Première requête : l'action et l'enregistrement de sa réponse sont faits dans
+      une seule transaction ; une réponse 5xx n'est pas mémorisée (nouvel essai possible)
+    - Nouvelle tentative avant IDEMPOTENCY_KEY_TTL : réponse d'origine renvoyée,
+      sans réexécuter l'action ni toucher aux réservations
+    - Deux tentatives simultanées : la contrainte unique (scope, key) fait échouer
+      la seconde, dont la transaction est annulée ; elle rejoue la première
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'error': f"{HEADER} ne peut pas dépasser {MAX_KEY_LENGTH} caractères."}, status=status.HTTP_400_BAD_REQUEST)
+
+        scope = request_scope(request)
+        fingerprint = request_fingerprint(request)
+        replay = stored_response(scope, key, fingerprint)
+        if replay is not None:
+            return replay
+
+        try:
+            with transaction.atomic():
+                # Clé expirée encore en base (pas encore purgée) : remplacée
+                IdempotencyKey.objects.filter(scope=scope, key=key, expires_at__lte=timezone.now()).delete()
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code < 500:
+                    IdempotencyKey.objects.create(
+                        key=key,
+                        scope=scope,
+                        fingerprint=fingerprint,
+                        status_code=response.status_code,
+                        response=response.data,
+                        expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                    )
+        except IntegrityError:
+            replay = stored_response(scope, key, fingerprint)
+            if replay is None:
+                raise
+            return replay
+        return response
+
+    return wrapper
@@ -0,0 +1,190 @@
+# backoffice/importers.py
+
+import csv
+import io
+import json
+import logging
+from datetime import date
+from django.db import IntegrityError, connection, transaction
+
+from backoffice import schedule_cache
+from backoffice.booking import refresh_slots
+from backoffice.intervals import IntervalIndex
+from backoffice.models import CONFLICTING_MOMENTS, ExceptionalSchedule, OpeningCalendarDay, Reservation
+from backoffice.opening_calendar import build_calendar_days
+from backoffice.serializers import ExceptionalScheduleSerializer, ReservationImportSerializer
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 500
+
+
+class ScheduleIndex:
+    """
+    Horaires exceptionnels en mémoire : un IntervalIndex par moment.
+
+    Un horaire chevauche ceux des moments incompatibles (CONFLICTING_MOMENTS)
+    sur la même période : midi et soir d'un même jour coexistent.
+    """
+
+    def __init__(self, schedules=()):
+        intervals = {moment: [] for moment in CONFLICTING_MOMENTS}
+        for start, end, moment in schedules:
+            intervals[moment].append((start, end))
+        self.indexes = {moment: IntervalIndex(moment_intervals) for moment, moment_intervals in intervals.items()}
+
+    def overlaps(self, start, end, moment):
+        return any(self.indexes[other].overlaps(start, end) for other in CONFLICTING_MOMENTS[moment])
+
+    def add(self, start, end, moment):
+        self.indexes[moment].add(start, end)
+
+
+class ImportReport:
+    """Résultat d'un import : lignes créées et erreurs par ligne (numérotées à partir de 1)."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, row_number, errors):
+        self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self):
+        return {'dry_run': self.dry_run, 'created': self.created, 'errors': self.errors}
+
+
+def load_rows(content, file_format):
+    """Lignes (dicts) d'un contenu CSV (avec en-tête) ou JSON (liste d'objets) ; cellules vides ignorées."""
+    if file_format == 'csv':
+        rows = csv.DictReader(io.StringIO(content))
+    elif file_format == 'json':
+        rows = json.loads(content)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Le JSON doit être une liste d'objets.")
+    else:
+        raise ValueError("Format invalide. Doit être 'csv' ou 'json'.")
+    return [{key: value for key, value in row.items() if value not in ('', None)} for row in rows]
+
+
+def chunked(rows, size):
+    for offset in range(0, len(rows), size):
+        yield offset, rows[offset:offset + size]
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value) if isinstance(value, str) else None
+    except ValueError:
+        return None
+
+
+def save_in_bulk(model, instances):
+    """bulk_create qui garantit les clés primaires (nécessaires aux lignes dépendantes)."""
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(instances)
+    for instance in instances:
+        instance.save()
+    return instances
+
+
+def import_reservations(rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Import de réservations : validation par lots, écriture par bulk_create.
+
+    La capacité des créneaux n'est pas vérifiée (données historiques ou
+    flux partenaire) ; les compteurs d'occupation sont recalculés ensuite.
+    """
+    report = ImportReport(dry_run)
+    for offset, chunk in chunked(rows, batch_size):
+        instances = []
+        for position, row in enumerate(chunk, start=offset + 1):
+            serializer = ReservationImportSerializer(data=row)
+            if serializer.is_valid():
+                instances.append(Reservation(**serializer.validated_data))
+            else:
+                report.add_error(position, serializer.errors)
+
+        if instances and not dry_run:
+            with transaction.atomic():
+                Reservation.objects.bulk_create(instances)
+                # bulk_create n'envoie pas de signaux : compteurs des créneaux touchés recalculés ici
+                refresh_slots({(instance.date, instance.time) for instance in instances})
+        report.created += len(instances)
+
+    logger.info(f"Import de réservations : {report.created} ligne(s) valide(s), {len(report.errors)} erreur(s)")
+    return report
+
+
+def load_interval_index(dates):
+    """Index des horaires enregistrés qui chevauchent la période couverte par `dates` (une requête)."""
+    if not dates:
+        return ScheduleIndex()
+    return ScheduleIndex(
+        (start_date, end_date or start_date, moment)
+        for start_date, end_date, moment in ExceptionalSchedule.objects.overlapping(min(dates), max(dates)).values_list('start_date', 'end_date', 'moment')
+    )
+
+
+def import_schedules(rows, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Import d'horaires exceptionnels avec les règles de ExceptionalScheduleSerializer.
+
+    Les chevauchements sont vérifiés sur un index d'intervalles par moment en mémoire,
+    chargé en une requête et enrichi au fil de l'import (lignes du fichier
+    entre elles comprises), au lieu d'une requête par ligne. Si un lot est
+    annulé par la base, l'index est rechargé : ses lignes ne bloquent pas la suite.
+    """
+    report = ImportReport(dry_run)
+    for row in rows:
+        # Colonnes facultatives dans les fichiers : mode déduit de end_date, journée entière par défaut
+        row.setdefault('mode', 'range' if row.get('end_date') else 'single')
+        row.setdefault('moment', 'full_day')
+
+    dates = [parsed for row in rows for parsed in (parse_date(row.get('start_date')), parse_date(row.get('end_date'))) if parsed]
+    interval_index = load_interval_index(dates)
+
+    created_any = False
+    for offset, chunk in chunked(rows, batch_size):
+        instances = []
+        positions = []
+        for position, row in enumerate(chunk, start=offset + 1):
+            serializer = ExceptionalScheduleSerializer(data=row, context={'interval_index': interval_index})
+            if serializer.is_valid():
+                instance = ExceptionalSchedule(**serializer.validated_data)
+                interval_index.add(instance.start_date, instance.end_date or instance.start_date, instance.moment)
+                instances.append(instance)
+                positions.append(position)
+            else:
+                report.add_error(position, serializer.errors)
+
+        if instances and not dry_run:
+            try:
+                with transaction.atomic():
+                    save_in_bulk(ExceptionalSchedule, instances)
+                    # bulk_create n'envoie pas de signaux : calendrier d'ouverture construit ici
+                    OpeningCalendarDay.objects.bulk_create(
+                        [day for instance in instances for day in build_calendar_days(instance)],
+                        batch_size=1000,
+                    )
+            except IntegrityError:
+                # Horaire concurrent inséré pendant l'import (contrainte d'exclusion PostgreSQL)
+                for position in positions:
+                    report.add_error(position, {'detail': ["Chevauchement détecté par la base de données, lot annulé."]})
+                # Intervalles du lot annulé retirés : index rechargé depuis la base (lots validés et horaire concurrent)
+                interval_index = load_interval_index(dates)
+                continue
+            created_any = True
+        report.created += len(instances)
+
+    if created_any:
+        transaction.on_commit(schedule_cache.invalidate)
+    logger.info(f"Import d'horaires : {report.created} ligne(s) valide(s), {len(report.errors)} erreur(s)")
+    return report
+
+
+IMPORTERS = {
+    'reservations': import_reservations,
+    'schedules': import_schedules,
+}
@@ -0,0 +1,40 @@
+# backoffice/intervals.py
+
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex:
+    """
+    Index en mémoire d'intervalles disjoints [start, end] (bornes incluses) :
+    jours des horaires exceptionnels à l'import, minutes d'occupation d'une table au placement.
+
+    Les intervalles qui se chevauchent sont fusionnés, au chargement comme à l'ajout :
+    seule la question « ce point est-il déjà couvert ? » compte. Recherche et ajout
+    en O(log n) par bisection (plus le coût de la fusion).
+    """
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def overlaps(self, start, end):
+        # Seul candidat : le dernier intervalle qui commence au plus tard à `end`
+        position = bisect_right(self.starts, end) - 1
+        return position >= 0 and self.ends[position] >= start
+
+    def add(self, start, end):
+        # Intervalles chevauchés (ex. attributions existantes qui se recouvrent) fusionnés avec le nouveau :
+        # l'index reste disjoint, condition de `overlaps`
+        first = bisect_left(self.ends, start)
+        last = bisect_right(self.starts, end)
+        if first < last:
+            start = min(start, self.starts[first])
+            end = max(end, self.ends[last - 1])
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
@@ -0,0 +1,126 @@
+# backoffice/mail_queue.py
+
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from backoffice.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None):
+    """
+    Ajoute un e-mail à la file d'envoi (aucun appel SMTP ici).
+
+    À appeler dans la même transaction que les données qu'il accompagne.
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or '',
+        recipients=list(recipient_list),
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Réserve un lot d'e-mails à envoyer.
+
+    Les lignes sont verrouillées (SKIP LOCKED) le temps de repousser leur
+    prochaine tentative de EMAIL_QUEUE_LEASE secondes : plusieurs workers
+    peuvent tourner en parallèle sans envoyer deux fois le même message.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if emails:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt_at=now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE)
+            )
+    return emails
+
+
+def schedule_retry(email, error):
+    """Repousse un envoi en échec (délai doublé à chaque tentative) ou l'abandonne."""
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+        email.status = 'failed'
+        logger.error(f"Abandon de l'e-mail {email.pk} après {email.attempts} tentative(s) : {error}")
+    else:
+        delay = settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (email.attempts - 1)
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning(f"Échec d'envoi de l'e-mail {email.pk}, nouvel essai dans {delay}s : {error}")
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_batch(batch_size=None, connection=None):
+    """
+    Envoie un lot d'e-mails sur une seule connexion SMTP.
+
+    Avec `connection` (déjà ouverte), le lot l'utilise sans la fermer : voir `drain`.
+    Retourne le nombre d'e-mails traités (envoyés ou replanifiés).
+    """
+    emails = claim_batch(batch_size or settings.EMAIL_QUEUE_BATCH_SIZE)
+    if not emails:
+        return 0
+
+    shared = connection is not None
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.error(f"Connexion SMTP impossible : {str(e)}", exc_info=True)
+        for email in emails:
+            schedule_retry(email, e)
+        return len(emails)
+
+    sent_ids = []
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email or settings.DEFAULT_FROM_EMAIL,
+                email.recipients,
+                connection=connection,
+            )
+            try:
+                message.send()
+                sent_ids.append(email.pk)
+            except Exception as e:
+                schedule_retry(email, e)
+    finally:
+        if not shared:
+            connection.close()
+
+    if sent_ids:
+        OutboundEmail.objects.filter(pk__in=sent_ids).update(status='sent', sent_at=timezone.now(), last_error='')
+        logger.info(f"{len(sent_ids)} e-mail(s) envoyé(s)")
+    return len(emails)
+
+
+def drain(batch_size=None):
+    """
+    Vide la file (lots successifs) sur une seule connexion SMTP, ouverte une fois.
+
+    Retourne le nombre d'e-mails traités.
+    """
+    total = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        while True:
+            processed = send_batch(batch_size, connection)
+            if not processed:
+                return total
+            total += processed
+    finally:
+        connection.close()
@@ -0,0 +1,52 @@
+# backoffice/maintenance.py
+
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+
+from backoffice.models import IdempotencyKey, PasswordResetToken, SeatingPlan, ThrottleCounter, Tombstone, WaitlistEntry
+
+# Données expirées purgées par `python manage.py purge_expired` : nom -> queryset des lignes à supprimer
+PURGE_TARGETS = {
+    'password_reset_tokens': lambda now: PasswordResetToken.objects.filter(expires_at__lte=now),
+    'sync_tombstones': lambda now: Tombstone.objects.filter(
+        deleted_at__lt=now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    ),
+    # Inscriptions encore en attente sur un créneau passé : plus aucune place à proposer
+    'stale_waitlist_entries': lambda now: WaitlistEntry.objects.filter(
+        status='waiting', date__lt=timezone.localdate(now)
+    ),
+    'idempotency_keys': lambda now: IdempotencyKey.objects.filter(expires_at__lte=now),
+    # Compteurs des clés de limitation qui ne sont pas revenues (les autres sont nettoyés au fil de l'eau)
+    'throttle_counters': lambda now: ThrottleCounter.objects.filter(expires_at__lte=now),
+    # Verrous des plans de salle des services passés (les placements eux-mêmes sont conservés)
+    'seating_plans': lambda now: SeatingPlan.objects.filter(date__lt=timezone.localdate(now), replan_requested_at__isnull=True),
+}
+
+
+def delete_in_batches(queryset, batch_size=1000, pause=0):
+    """
+    Supprime les lignes du queryset par lots de `batch_size` clés primaires.
+
+    Chaque lot est une transaction courte (autocommit) : pas de verrou long
+    sur la table, même quand il reste beaucoup de lignes à purger.
+    """
+    total = 0
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        queryset.model.objects.filter(pk__in=ids).delete()
+        total += len(ids)
+        if pause:
+            time.sleep(pause)
+
+
+def purge_expired(targets=None, batch_size=1000, pause=0):
+    """Purge les données expirées des cibles demandées (toutes par défaut) ; retourne {cible: lignes supprimées}."""
+    now = timezone.now()
+    return {
+        name: delete_in_batches(PURGE_TARGETS[name](now), batch_size, pause)
+        for name in (targets or PURGE_TARGETS)
+    }
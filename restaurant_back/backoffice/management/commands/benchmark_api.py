@@ -0,0 +1,176 @@
+import django
+import json
+import logging
+import platform
+import random
+import subprocess
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backoffice.availability import get_services
+from backoffice.benchmarking import run_load, seed_reservations, seed_schedules, summarize, temporary_database
+from backoffice.models import ExceptionalSchedule, Reservation
+from backoffice.views import PasswordResetRequestView
+
+SCENARIOS = ('list', 'create', 'patch_status', 'schedule_validate', 'password_reset')
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de l'API du backoffice sur une base de test jetable peuplée de volumes réalistes : "
+        "latences p50/p90/p99 et débit par scénario, résultat écrit en JSON pour comparer les commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reservations', type=int, default=500_000)
+        parser.add_argument('--years', type=int, default=3, help="Période couverte par les réservations et horaires.")
+        parser.add_argument('--requests', type=int, default=500, help="Requêtes mesurées par scénario.")
+        parser.add_argument('--warmup', type=int, default=20, help="Requêtes non mesurées avant chaque scénario.")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Parmi {', '.join(SCENARIOS)}.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--compare', help="Résultat JSON précédent à comparer (p50/p99 et débit).")
+
+    def handle(self, *args, **options):
+        scenarios = [name for name in options['scenarios'].split(',') if name]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Scénario(s) inconnu(s) : {', '.join(sorted(unknown))}")
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        # Les logs par requête (dont les 400 attendus) fausseraient les mesures : erreurs seulement
+        for name in ('django', 'backoffice'):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+        with temporary_database():
+            result = self.run_benchmark(scenarios, options)
+
+        with open(options['output'], 'w') as f:
+            json.dump(result, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['output']}"))
+        if baseline:
+            self.compare(baseline, result)
+
+    def run_benchmark(self, scenarios, options):
+        rng = random.Random(options['seed'])
+        days = 365 * options['years']
+        start = timezone.localdate() - timedelta(days=days // 2)
+
+        started = time.perf_counter()
+        reservations = seed_reservations(options['reservations'], start, days, rng)
+        schedules = seed_schedules(start, days, rng)
+        seed_time = time.perf_counter() - started
+        self.stdout.write(f"Base peuplée : {reservations} réservations, {schedules} horaires ({seed_time:.1f} s)")
+
+        User = get_user_model()
+        admin = User.objects.create_superuser('bench', 'bench@example.com', 'bench-password')
+        authorization = f"Bearer {AccessToken.for_user(admin)}"
+        max_id = Reservation.objects.order_by('-id').values_list('id', flat=True).first()
+        schedule_spans = list(ExceptionalSchedule.objects.values_list('start_date', 'type'))
+        slots = [slot.strftime('%H:%M') for service in get_services().values() for slot in service['slots']]
+
+        def request_factory(name, seed):
+            local = random.Random(seed)
+            per_thread = threading.local()
+
+            def client():
+                # Un client par thread (le client de test n'est pas thread-safe)
+                if not hasattr(per_thread, 'client'):
+                    per_thread.client = Client(HTTP_AUTHORIZATION=authorization)
+                return per_thread.client
+
+            def request(index):
+                if name == 'list':
+                    day = start + timedelta(days=local.randrange(days - 7))
+                    response = client().get('/backoffice/api/reservations/', {
+                        'date_from': day.isoformat(), 'date_to': (day + timedelta(days=7)).isoformat(),
+                    })
+                elif name == 'create':
+                    response = client().post('/backoffice/api/reservations/', {
+                        'name': f"Bench {index}",
+                        'date': (start + timedelta(days=local.randrange(days))).isoformat(),
+                        'time': local.choice(slots),
+                        'party_size': local.randint(1, 8),
+                    }, content_type='application/json')
+                elif name == 'patch_status':
+                    response = client().patch(
+                        f'/backoffice/api/reservations/{local.randint(1, max_id)}/',
+                        {'status': local.choice(['pending', 'accepted', 'rejected'])},
+                        content_type='application/json',
+                    )
+                elif name == 'schedule_validate':
+                    # Période en conflit avec un horaire existant : validation complète, rien n'est écrit
+                    schedule_start, schedule_type = local.choice(schedule_spans)
+                    response = client().post('/backoffice/api/schedules/', {
+                        'type': schedule_type, 'mode': 'single', 'start_date': schedule_start.isoformat(), 'moment': 'full_day',
+                    }, content_type='application/json')
+                else:  # password_reset
+                    response = client().post('/api/password-reset/', {'email': 'bench@example.com'}, content_type='application/json')
+                return response.status_code
+
+            return request
+
+        results = {}
+        # Limitation par IP désactivée : tous les threads partagent la même adresse
+        with mock.patch.object(PasswordResetRequestView, 'throttle_classes', []):
+            for offset, name in enumerate(scenarios):
+                if name == 'schedule_validate' and not schedule_spans:
+                    continue
+                if options['warmup']:
+                    run_load(request_factory(name, options['seed'] - offset - 1), options['warmup'], options['concurrency'])
+                latencies, status_codes, wall_time = run_load(
+                    request_factory(name, options['seed'] + offset), options['requests'], options['concurrency'],
+                )
+                results[name] = summarize(latencies, wall_time, status_codes)
+                stats = results[name]
+                self.stdout.write(
+                    f"{name:<18} p50 {stats['p50_ms']:>8} ms   p99 {stats['p99_ms']:>8} ms   "
+                    f"{stats['throughput_rps']:>8} req/s   {stats['status_codes']}"
+                )
+
+        return {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'commit': self.git_commit(),
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'debug': settings.DEBUG,
+                'options': {key: options[key] for key in ('reservations', 'years', 'requests', 'warmup', 'concurrency', 'seed')},
+                'seeded': {'reservations': reservations, 'schedules': schedules, 'seconds': round(seed_time, 1)},
+            },
+            'scenarios': results,
+        }
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, baseline, result):
+        self.stdout.write(f"Comparaison avec {baseline['meta'].get('commit') or 'la référence'} :")
+        for name, stats in result['scenarios'].items():
+            previous = baseline.get('scenarios', {}).get(name)
+            if not previous:
+                continue
+            changes = []
+            for key in ('p50_ms', 'p99_ms', 'throughput_rps'):
+                if previous.get(key) and stats.get(key) is not None:
+                    changes.append(f"{key} {(stats[key] - previous[key]) / previous[key] * 100:+.1f} %")
+            self.stdout.write(f"  {name:<18} " + '   '.join(changes))
@@ -0,0 +1,100 @@
+import json
+import time
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from backoffice.benchmarking import summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le coût par requête de la connexion à la base selon le mode : "
+        "une connexion par requête, connexions persistantes (CONN_MAX_AGE + health checks) "
+        "et pool psycopg 3 (PostgreSQL uniquement). N'exécute que SELECT 1 sur la base configurée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--output', help="Fichier JSON de résultats (facultatif).")
+
+    def handle(self, *args, **options):
+        original = {
+            'CONN_MAX_AGE': connection.settings_dict['CONN_MAX_AGE'],
+            'CONN_HEALTH_CHECKS': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'pool': connection.settings_dict['OPTIONS'].get('pool'),
+        }
+        modes = {
+            'per_request': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'pool': None},
+            'persistent': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True, 'pool': None},
+        }
+        if connection.vendor == 'postgresql':
+            modes['pool'] = {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True, 'pool': original['pool'] or {'min_size': 1, 'max_size': 2}}
+
+        results = {}
+        try:
+            for name, mode in modes.items():
+                self.configure(mode)
+                results[name] = self.measure(options['requests'])
+                self.stdout.write(
+                    f"{name:<12} p50 {results[name]['p50_ms']:>8} ms   p99 {results[name]['p99_ms']:>8} ms   "
+                    f"moyenne {results[name]['mean_ms']:>8} ms   connexions ouvertes : {results[name]['connections_opened']}"
+                )
+        except ImproperlyConfigured as e:
+            # Pool indisponible (psycopg2 installé à la place de psycopg 3) : résultats partiels
+            self.stderr.write(f"Mode {name} impossible : {e}")
+        finally:
+            self.configure(original)
+
+        if 'per_request' in results and 'persistent' in results:
+            saved = results['per_request']['mean_ms'] - results['persistent']['mean_ms']
+            self.stdout.write(f"Gain des connexions persistantes : {saved:.3f} ms par requête")
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'database': connection.vendor, 'requests': options['requests'], 'modes': results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['output']}"))
+
+    def configure(self, mode):
+        connection.close()
+        if connection.vendor == 'postgresql':
+            try:
+                connection.close_pool()
+            except ImproperlyConfigured:
+                pass  # Pool jamais créé (psycopg_pool absent)
+        connection.settings_dict['CONN_MAX_AGE'] = mode['CONN_MAX_AGE']
+        connection.settings_dict['CONN_HEALTH_CHECKS'] = mode['CONN_HEALTH_CHECKS']
+        if mode['pool']:
+            connection.settings_dict['OPTIONS']['pool'] = mode['pool']
+        else:
+            connection.settings_dict['OPTIONS'].pop('pool', None)
+
+    def measure(self, total):
+        """
+        Cycle de vie d'une requête HTTP réelle : request_started / requête SQL / request_finished,
+        signaux sur lesquels Django ferme ou conserve la connexion (close_old_connections).
+        """
+        opened = []
+
+        def count(sender, **kwargs):
+            opened.append(1)
+
+        connection_created.connect(count, weak=False)
+        latencies = []
+        try:
+            for _ in range(total):
+                start = time.perf_counter()
+                request_started.send(sender=WSGIHandler)
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                request_finished.send(sender=WSGIHandler)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            connection_created.disconnect(count)
+        stats = summarize(latencies, sum(latencies), [])
+        del stats['status_codes']
+        stats['connections_opened'] = len(opened)
+        return stats
@@ -0,0 +1,146 @@
+import json
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backoffice import seating
+from backoffice.availability import get_services
+from backoffice.benchmarking import summarize, temporary_database
+from backoffice.models import Reservation, Table
+
+# Salle par défaut : 20 tables de 2, 30 de 4, 10 de 6 et 4 de 8 (252 places)
+DEFAULT_TABLES = '2x20,4x30,6x10,8x4'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le plan de salle sur un service chargé (300 couverts par défaut), sur une base de test jetable : "
+        "calcul complet du service (glouton seul et avec budget de temps), replanification "
+        "incrémentale après le changement de statut d'une réservation (chemin de la requête) "
+        "et recalculs complets confiés au worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--covers', type=int, default=300, help="Couverts acceptés sur le service.")
+        parser.add_argument('--service', default='dinner')
+        parser.add_argument('--tables', default=DEFAULT_TABLES, help="Salle : capacitéxnombre séparés par des virgules.")
+        parser.add_argument('--changes', type=int, default=100, help="Changements de statut mesurés en incrémental.")
+        parser.add_argument('--repeat', type=int, default=5, help="Calculs complets mesurés (médiane retenue).")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help="Fichier JSON de résultats (facultatif).")
+
+    def handle(self, *args, **options):
+        services = get_services()
+        if options['service'] not in services:
+            raise CommandError(f"Service inconnu : {options['service']}")
+        try:
+            tables = [(int(capacity), int(count)) for capacity, count in (spec.split('x') for spec in options['tables'].split(','))]
+        except ValueError:
+            raise CommandError("Format de salle invalide, attendu par exemple : 2x10,4x14")
+
+        with temporary_database():
+            results = self.run_benchmark(options, services, tables)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['output']}"))
+
+    def run_benchmark(self, options, services, table_spec):
+        rng = random.Random(options['seed'])
+        service = options['service']
+        day = timezone.localdate()
+
+        Table.objects.bulk_create([
+            Table(name=f"T{capacity}-{i + 1}", capacity=capacity)
+            for capacity, count in table_spec
+            for i in range(count)
+        ])
+        reservations = []
+        covers = 0
+        while covers < options['covers']:
+            party_size = min(rng.choice((2, 2, 2, 2, 3, 4, 4, 4, 5, 6, 7, 8, 10)), options['covers'] - covers)
+            reservations.append(Reservation(
+                name=f"Client {len(reservations)}", email=f"client{len(reservations)}@example.com",
+                date=day, time=rng.choice(services[service]['slots']), party_size=party_size, status='accepted',
+            ))
+            covers += party_size
+        Reservation.objects.bulk_create(reservations)  # Sans signaux : le plan est calculé ci-dessous
+
+        rows = seating.accepted_reservations(day, service, services)
+        tables = list(Table.objects.order_by('capacity', 'id'))
+        duration = services[service]['table_duration']
+        greedy = self.solve_stats(rows, tables, duration, 0, options['repeat'])
+        budgeted = self.solve_stats(rows, tables, duration, None, 1)
+
+        full_plan = []
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            seating.plan_service(day, service)
+            full_plan.append(time.perf_counter() - start)
+
+        # Incrémental : refus puis nouvelle acceptation d'une réservation tirée au hasard,
+        # recalculs complets demandés traités ensuite comme par le worker
+        latencies = []
+        queued = 0
+        worker_latencies = []
+        for _ in range(options['changes']):
+            pk = rng.choice(rows)[0]
+            for new_status in ('rejected', 'accepted'):
+                Reservation.objects.filter(pk=pk).update(status=new_status)
+                start = time.perf_counter()
+                queued += len(seating.reseat([pk]))
+                latencies.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                if seating.process_replans():
+                    worker_latencies.append(time.perf_counter() - start)
+        incremental = summarize(latencies, sum(latencies), [])
+        del incremental['status_codes']
+        incremental['queued_replans'] = queued
+        incremental['worker_replan_ms'] = round(statistics.median(worker_latencies) * 1000, 2) if worker_latencies else None
+
+        plan = seating.service_plan(day, service)
+        results = {
+            'service': service,
+            'reservations': len(rows),
+            'covers': covers,
+            'seats': sum(capacity * count for capacity, count in table_spec),
+            'table_duration_min': duration,
+            'greedy': greedy,
+            'budgeted': budgeted,
+            'full_plan_ms': round(statistics.median(full_plan) * 1000, 2),
+            'incremental': incremental,
+            'final_seated_covers': plan['seated_covers'],
+        }
+
+        self.stdout.write(
+            f"{len(rows)} réservations, {covers} couverts, {results['seats']} places, tables occupées {duration} min"
+        )
+        for name in ('greedy', 'budgeted'):
+            stats = results[name]
+            self.stdout.write(
+                f"  solveur {name:<9} {stats['solve_ms']:>9} ms   placés {stats['seated_covers']:>4} couverts   "
+                f"sans table {stats['unseated_reservations']:>3} réservation(s)   places perdues {stats['wasted_seats']}"
+            )
+        self.stdout.write(f"  plan complet en base (lecture, calcul, écriture) : {results['full_plan_ms']} ms")
+        self.stdout.write(
+            f"  incrémental (requête) : p50 {incremental['p50_ms']} ms   p99 {incremental['p99_ms']} ms   "
+            f"recalculs complets confiés au worker {queued}/{len(latencies)} "
+            f"(médiane {incremental['worker_replan_ms']} ms)"
+        )
+        return results
+
+    def solve_stats(self, rows, tables, duration, time_budget, repeat):
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            assignments, unseated = seating.solve(rows, tables, duration, time_budget=time_budget)
+            durations.append(time.perf_counter() - start)
+        unseated_covers, wasted = seating.score(rows, assignments, unseated)
+        return {
+            'solve_ms': round(statistics.median(durations) * 1000, 2),
+            'seated_covers': sum(row[2] for row in rows) - unseated_covers,
+            'unseated_reservations': len(unseated),
+            'wasted_seats': wasted,
+        }
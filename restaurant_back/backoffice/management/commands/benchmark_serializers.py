@@ -0,0 +1,81 @@
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backoffice.benchmarking import seed_reservations, temporary_database
+from backoffice.models import ExceptionalSchedule, Reservation
+from backoffice.serializers import RESERVATION_VALUES, SCHEDULE_VALUES, ExceptionalScheduleSerializer, ReservationSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la sérialisation DRF (ModelSerializer) et la sérialisation rapide depuis .values() "
+        "sur des pages de N lignes, sur une base de test jetable. Vérifie que les deux sorties sont identiques."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5, help="Mesures par variante (médiane retenue).")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help="Fichier JSON de résultats (facultatif).")
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            results = self.run_benchmark(options)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['output']}"))
+
+    def run_benchmark(self, options):
+        rows = options['rows']
+        rng = random.Random(options['seed'])
+        start = timezone.localdate()
+        seed_reservations(rows, start, 365, rng)
+        # Horaires sans validation (chevauchements sans importance ici) : seul le volume compte
+        ExceptionalSchedule.objects.bulk_create([
+            ExceptionalSchedule(type='closed', start_date=start + timedelta(days=i), end_date=start + timedelta(days=i + 1) if i % 3 else None)
+            for i in range(rows)
+        ])
+
+        results = {}
+        for name, serializer_class, representation, queryset in (
+            ('reservations', ReservationSerializer, RESERVATION_VALUES, Reservation.objects.order_by('date', 'time', 'id')),
+            ('schedules', ExceptionalScheduleSerializer, SCHEDULE_VALUES, ExceptionalSchedule.objects.all()),
+        ):
+            queryset = queryset[:rows]
+            instances = list(queryset.all())
+            values = list(representation.values(queryset))
+            if list(serializer_class(instances, many=True).data) != representation.many(values):
+                raise CommandError(f"{name} : les sorties DRF et .values() diffèrent.")
+
+            # .all() à chaque mesure : nouveau queryset, donc nouvelle requête (pas de cache de résultats)
+            timings = {
+                'drf_serialize_ms': self.measure(lambda: serializer_class(instances, many=True).data, options['repeat']),
+                'values_serialize_ms': self.measure(lambda: representation.many(values), options['repeat']),
+                'drf_end_to_end_ms': self.measure(lambda: serializer_class(list(queryset.all()), many=True).data, options['repeat']),
+                'values_end_to_end_ms': self.measure(lambda: representation.many(list(representation.values(queryset))), options['repeat']),
+            }
+            timings['serialize_speedup'] = round(timings['drf_serialize_ms'] / timings['values_serialize_ms'], 1)
+            timings['end_to_end_speedup'] = round(timings['drf_end_to_end_ms'] / timings['values_end_to_end_ms'], 1)
+            results[name] = timings
+
+            self.stdout.write(
+                f"{name} ({len(values)} lignes) — sérialisation : DRF {timings['drf_serialize_ms']} ms, "
+                f".values() {timings['values_serialize_ms']} ms (x{timings['serialize_speedup']}) ; "
+                f"avec la requête : DRF {timings['drf_end_to_end_ms']} ms, "
+                f".values() {timings['values_end_to_end_ms']} ms (x{timings['end_to_end_speedup']})"
+            )
+        return {'rows': rows, 'repeat': options['repeat'], 'results': results}
+
+    def measure(self, func, repeat):
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - start)
+        return round(statistics.median(durations) * 1000, 2)
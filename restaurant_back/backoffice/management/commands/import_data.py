@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+
+from backoffice.importers import IMPORT_BATCH_SIZE, IMPORTERS, load_rows
+
+
+class Command(BaseCommand):
+    help = "Importe en masse des réservations ou des horaires exceptionnels depuis un fichier CSV ou JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help="Fichier CSV (avec en-tête) ou JSON (liste d'objets).")
+        parser.add_argument('--format', choices=['csv', 'json'], help="Déduit de l'extension par défaut.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Valide sans rien écrire.")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or ('json' if path.suffix.lower() == '.json' else 'csv')
+        try:
+            rows = load_rows(path.read_text(encoding='utf-8-sig'), file_format)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Lecture de {path} impossible : {e}")
+
+        # Un lot validé par transaction : une erreur tardive n'annule pas les lots déjà importés
+        report = IMPORTERS[options['kind']](rows, batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        for error in report.errors:
+            self.stderr.write(f"Ligne {error['row']} : {json.dumps(error['errors'], ensure_ascii=False)}")
+        verb = "valide(s)" if options['dry_run'] else "importée(s)"
+        self.stdout.write(self.style.SUCCESS(f"{report.created} ligne(s) {verb}, {len(report.errors)} erreur(s)."))
@@ -0,0 +1,30 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from backoffice.mail_queue import send_batch
+
+
+class Command(BaseCommand):
+    help = "Envoie les e-mails en attente de la file d'envoi (boucle continue par défaut)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Vide la file une fois puis s'arrête.")
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_QUEUE_BATCH_SIZE)
+        parser.add_argument('--interval', type=int, default=settings.EMAIL_QUEUE_POLL_INTERVAL,
+                            help="Secondes d'attente quand la file est vide.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = send_batch(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if options['once']:
+                break
+            # File vide : on libère la connexion base avant d'attendre
+            close_old_connections()
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"{total} e-mail(s) traité(s)."))
@@ -0,0 +1,33 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from backoffice.seating import process_replans
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les plans de salle en attente de recalcul complet "
+        "(demandés par les changements de réservation ; boucle continue par défaut)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Traite les demandes en attente une fois puis s'arrête.")
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument('--interval', type=int, default=settings.SEATING_QUEUE_POLL_INTERVAL,
+                            help="Secondes d'attente quand aucun recalcul n'est demandé.")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = process_replans(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if options['once']:
+                break
+            # Aucune demande : on libère la connexion base avant d'attendre
+            close_old_connections()
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"{total} plan(s) de salle recalculé(s)."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backoffice.maintenance import PURGE_TARGETS, purge_expired
+
+
+class Command(BaseCommand):
+    help = "Supprime par lots les données expirées (tokens de réinitialisation, traces de suppression, ...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='*', help=f"Cibles à purger parmi {', '.join(sorted(PURGE_TARGETS))} (toutes par défaut).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0, help="Secondes d'attente entre deux lots.")
+
+    def handle(self, *args, **options):
+        unknown = set(options['targets']) - set(PURGE_TARGETS)
+        if unknown:
+            raise CommandError(f"Cible(s) inconnue(s) : {', '.join(sorted(unknown))}")
+        results = purge_expired(options['targets'], options['batch_size'], options['pause'])
+        for name, count in results.items():
+            self.stdout.write(f"{name} : {count} ligne(s) supprimée(s)")
+        self.stdout.write(self.style.SUCCESS("Purge terminée."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from backoffice.opening_calendar import rebuild_all
+from backoffice import schedule_cache
+
+
+class Command(BaseCommand):
+    help = "Reconstruit entièrement le calendrier d'ouverture à partir des horaires exceptionnels."
+
+    def handle(self, *args, **options):
+        count = rebuild_all()
+        schedule_cache.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Calendrier reconstruit : {count} ligne(s)."))
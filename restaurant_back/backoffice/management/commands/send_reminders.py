@@ -0,0 +1,41 @@
+from datetime import date, time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from backoffice.mail_queue import drain
+from backoffice.reminders import due_reservations, queue_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "Envoie les rappels des réservations acceptées d'une journée (aujourd'hui par défaut). "
+        "Les rappels déjà envoyés sont ignorés : la commande peut être relancée sans doublon."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Jour des réservations (AAAA-MM-JJ, défaut aujourd'hui).")
+        parser.add_argument('--from', dest='start', help="Heure de début incluse (HH:MM).")
+        parser.add_argument('--to', dest='end', help="Heure de fin exclue (HH:MM).")
+        parser.add_argument('--dry-run', action='store_true', help="Compte les rappels dus sans rien envoyer.")
+        parser.add_argument('--queue-only', action='store_true',
+                            help="Met les rappels en file sans l'envoyer (laissé à process_email_queue).")
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_QUEUE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+            start = time.fromisoformat(options['start']) if options['start'] else None
+            end = time.fromisoformat(options['end']) if options['end'] else None
+        except ValueError as e:
+            raise CommandError(f"Date ou heure invalide : {e}")
+
+        if options['dry_run']:
+            self.stdout.write(f"{due_reservations(day, start, end).count()} rappel(s) dû(s) pour le {day}.")
+            return
+
+        queued = queue_reminders(day, start, end)
+        self.stdout.write(f"{queued} rappel(s) mis en file pour le {day}.")
+        if not options['queue_only']:
+            sent = drain(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{sent} e-mail(s) traité(s) sur une seule connexion SMTP."))
@@ -0,0 +1,91 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backoffice.availability import ACTIVE_STATUSES, get_services
+from backoffice.benchmarking import temporary_database
+from backoffice.models import Reservation, SlotOccupancy
+from backoffice.opening_calendar import is_open
+from backoffice.views import BookingView
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge de la réservation publique : de nombreux threads réservent "
+        "le même créneau en parallèle, sur une base de test jetable. "
+        "Échoue si la capacité du créneau est dépassée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=100)
+        parser.add_argument('--party-size', type=int, default=2)
+        parser.add_argument('--service', default='dinner')
+
+    def handle(self, *args, **options):
+        with temporary_database():
+            self.run_stress(options)
+
+    def run_stress(self, options):
+        services = get_services()
+        if options['service'] not in services:
+            raise CommandError(f"Service inconnu : {options['service']}")
+        service = services[options['service']]
+        slot_time = service['slots'][0]
+        capacity = service['capacity']
+
+        day = timezone.localdate() + timedelta(days=1)
+        while not is_open(day, options['service']):
+            day += timedelta(days=1)
+
+        payload = {
+            'name': 'Stress',
+            'email': 'stress@example.com',
+            'date': day.isoformat(),
+            'time': slot_time.strftime('%H:%M'),
+            'party_size': options['party_size'],
+        }
+        barrier = threading.Barrier(options['threads'])
+        results = []
+        lock = threading.Lock()
+
+        def worker():
+            client = APIClient()
+            barrier.wait()
+            try:
+                response = client.post('/backoffice/api/bookings/', payload, format='json')
+                code = response.status_code
+            except Exception as e:
+                code = type(e).__name__
+            finally:
+                connection.close()
+            with lock:
+                results.append(code)
+
+        # La limitation par IP bloquerait le test : tous les threads partagent la même adresse
+        with mock.patch.object(BookingView, 'throttle_classes', []):
+            threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        booked = Reservation.objects.filter(
+            date=day, time=slot_time, status__in=ACTIVE_STATUSES
+        ).aggregate(total=Sum('party_size'))['total'] or 0
+        counter = SlotOccupancy.objects.get(date=day, time=slot_time).booked_covers
+        summary = {code: results.count(code) for code in set(results)}
+
+        self.stdout.write(f"Créneau {day} {slot_time} — capacité {capacity} couverts")
+        self.stdout.write(f"Réponses : {summary}")
+        self.stdout.write(f"Couverts réservés : {booked} (compteur : {counter})")
+
+        if booked > capacity:
+            raise CommandError(f"Surréservation : {booked} couverts pour une capacité de {capacity}.")
+        if counter != booked:
+            raise CommandError(f"Compteur incohérent : {counter} au lieu de {booked}.")
+        self.stdout.write(self.style.SUCCESS("Aucune surréservation."))
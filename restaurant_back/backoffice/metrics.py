@@ -0,0 +1,223 @@
+# backoffice/metrics.py
+
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from django.conf import settings
+
+# Bornes des histogrammes (secondes, ou nombre de requêtes SQL)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': ("Durée de traitement des requêtes HTTP", LATENCY_BUCKETS),
+    'http_request_db_queries': ("Nombre de requêtes SQL par requête HTTP", QUERY_COUNT_BUCKETS),
+    'http_request_db_seconds': ("Temps passé en base par requête HTTP", LATENCY_BUCKETS),
+    'http_request_serializer_seconds': ("Temps de sérialisation et validation DRF par requête HTTP", LATENCY_BUCKETS),
+}
+COUNTERS = {
+    'http_requests_total': "Requêtes HTTP par vue, méthode et statut",
+}
+
+FILE_PREFIX = 'metrics_'
+
+
+class RequestMetrics:
+    """Compteurs de la requête en cours (requêtes SQL, temps en base, temps de sérialisation)."""
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+
+# Métriques de la requête en cours : suit aussi les vues async et sync_to_async
+current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class Registry:
+    """
+    Agrégats du processus : histogrammes {(nom, labels): [compteurs par borne, somme]} et compteurs.
+
+    Les valeurs sont cumulées depuis le démarrage du processus ; chaque
+    worker les écrit dans son propre fichier, relu et sommé par /metrics.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.last_flush = 0.0
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        with self.lock:
+            series = self.histograms.get((name, labels))
+            if series is None:
+                series = self.histograms[(name, labels)] = [[0] * (len(buckets) + 1), 0.0]
+            series[0][bisect_left(buckets, value)] += 1  # Dernière case : +Inf
+            series[1] += value
+
+    def increment(self, name, labels, amount=1):
+        with self.lock:
+            self.counters[(name, labels)] = self.counters.get((name, labels), 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'histograms': [[name, list(labels), counts[:], total] for (name, labels), (counts, total) in self.histograms.items()],
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+            }
+
+
+registry = Registry()
+
+
+# ======================
+# Collecte
+# ======================
+
+def record_query(execute, sql, params, many, context):
+    """Wrapper d'exécution SQL (connection.execute_wrappers) : compte et chronomètre les requêtes."""
+    state = current.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        state.queries += 1
+        state.db_time += time.perf_counter() - start
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """
+    Receiver de connection_created : installe le wrapper sur chaque connexion ouverte.
+
+    Posé sur la connexion plutôt qu'autour de la requête (`with
+    connection.execute_wrapper(...)`) pour couvrir aussi les requêtes
+    exécutées dans les threads de sync_to_async des vues async.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def timed_serialization(func, *args):
+    """Appelle func(*args) en comptant sa durée comme temps de sérialisation (sérialiseurs imbriqués comptés une fois)."""
+    state = current.get()
+    if state is None or state.serializing:
+        return func(*args)
+    state.serializing = True
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        state.serializing = False
+        state.serializer_time += time.perf_counter() - start
+
+
+def record_request(view, method, status_code, duration, state):
+    labels = (('view', view), ('method', method))
+    registry.observe('http_request_duration_seconds', labels, duration)
+    registry.observe('http_request_db_queries', labels, state.queries)
+    registry.observe('http_request_db_seconds', labels, state.db_time)
+    registry.observe('http_request_serializer_seconds', labels, state.serializer_time)
+    registry.increment('http_requests_total', labels + (('status', str(status_code)),))
+    maybe_flush()
+
+
+# ======================
+# Agrégation multi-processus
+# ======================
+
+def flush(directory=None):
+    """Écrit les agrégats du processus dans METRICS_MULTIPROC_DIR/metrics_<pid>.json (remplacement atomique)."""
+    directory = directory or settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return
+    registry.last_flush = time.monotonic()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp_path, os.path.join(directory, f'{FILE_PREFIX}{os.getpid()}.json'))
+
+
+def maybe_flush():
+    if settings.METRICS_MULTIPROC_DIR and time.monotonic() - registry.last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def collect():
+    """
+    Agrégats de tous les workers.
+
+    Sans METRICS_MULTIPROC_DIR, seulement ceux du processus courant. Les
+    fichiers des workers arrêtés sont conservés (compteurs monotones) :
+    vider le répertoire au redémarrage du serveur.
+    """
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        snapshots = [registry.snapshot()]
+    else:
+        flush(directory)
+        snapshots = []
+        for filename in os.listdir(directory):
+            if filename.startswith(FILE_PREFIX) and filename.endswith('.json'):
+                try:
+                    with open(os.path.join(directory, filename)) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # Fichier en cours de remplacement ou supprimé
+
+    histograms, counters = {}, {}
+    for snapshot in snapshots:
+        for name, labels, counts, total in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            if key in histograms:
+                merged = histograms[key]
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+            else:
+                histograms[key] = [counts, total]
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+def format_labels(labels, extra=()):
+    pairs = [f'{key}="{escape(value)}"' for key, value in (*labels, *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render():
+    """Métriques agrégées au format texte Prometheus."""
+    histograms, counters = collect()
+    lines = []
+    for name, (description, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+        for (series_name, labels), (counts, total) in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {total}')
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    for name, description in COUNTERS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+        for (series_name, labels), value in sorted(counters.items()):
+            if series_name == name:
+                lines.append(f'{name}{format_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,62 @@
+# backoffice/middleware.py
+
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from backoffice import metrics
+
+
+def view_label(request):
+    """Nom de la vue résolue (cardinalité bornée : jamais l'URL brute)."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware:
+    """
+    Mesure chaque requête : latence par vue, nombre de requêtes SQL, temps en base et de sérialisation.
+
+    - À placer en tête de MIDDLEWARE pour inclure le temps des autres middlewares
+    - Compatible WSGI et ASGI (pas de bascule sync/async pour les vues async)
+    - Réponses en streaming : seul le temps de construction de la réponse est mesuré, pas l'envoi du flux
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = metrics.RequestMetrics()
+        token = metrics.current.set(state)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        self.record(request, response, start, state)
+        return response
+
+    async def __acall__(self, request):
+        state = metrics.RequestMetrics()
+        token = metrics.current.set(state)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        self.record(request, response, start, state)
+        return response
+
+    def record(self, request, response, start, state):
+        metrics.record_request(view_label(request), request.method, response.status_code, time.perf_counter() - start, state)
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:21
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def build_calendar(apps, schema_editor):
+    ExceptionalSchedule = apps.get_model('backoffice', 'ExceptionalSchedule')
+    OpeningCalendarDay = apps.get_model('backoffice', 'OpeningCalendarDay')
+    days = []
+    for schedule in ExceptionalSchedule.objects.all():
+        moments = ('lunch', 'dinner') if schedule.moment == 'full_day' else (schedule.moment,)
+        day = schedule.start_date
+        while day <= (schedule.end_date or schedule.start_date):
+            for moment in moments:
+                days.append(OpeningCalendarDay(date=day, moment=moment, is_open=schedule.type == 'open', schedule=schedule))
+            day += timedelta(days=1)
+    OpeningCalendarDay.objects.bulk_create(days, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0004_alter_exceptionalschedule_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpeningCalendarDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('moment', models.CharField(choices=[('lunch', 'Midi'), ('dinner', 'Soir')], max_length=10)),
+                ('is_open', models.BooleanField()),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_days', to='backoffice.exceptionalschedule')),
+            ],
+            options={
+                'verbose_name': "Jour du calendrier d'ouverture",
+                'verbose_name_plural': "Calendrier d'ouverture",
+                'ordering': ['date', 'moment'],
+                'indexes': [models.Index(fields=['date', 'moment'], name='backoffice__date_5caff0_idx')],
+            },
+        ),
+        migrations.RunPython(build_calendar, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:23
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_slot_occupancy(apps, schema_editor):
+    Reservation = apps.get_model('backoffice', 'Reservation')
+    SlotOccupancy = apps.get_model('backoffice', 'SlotOccupancy')
+    rows = (
+        Reservation.objects.filter(status__in=('pending', 'accepted'))
+        .values('date', 'time')
+        .annotate(booked=Sum('party_size'))
+        .order_by()
+    )
+    SlotOccupancy.objects.bulk_create(
+        [SlotOccupancy(date=row['date'], time=row['time'], booked_covers=row['booked']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0006_outboundemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('booked_covers', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': "Occupation d'un créneau",
+                'verbose_name_plural': 'Occupation des créneaux',
+                'ordering': ['date', 'time'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'time'), name='unique_slot_occupancy')],
+            },
+        ),
+        migrations.RunPython(fill_slot_occupancy, migrations.RunPython.noop),
+    ]
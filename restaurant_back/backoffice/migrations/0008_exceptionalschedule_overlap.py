@@ -0,0 +1,79 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:26
+
+import django.db.models.functions.comparison
+from datetime import timedelta
+from django.db import migrations, models
+
+# Moments du calendrier couverts par un horaire
+CALENDAR_MOMENTS = {'full_day': ('lunch', 'dinner'), 'lunch': ('lunch',), 'dinner': ('dinner',)}
+
+# Ancienne contrainte d'exclusion PostgreSQL (dates seules), remplacée en 0019 par une contrainte par moment
+EXCLUSION_CONSTRAINT = 'exceptional_schedule_no_overlap'
+
+
+def resolve_overlaps(apps, schema_editor):
+    """
+    Chevauchements hérités (dates uniques non vérifiées jusqu'ici) corrigés sans interrompre la migration.
+
+    Le calendrier applique déjà l'horaire le plus récent sur un (jour, moment) en double :
+    les moments ainsi masqués sont retirés des horaires plus anciens, découpés en plages
+    de jours consécutifs (ou supprimés s'il ne leur reste rien). L'ouverture de chaque
+    (jour, moment) est inchangée.
+    """
+    ExceptionalSchedule = apps.get_model('backoffice', 'ExceptionalSchedule')
+    OpeningCalendarDay = apps.get_model('backoffice', 'OpeningCalendarDay')
+    covered = set()  # (jour, moment) des horaires plus récents
+    for schedule in ExceptionalSchedule.objects.order_by('-id'):
+        days = []
+        day = schedule.start_date
+        while day <= (schedule.end_date or schedule.start_date):
+            days.append((day, tuple(moment for moment in CALENDAR_MOMENTS[schedule.moment] if (day, moment) not in covered)))
+            day += timedelta(days=1)
+        covered.update((day, moment) for day, moments in days for moment in moments)
+        if all(moments == CALENDAR_MOMENTS[schedule.moment] for _, moments in days):
+            continue
+
+        runs = []  # [début, fin, moments restants]
+        for day, moments in days:
+            if runs and runs[-1][2] == moments:
+                runs[-1][1] = day
+            else:
+                runs.append([day, day, moments])
+        runs = [run for run in runs if run[2]]
+
+        OpeningCalendarDay.objects.filter(schedule=schedule).delete()
+        if not runs:
+            schedule.delete()
+            continue
+        for position, (start_date, end_date, moments) in enumerate(runs):
+            piece = schedule if position == 0 else ExceptionalSchedule(type=schedule.type)
+            piece.start_date = start_date
+            piece.end_date = end_date if end_date != start_date else None
+            piece.moment = 'full_day' if len(moments) == 2 else moments[0]
+            piece.save()
+            OpeningCalendarDay.objects.bulk_create(
+                OpeningCalendarDay(date=start_date + timedelta(days=offset), moment=moment, is_open=piece.type == 'open', schedule=piece)
+                for offset in range((end_date - start_date).days + 1)
+                for moment in moments
+            )
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"ALTER TABLE backoffice_exceptionalschedule DROP CONSTRAINT IF EXISTS {EXCLUSION_CONSTRAINT}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0007_slotoccupancy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exceptionalschedule',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('end_date', 'start_date'), models.F('start_date'), name='exceptional_schedule_span_idx'),
+        ),
+        migrations.RunPython(resolve_overlaps, drop_exclusion_constraint),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:30
+
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def fill_expires_at(apps, schema_editor):
+    PasswordResetToken = apps.get_model('backoffice', 'PasswordResetToken')
+    tokens = list(PasswordResetToken.objects.filter(expires_at__isnull=True))
+    for token in tokens:
+        token.expires_at = token.created_at + timedelta(seconds=token.expires_in)
+    PasswordResetToken.objects.bulk_update(tokens, ['expires_at'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0008_exceptionalschedule_overlap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordresettoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_expires_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='passwordresettoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True, editable=False),
+        ),
+    ]
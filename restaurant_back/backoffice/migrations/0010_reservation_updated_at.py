@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def fill_updated_at(apps, schema_editor):
+    Reservation = apps.get_model('backoffice', 'Reservation')
+    Reservation.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0009_passwordresettoken_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['updated_at', 'id'], name='backoffice__updated_96599b_idx'),
+        ),
+    ]
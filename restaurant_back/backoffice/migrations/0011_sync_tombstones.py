@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def fill_updated_at(apps, schema_editor):
+    ExceptionalSchedule = apps.get_model('backoffice', 'ExceptionalSchedule')
+    ExceptionalSchedule.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0010_reservation_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exceptionalschedule',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('reservation', 'Réservation'), ('schedule', 'Horaire exceptionnel')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Trace de suppression',
+                'verbose_name_plural': 'Traces de suppression',
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['deleted_at'], name='backoffice__deleted_7c6212_idx')],
+            },
+        ),
+    ]
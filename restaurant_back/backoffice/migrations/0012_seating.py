@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0011_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Table',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20, unique=True)),
+                ('capacity', models.PositiveIntegerField()),
+                ('combinable', models.BooleanField(default=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Table',
+                'verbose_name_plural': 'Tables',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TableAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('service', models.CharField(choices=[('lunch', 'Midi'), ('dinner', 'Soir')], max_length=10)),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='table_assignments', to='backoffice.reservation')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='backoffice.table')),
+            ],
+            options={
+                'verbose_name': 'Placement',
+                'verbose_name_plural': 'Placements',
+                'ordering': ['date', 'service', 'table'],
+                'indexes': [models.Index(fields=['date', 'service'], name='backoffice__date_b13a49_idx')],
+                'constraints': [models.UniqueConstraint(fields=('reservation', 'table'), name='unique_table_assignment')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0012_seating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('party_size', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('waiting', 'En attente'), ('promoted', 'Place attribuée'), ('cancelled', 'Annulée')], default='waiting', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('promoted_at', models.DateTimeField(blank=True, null=True)),
+                ('reservation', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entry', to='backoffice.reservation')),
+            ],
+            options={
+                'verbose_name': "Entrée de liste d'attente",
+                'verbose_name_plural': "Liste d'attente",
+                'ordering': ['date', 'time', 'created_at'],
+                'indexes': [models.Index(fields=['date', 'time', 'status', 'party_size', 'created_at'], name='backoffice__date_19ffaa_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'waiting')), fields=('email', 'date', 'time'), name='unique_waiting_entry')],
+            },
+        ),
+    ]
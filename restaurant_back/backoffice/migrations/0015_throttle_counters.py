@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0014_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('window_start', models.BigIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Compteur de limitation',
+                'verbose_name_plural': 'Compteurs de limitation',
+                'indexes': [models.Index(fields=['expires_at'], name='backoffice__expires_55ce73_idx')],
+                'constraints': [models.UniqueConstraint(fields=('key', 'window_start'), name='unique_throttle_window')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-17 13:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0015_throttle_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('email', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='backoffice.outboundemail')),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='backoffice.reservation')),
+            ],
+            options={
+                'verbose_name': 'Rappel envoyé',
+                'verbose_name_plural': 'Rappels envoyés',
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(fields=('reservation', 'date', 'time'), name='unique_reminder')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-17 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0017_cache_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatingPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('service', models.CharField(choices=[('lunch', 'Midi'), ('dinner', 'Soir')], max_length=10)),
+                ('replan_requested_at', models.DateTimeField(blank=True, null=True)),
+                ('pending_ids', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'verbose_name': 'Plan de salle',
+                'verbose_name_plural': 'Plans de salle',
+                'ordering': ['date', 'service'],
+                'indexes': [models.Index(fields=['replan_requested_at'], name='backoffice__replan__f5f81a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'service'), name='unique_seating_plan')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-17 14:02
+
+from django.db import migrations
+
+# Ancienne contrainte (0008, dates seules) : refusait un midi et un soir sur le même jour
+OLD_EXCLUSION_CONSTRAINT = 'exceptional_schedule_no_overlap'
+
+# Contrainte d'exclusion PostgreSQL : deux horaires ne peuvent pas couvrir le même jour et le même moment,
+# y compris en cas d'insertions concurrentes (end_date NULL = date unique). Moments en plages d'entiers :
+# midi [0, 1), soir [1, 2), journée entière [0, 2) ; midi et soir ne se chevauchent donc pas.
+EXCLUSION_CONSTRAINT = 'exceptional_schedule_no_moment_overlap'
+
+
+def replace_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"ALTER TABLE backoffice_exceptionalschedule DROP CONSTRAINT IF EXISTS {OLD_EXCLUSION_CONSTRAINT}")
+    schema_editor.execute(
+        f"""
+        ALTER TABLE backoffice_exceptionalschedule ADD CONSTRAINT {EXCLUSION_CONSTRAINT}
+        EXCLUDE USING gist (
+            daterange(start_date, COALESCE(end_date, start_date), '[]') WITH &&,
+            int4range(
+                CASE WHEN moment = 'dinner' THEN 1 ELSE 0 END,
+                CASE WHEN moment = 'lunch' THEN 1 ELSE 2 END
+            ) WITH &&
+        )
+        """
+    )
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f"ALTER TABLE backoffice_exceptionalschedule DROP CONSTRAINT IF EXISTS {EXCLUSION_CONSTRAINT}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backoffice', '0018_seating_plans'),
+    ]
+
+    operations = [
+        migrations.RunPython(replace_exclusion_constraint, drop_exclusion_constraint),
+    ]
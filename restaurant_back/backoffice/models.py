@@ -2,6 +2,9 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from datetime import timedelta
+from django.db.models.functions import Coalesce
+from django.core.serializers.json import DjangoJSONEncoder
 
 User = get_user_model()
 
@@ -10,15 +13,43 @@ class PasswordResetToken(models.Model):
     token = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     expires_in = models.IntegerField(default=3600)  # 1h en secondes
+    expires_at = models.DateTimeField(db_index=True, editable=False)  # Calculé à la création
+
+    def save(self, *args, **kwargs):
+        if self.expires_at is None:
+            self.expires_at = timezone.now() + timedelta(seconds=self.expires_in)
+        super().save(*args, **kwargs)
 
     def is_valid(self):
-        return (timezone.now() - self.created_at).seconds < self.expires_in
+        return timezone.now() < self.expires_at
 
     def __str__(self):
         return f"Token pour {self.user.email}"
 
 
 # ========== Modèle : Horaires exceptionnels ==========
+# Moments incompatibles sur un même jour : la journée entière exclut tout, midi et soir coexistent
+CONFLICTING_MOMENTS = {
+    'full_day': ('full_day', 'lunch', 'dinner'),
+    'lunch': ('full_day', 'lunch'),
+    'dinner': ('full_day', 'dinner'),
+}
+
+
+class ExceptionalScheduleQuerySet(models.QuerySet):
+    def overlapping(self, start_date, end_date, moment=None):
+        """
+        Horaires dont la période chevauche [start_date, end_date] (end_date NULL = date unique),
+        limités aux moments incompatibles avec `moment` s'il est précisé.
+        """
+        queryset = self.alias(
+            effective_end_date=Coalesce('end_date', 'start_date'),
+        ).filter(start_date__lte=end_date, effective_end_date__gte=start_date)
+        if moment is not None:
+            queryset = queryset.filter(moment__in=CONFLICTING_MOMENTS[moment])
+        return queryset
+
+
 class ExceptionalSchedule(models.Model):
     TYPE_CHOICES = (
         ('open', 'Ouverture exceptionnelle'),
@@ -35,6 +66,9 @@ class ExceptionalSchedule(models.Model):
     end_date = models.DateField(null=True, blank=True)  # Null pour une seule date
     moment = models.CharField(max_length=10, choices=MOMENT_CHOICES, default='full_day')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)  # Synchronisation incrémentale
+
+    objects = ExceptionalScheduleQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Horaire exceptionnel"
@@ -43,6 +77,8 @@ class ExceptionalSchedule(models.Model):
         indexes = [
             models.Index(fields=['start_date']),
             models.Index(fields=['type']),
+            # Fin effective en tête : les horaires passés sont écartés dès le parcours de l'index
+            models.Index(Coalesce('end_date', 'start_date'), 'start_date', name='exceptional_schedule_span_idx'),
         ]
 
     def clean(self):
@@ -70,6 +106,7 @@ class Reservation(models.Model):
     party_size = models.PositiveIntegerField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Flux de modifications et synchronisation
 
     class Meta:
         verbose_name = "Réservation"
@@ -78,7 +115,360 @@ class Reservation(models.Model):
         indexes = [
             models.Index(fields=['date', 'time']),
             models.Index(fields=['status']),
+            models.Index(fields=['updated_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.date} à {self.time}"
+
+# ========== Modèle : Calendrier d'ouverture matérialisé ==========
+class OpeningCalendarDay(models.Model):
+    """
+    Une ligne par (date, moment) couverte par un horaire exceptionnel.
+
+    Les jours sans ligne suivent la règle hebdomadaire habituelle ;
+    maintenu à jour à chaque création / modification / suppression d'horaire.
+    """
+    MOMENT_CHOICES = (
+        ('lunch', 'Midi'),
+        ('dinner', 'Soir'),
+    )
+
+    date = models.DateField()
+    moment = models.CharField(max_length=10, choices=MOMENT_CHOICES)
+    is_open = models.BooleanField()
+    schedule = models.ForeignKey(ExceptionalSchedule, on_delete=models.CASCADE, related_name='calendar_days')
+
+    class Meta:
+        verbose_name = "Jour du calendrier d'ouverture"
+        verbose_name_plural = "Calendrier d'ouverture"
+        ordering = ['date', 'moment']
+        indexes = [
+            models.Index(fields=['date', 'moment']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.get_moment_display()} - {'ouvert' if self.is_open else 'fermé'}"
+
+
+# ========== Modèle : File d'envoi des e-mails ==========
+class OutboundEmail(models.Model):
+    """
+    E-mail en attente d'envoi, traité en arrière-plan par `process_email_queue`.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'En attente'),
+        ('sent', 'Envoyé'),
+        ('failed', 'Échec définitif'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)  # Vide = DEFAULT_FROM_EMAIL à l'envoi
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "E-mail sortant"
+        verbose_name_plural = "E-mails sortants"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.get_status_display()})"
+
+
+# ========== Modèle : Occupation des créneaux ==========
+class SlotOccupancy(models.Model):
+    """
+    Compteur de couverts occupés par créneau (date, heure).
+
+    Incrémenté de façon atomique par la réservation publique, recalculé
+    à partir des réservations lors des modifications côté backoffice.
+    """
+    date = models.DateField()
+    time = models.TimeField()
+    booked_covers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Occupation d'un créneau"
+        verbose_name_plural = "Occupation des créneaux"
+        ordering = ['date', 'time']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'time'], name='unique_slot_occupancy'),
         ]
 
     def __str__(self):
-        return f"{self.name} - {self.date} à {self.time}"
\ No newline at end of file
+        return f"{self.date} à {self.time} : {self.booked_covers} couvert(s)"
+
+
+# ========== Modèle : Traces de suppression ==========
+class Tombstone(models.Model):
+    """
+    Trace d'une réservation ou d'un horaire supprimé, pour la synchronisation incrémentale.
+
+    Conservée SYNC_TOMBSTONE_RETENTION_DAYS jours (purge_expired).
+    """
+    MODEL_CHOICES = (
+        ('reservation', 'Réservation'),
+        ('schedule', 'Horaire exceptionnel'),
+    )
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Trace de suppression"
+        verbose_name_plural = "Traces de suppression"
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_model_display()} {self.object_id} supprimé le {self.deleted_at}"
+
+
+# ========== Modèles : Tables et placement ==========
+class Table(models.Model):
+    """
+    Table de la salle. Les tables « assemblables » peuvent être réunies
+    pour les groupes trop grands pour une seule table.
+    """
+    name = models.CharField(max_length=20, unique=True)
+    capacity = models.PositiveIntegerField()
+    combinable = models.BooleanField(default=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Table"
+        verbose_name_plural = "Tables"
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.capacity} places)"
+
+
+class TableAssignment(models.Model):
+    """
+    Table (ou une des tables assemblées) attribuée à une réservation acceptée.
+
+    date et service sont recopiés de la réservation pour lire le plan d'un
+    service sur un seul index, sans jointure.
+    """
+    SERVICE_CHOICES = (
+        ('lunch', 'Midi'),
+        ('dinner', 'Soir'),
+    )
+
+    reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE, related_name='table_assignments')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='assignments')
+    date = models.DateField()
+    service = models.CharField(max_length=10, choices=SERVICE_CHOICES)
+
+    class Meta:
+        verbose_name = "Placement"
+        verbose_name_plural = "Placements"
+        ordering = ['date', 'service', 'table']
+        indexes = [
+            models.Index(fields=['date', 'service']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['reservation', 'table'], name='unique_table_assignment'),
+        ]
+
+    def __str__(self):
+        return f"{self.table.name} : réservation {self.reservation_id} ({self.date} {self.get_service_display()})"
+
+
+class SeatingPlan(models.Model):
+    """
+    État du plan de salle d'un service (date + service).
+
+    Sa ligne sert de verrou : un seul calcul de placement à la fois pour un service,
+    les autres services sont recalculés en parallèle. Un recalcul complet demandé
+    par une modification de réservation est fait par le worker (`process_seating_queue`),
+    hors de la requête HTTP.
+    """
+    date = models.DateField()
+    service = models.CharField(max_length=10, choices=TableAssignment.SERVICE_CHOICES)
+    replan_requested_at = models.DateTimeField(null=True, blank=True)  # Null : aucun recalcul en attente
+    pending_ids = models.JSONField(default=list, blank=True)  # Réservations modifiées à placer en priorité
+
+    class Meta:
+        verbose_name = "Plan de salle"
+        verbose_name_plural = "Plans de salle"
+        ordering = ['date', 'service']
+        indexes = [
+            models.Index(fields=['replan_requested_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'service'], name='unique_seating_plan'),
+        ]
+
+    def __str__(self):
+        return f"Plan du {self.date} ({self.get_service_display()})"
+
+
+# ========== Modèle : Liste d'attente ==========
+class WaitlistEntry(models.Model):
+    """
+    Client en attente d'une place sur un créneau complet.
+
+    Quand des couverts se libèrent, le groupe le plus grand qui tient dans les
+    places libres (puis le plus ancien) reçoit une réservation « en attente ».
+    L'index (date, time, status, party_size, created_at) sert de file de priorité
+    par créneau : chaque promotion lit une seule entrée, jamais toute la liste.
+    """
+    STATUS_CHOICES = (
+        ('waiting', 'En attente'),
+        ('promoted', 'Place attribuée'),
+        ('cancelled', 'Annulée'),
+    )
+
+    name = models.CharField(max_length=100)
+    email = models.EmailField()
+    phone = models.CharField(max_length=20, blank=True, null=True)
+    date = models.DateField()
+    time = models.TimeField()
+    party_size = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='waiting')
+    reservation = models.OneToOneField(
+        Reservation, on_delete=models.SET_NULL, null=True, blank=True, related_name='waitlist_entry'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    promoted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Entrée de liste d'attente"
+        verbose_name_plural = "Liste d'attente"
+        ordering = ['date', 'time', 'created_at']
+        indexes = [
+            models.Index(fields=['date', 'time', 'status', 'party_size', 'created_at']),
+        ]
+        constraints = [
+            # Une seule inscription active par client et par créneau
+            models.UniqueConstraint(
+                fields=['email', 'date', 'time'],
+                condition=models.Q(status='waiting'),
+                name='unique_waiting_entry',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.date} {self.time} ({self.party_size} pers., {self.get_status_display()})"
+
+
+# ========== Modèle : Clés d'idempotence ==========
+class IdempotencyKey(models.Model):
+    """
+    Réponse mémorisée d'une requête envoyée avec l'en-tête Idempotency-Key.
+
+    Une nouvelle tentative avec la même clé (même utilisateur, même méthode,
+    même URL) rejoue cette réponse sans réexécuter la requête. L'empreinte du
+    corps détecte la réutilisation d'une clé pour une requête différente.
+    """
+    key = models.CharField(max_length=255)
+    scope = models.CharField(max_length=255)  # utilisateur, méthode et chemin
+    fingerprint = models.CharField(max_length=64)  # SHA-256 du corps de la requête
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Clé d'idempotence"
+        verbose_name_plural = "Clés d'idempotence"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.scope})"
+
+
+# ========== Modèle : Compteurs de limitation ==========
+class ThrottleCounter(models.Model):
+    """
+    Compteur de requêtes d'une clé de limitation (IP, email ou créneau) sur une fenêtre de temps.
+
+    Partagé par tous les workers, contrairement au cache local. Au plus deux
+    lignes par clé (fenêtre courante et précédente) : les plus anciennes sont
+    supprimées à l'ouverture d'une nouvelle fenêtre ou par `purge_expired`.
+    """
+    key = models.CharField(max_length=64)  # SHA-256 de « portée:type:identifiant »
+    window_start = models.BigIntegerField()  # Début de la fenêtre, en secondes depuis l'epoch
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField()  # Fin de la fenêtre suivante : compteur inutile au-delà
+
+    class Meta:
+        verbose_name = "Compteur de limitation"
+        verbose_name_plural = "Compteurs de limitation"
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'window_start'], name='unique_throttle_window'),
+        ]
+
+    def __str__(self):
+        return f"{self.key[:12]}… @ {self.window_start} : {self.count}"
+
+
+# ========== Modèle : Rappels envoyés ==========
+class ReminderLog(models.Model):
+    """
+    Rappel mis en file pour une réservation, pour ne jamais l'envoyer deux fois.
+
+    La date et l'heure du rappel sont conservées : une réservation déplacée
+    après son rappel en recevra un nouveau pour le nouveau créneau.
+    """
+    reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE, related_name='reminders')
+    date = models.DateField()
+    time = models.TimeField()
+    email = models.ForeignKey(OutboundEmail, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Rappel envoyé"
+        verbose_name_plural = "Rappels envoyés"
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['reservation', 'date', 'time'], name='unique_reminder'),
+        ]
+
+    def __str__(self):
+        return f"Rappel réservation {self.reservation_id} ({self.date} {self.time})"
+
+
+# ========== Modèle : Versions des caches ==========
+class CacheVersion(models.Model):
+    """
+    Version courante de données mises en cache (horaires exceptionnels, époques des tokens JWT, ...).
+
+    Conservée en base pour être vue par tous les processus (workers, commandes
+    `import_data` ou `rebuild_opening_calendar`) : changer la version rend
+    inaccessibles les entrées dérivées dans le cache de chaque worker.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    etag = models.CharField(max_length=32)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Version de cache"
+        verbose_name_plural = "Versions de cache"
+
+    def __str__(self):
+        return f"{self.name} : {self.etag} ({self.updated_at})"
@@ -0,0 +1,77 @@
+# backoffice/opening_calendar.py
+
+from datetime import timedelta
+from django.db import transaction
+
+from backoffice.models import ExceptionalSchedule, OpeningCalendarDay
+
+# Jours habituellement fermés : dimanche et lundi (Lundi=0, Dimanche=6)
+REGULAR_CLOSED_WEEKDAYS = (0, 6)
+
+# Moments d'un horaire exceptionnel couverts par une ligne du calendrier
+CALENDAR_MOMENTS = tuple(value for value, _ in OpeningCalendarDay.MOMENT_CHOICES)
+
+
+def is_regularly_open(day):
+    """Règle hebdomadaire habituelle, hors horaires exceptionnels."""
+    return day.weekday() not in REGULAR_CLOSED_WEEKDAYS
+
+
+def build_calendar_days(schedule):
+    """Lignes du calendrier (non enregistrées) correspondant à un horaire exceptionnel."""
+    moments = CALENDAR_MOMENTS if schedule.moment == 'full_day' else (schedule.moment,)
+    end_date = schedule.end_date or schedule.start_date
+    is_open = schedule.type == 'open'
+
+    days = []
+    day = schedule.start_date
+    while day <= end_date:
+        for moment in moments:
+            days.append(OpeningCalendarDay(date=day, moment=moment, is_open=is_open, schedule=schedule))
+        day += timedelta(days=1)
+    return days
+
+
+def rebuild_for_schedule(schedule):
+    """Reconstruit uniquement les lignes d'un horaire (appelé après chaque enregistrement)."""
+    with transaction.atomic():
+        OpeningCalendarDay.objects.filter(schedule=schedule).delete()
+        OpeningCalendarDay.objects.bulk_create(build_calendar_days(schedule))
+
+
+def rebuild_all():
+    """Reconstruction complète du calendrier à partir de tous les horaires exceptionnels."""
+    with transaction.atomic():
+        OpeningCalendarDay.objects.all().delete()
+        days = []
+        for schedule in ExceptionalSchedule.objects.iterator():
+            days.extend(build_calendar_days(schedule))
+        OpeningCalendarDay.objects.bulk_create(days, batch_size=1000)
+    return len(days)
+
+
+def get_overrides(start, end):
+    """
+    Surcharges {(date, moment): is_open} sur la période, en un seul parcours d'index.
+
+    En cas de doublon sur un même (date, moment), l'horaire le plus récent l'emporte.
+    """
+    rows = (
+        OpeningCalendarDay.objects.filter(date__range=(start, end))
+        .order_by('schedule_id')
+        .values_list('date', 'moment', 'is_open')
+    )
+    return {(day, moment): is_open for day, moment, is_open in rows}
+
+
+def is_moment_open(day, moment, overrides):
+    """Ouverture d'un service un jour donné, à partir des surcharges déjà chargées."""
+    is_open = overrides.get((day, moment))
+    if is_open is None:
+        return is_regularly_open(day)
+    return is_open
+
+
+def is_open(day, moment):
+    """Ouverture d'un service un jour donné : une seule recherche sur l'index (date, moment)."""
+    return is_moment_open(day, moment, get_overrides(day, day))
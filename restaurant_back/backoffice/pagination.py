@@ -0,0 +1,140 @@
+# backoffice/pagination.py
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, time
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class ReservationCursorPagination(BasePagination):
+    """
+    Pagination par curseur (keyset) sur l'index (date, time) des réservations.
+
+    Le curseur encode la position (date, time, id) de la dernière ligne renvoyée :
+    la page suivante est lue avec un WHERE sur l'index au lieu d'un OFFSET,
+    le coût reste donc constant quelle que soit la profondeur de la page.
+    """
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Curseur invalide.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        if reverse:
+            queryset = queryset.order_by('-date', '-time', '-id')
+        else:
+            queryset = queryset.order_by('date', 'time', 'id')
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position, reverse))
+
+        # Une ligne de plus pour savoir s'il reste une page après celle-ci
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_position_filter(self, position, reverse):
+        """
+        Équivalent de (date, time, id) > position, écrit pour que la borne sur
+        `date` reste une condition d'intervalle exploitable par l'index.
+        """
+        position_date, position_time, position_id = position
+        if reverse:
+            return Q(date__lte=position_date) & (
+                Q(date__lt=position_date)
+                | Q(time__lt=position_time)
+                | Q(time=position_time, id__lt=position_id)
+            )
+        return Q(date__gte=position_date) & (
+            Q(date__gt=position_date)
+            | Q(time__gt=position_time)
+            | Q(time=position_time, id__gt=position_id)
+        )
+
+    def get_position(self, item):
+        # Lignes .values() (sérialisation rapide de la liste) ou instances du modèle
+        if isinstance(item, dict):
+            return item['date'], item['time'], item['id']
+        return item.date, item.time, item.pk
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            raw = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            position_date, position_time, position_id, direction = raw.split('|')
+            position = (
+                date.fromisoformat(position_date),
+                time.fromisoformat(position_time),
+                int(position_id),
+            )
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if direction not in ('f', 'r'):
+            raise NotFound(self.invalid_cursor_message)
+        return position, direction == 'r'
+
+    def encode_cursor(self, position, reverse):
+        position_date, position_time, position_id = position
+        raw = f"{position_date.isoformat()}|{position_time.isoformat()}|{position_id}|{'r' if reverse else 'f'}"
+        encoded = urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Page vide atteinte en arrière : on repart du début
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,74 @@
+# backoffice/password_reset.py
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from backoffice.mail_queue import enqueue_email
+from backoffice.models import PasswordResetToken
+
+RESET_SUBJECT = "Réinitialisation de votre mot de passe"
+
+
+def build_reset_link(user_id, token):
+    # 🌐 Lien vers le frontend de réinitialisation
+    protocol = "https" if not settings.DEBUG else "http"
+    return f"{protocol}://{settings.DOMAIN_NAME}/reset-password/{user_id}/{token}/"
+
+
+def build_reset_message(user, reset_link):
+    return f"""
+Bonjour {user.username},
+
+Vous avez demandé à réinitialiser votre mot de passe. Veuillez cliquer sur le lien suivant pour continuer :
+{reset_link}
+
+Ce lien est valide pendant 1 heure.
+
+L'équipe du restaurant
+        """
+
+
+def create_reset_request(user, email):
+    """
+    Crée le token et met l'email en file dans la même transaction
+    (envoi en arrière-plan par `process_email_queue`). Retourne le lien.
+    """
+    token = get_random_string(60)
+    reset_link = build_reset_link(user.id, token)
+    with transaction.atomic():
+        PasswordResetToken.objects.create(user=user, token=token)
+        enqueue_email(RESET_SUBJECT, build_reset_message(user, reset_link), [email], settings.DEFAULT_FROM_EMAIL)
+    return reset_link
+
+
+def valid_tokens(user_id, token):
+    """Token non expiré (écarté directement en base grâce à l'index sur expires_at)."""
+    return PasswordResetToken.objects.select_related('user').filter(
+        token=token, user_id=user_id, expires_at__gt=timezone.now()
+    )
+
+
+def consume_token(reset_token, new_password):
+    """Met à jour le mot de passe et supprime le token utilisé, atomiquement."""
+    user = reset_token.user
+    user.set_password(new_password)
+    save_password(user, reset_token)
+
+
+def save_password(user, reset_token):
+    with transaction.atomic():
+        user.save()
+        reset_token.delete()
+
+
+async def aconsume_token(reset_token, new_password):
+    """
+    Version async : le hachage du mot de passe (coûteux en CPU) part dans un
+    thread pour ne pas bloquer la boucle d'événements, l'écriture transactionnelle aussi.
+    """
+    user = reset_token.user
+    await sync_to_async(user.set_password, thread_sensitive=False)(new_password)
+    await sync_to_async(save_password)(user, reset_token)
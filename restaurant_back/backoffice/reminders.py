@@ -0,0 +1,73 @@
+# backoffice/reminders.py
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from backoffice.models import OutboundEmail, ReminderLog, Reservation
+
+REMINDER_SUBJECT = "Rappel : votre réservation au restaurant"
+
+
+def build_reminder_message(row):
+    return f"""
+Bonjour {row['name']},
+
+Nous vous rappelons votre réservation du {row['date'].strftime('%d/%m/%Y')} à {row['time'].strftime('%H:%M')} pour {row['party_size']} personne(s).
+Nous avons hâte de vous accueillir !
+
+En cas d'empêchement, merci de prévenir le restaurant.
+
+L'équipe du restaurant
+        """
+
+
+def due_reservations(day, start=None, end=None):
+    """
+    Réservations acceptées du jour (heures dans [start, end[ si précisées) sans rappel pour ce créneau.
+
+    Une seule requête : parcours de l'index (date, time), rappels déjà envoyés
+    écartés par un NOT EXISTS sur la contrainte unique de ReminderLog.
+    """
+    queryset = Reservation.objects.filter(date=day, status='accepted').exclude(email='')
+    if start is not None:
+        queryset = queryset.filter(time__gte=start)
+    if end is not None:
+        queryset = queryset.filter(time__lt=end)
+    already_sent = ReminderLog.objects.filter(reservation=OuterRef('pk'), date=OuterRef('date'), time=OuterRef('time'))
+    return queryset.filter(~Exists(already_sent)).order_by('time', 'id')
+
+
+def queue_reminders(day, start=None, end=None):
+    """
+    Met en file les rappels dus, en une passe quelle que soit la taille de la journée.
+
+    - Réservations dues verrouillées (SKIP LOCKED) : deux exécutions simultanées
+      ne traitent pas les mêmes
+    - Messages rendus en mémoire, e-mails puis traces créés par deux bulk_create
+      dans la même transaction : un rappel est en file si et seulement s'il est tracé,
+      une nouvelle exécution ne le renvoie donc jamais
+
+    Retourne le nombre de rappels mis en file.
+    """
+    with transaction.atomic():
+        rows = list(
+            due_reservations(day, start, end)
+            .select_for_update(skip_locked=True)
+            .values('id', 'name', 'email', 'date', 'time', 'party_size')
+        )
+        if not rows:
+            return 0
+        emails = OutboundEmail.objects.bulk_create([
+            OutboundEmail(
+                subject=REMINDER_SUBJECT,
+                body=build_reminder_message(row),
+                from_email='',  # DEFAULT_FROM_EMAIL à l'envoi
+                recipients=[row['email']],
+            )
+            for row in rows
+        ])
+        ReminderLog.objects.bulk_create([
+            ReminderLog(reservation_id=row['id'], date=row['date'], time=row['time'], email=email)
+            for row, email in zip(rows, emails)
+        ])
+    return len(rows)
@@ -0,0 +1,56 @@
+# backoffice/schedule_cache.py
+
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from backoffice.models import CacheVersion
+from backoffice.opening_calendar import get_overrides, is_moment_open
+
+# Ligne CacheVersion des horaires exceptionnels
+VERSION_NAME = 'schedules'
+
+
+def new_version():
+    return {'etag': uuid.uuid4().hex, 'updated_at': timezone.now().replace(microsecond=0)}
+
+
+def get_version():
+    """
+    Version courante des horaires {'etag': str, 'last_modified': timestamp}, créée au premier appel.
+
+    Lue en base (une requête sur un index unique) et non dans le cache : le cache
+    par défaut est propre à chaque processus, alors que la version doit changer
+    pour tous les workers dès qu'un horaire est modifié, y compris par une commande.
+    """
+    row = CacheVersion.objects.filter(name=VERSION_NAME).values_list('etag', 'updated_at').first()
+    if row is None:
+        version, _ = CacheVersion.objects.get_or_create(name=VERSION_NAME, defaults=new_version())
+        row = (version.etag, version.updated_at)
+    return {'etag': row[0], 'last_modified': int(row[1].timestamp())}
+
+
+def invalidate():
+    """Change la version : toutes les entrées dérivées des horaires deviennent inaccessibles, dans tous les processus."""
+    CacheVersion.objects.update_or_create(name=VERSION_NAME, defaults=new_version())
+
+
+def cached(name, builder):
+    """Valeur dérivée des horaires exceptionnels, recalculée une fois par version."""
+    key = f"schedules:{get_version()['etag']}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, settings.SCHEDULE_CACHE_TIMEOUT)
+    return value
+
+
+def cached_overrides(start, end):
+    """Surcharges du calendrier d'ouverture {(date, moment): is_open} sur la période, via le cache."""
+    return cached(f"overrides:{start.isoformat()}:{end.isoformat()}", lambda: get_overrides(start, end))
+
+
+def is_open(day, moment):
+    """Ouverture d'un service un jour donné : une lecture de la version tant que les horaires n'ont pas changé."""
+    return is_moment_open(day, moment, cached_overrides(day, day))
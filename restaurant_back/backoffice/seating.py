@@ -0,0 +1,426 @@
+# backoffice/seating.py
+
+import itertools
+import random
+import time as clock
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from backoffice.availability import get_services, service_for_time
+from backoffice.intervals import IntervalIndex
+from backoffice.models import Reservation, SeatingPlan, Table, TableAssignment
+
+
+def to_minutes(slot_time):
+    return slot_time.hour * 60 + slot_time.minute
+
+
+class Floor:
+    """
+    Occupation des tables pendant un service : un IntervalIndex de minutes par table.
+
+    Une réservation à `time` occupe sa ou ses tables de `time` à
+    `time + table_duration` (exclu) : une table libérée à 21:00 resert au créneau de 21:00.
+    """
+
+    def __init__(self, tables, duration):
+        self.tables = tables
+        self.duration = duration
+        self.occupied = {table.id: IntervalIndex() for table in tables}
+
+    def span(self, slot_time):
+        start = to_minutes(slot_time)
+        return start, start + self.duration - 1  # Bornes incluses, comme IntervalIndex
+
+    def occupy(self, table_ids, slot_time):
+        # Attributions existantes acceptées même si elles se recouvrent (durée de table modifiée) : fusionnées
+        start, end = self.span(slot_time)
+        for table_id in table_ids:
+            if table_id in self.occupied:  # Table désactivée depuis : ignorée
+                self.occupied[table_id].add(start, end)
+
+    def find(self, party_size, slot_time, max_combination):
+        """
+        Tables libres pour un groupe, None si rien ne convient.
+
+        - La plus petite table qui suffit à elle seule (best-fit)
+        - Sinon l'assemblage de tables assemblables de plus petite capacité totale,
+          puis du plus petit nombre de tables. Les tables de même capacité étant
+          interchangeables, seuls les multiensembles de capacités sont énumérés.
+        """
+        start, end = self.span(slot_time)
+        free = [table for table in self.tables if not self.occupied[table.id].overlaps(start, end)]
+
+        single = [table for table in free if table.capacity >= party_size]
+        if single:
+            return [min(single, key=lambda table: (table.capacity, table.id))]
+
+        by_capacity = defaultdict(list)
+        for table in free:
+            if table.combinable:
+                by_capacity[table.capacity].append(table)
+        best = None
+        for size in range(2, max_combination + 1):
+            for capacities in itertools.combinations_with_replacement(sorted(by_capacity), size):
+                total = sum(capacities)
+                if total < party_size or (best is not None and (total, size) >= best[0]):
+                    continue
+                if all(capacities.count(capacity) <= len(by_capacity[capacity]) for capacity in set(capacities)):
+                    best = ((total, size), capacities)
+        if best is None:
+            return None
+
+        used = defaultdict(int)
+        tables = []
+        for capacity in best[1]:
+            tables.append(by_capacity[capacity][used[capacity]])
+            used[capacity] += 1
+        return tables
+
+
+def place(floor, reservations, max_combination):
+    """
+    Placement glouton des réservations [(id, time, party_size), ...] dans l'ordre donné.
+
+    Retourne ({reservation_id: [table, ...]}, [réservations non placées]).
+    """
+    assignments = {}
+    unseated = []
+    for reservation in reservations:
+        tables = floor.find(reservation[2], reservation[1], max_combination)
+        if tables is None:
+            unseated.append(reservation)
+            continue
+        floor.occupy([table.id for table in tables], reservation[1])
+        assignments[reservation[0]] = tables
+    return assignments, unseated
+
+
+def score(reservations, assignments, unseated):
+    """Plus petit = meilleur : couverts non placés, puis places perdues (tables trop grandes)."""
+    sizes = {reservation[0]: reservation[2] for reservation in reservations}
+    wasted = sum(sum(table.capacity for table in tables) - sizes[pk] for pk, tables in assignments.items())
+    return sum(reservation[2] for reservation in unseated), wasted
+
+
+def solve(reservations, tables, duration, time_budget=None, max_combination=None, seed=0, required=()):
+    """
+    Plan d'un service entier.
+
+    - Premier passage glouton : les plus grands groupes d'abord, chacun sur la plus petite
+      table (ou le plus petit assemblage) libre pendant toute sa durée
+    - Tant qu'il reste des groupes non placés et du temps (SEATING_TIME_BUDGET), nouveaux
+      passages avec un ordre légèrement perturbé ; le meilleur plan est conservé
+    - Le premier passage est toujours complet : le budget ne borne que les essais suivants
+    - Avec `required` (ids), arrêt au premier plan qui place toutes ces réservations
+
+    Retourne ({reservation_id: [table, ...]}, [réservations non placées]).
+    """
+    time_budget = settings.SEATING_TIME_BUDGET if time_budget is None else time_budget
+    max_combination = max_combination or settings.SEATING_MAX_COMBINATION
+    deadline = clock.monotonic() + time_budget
+    rng = random.Random(seed)
+
+    order = sorted(reservations, key=lambda reservation: (-reservation[2], reservation[1], reservation[0]))
+    best = None
+    while True:
+        assignments, unseated = place(Floor(tables, duration), order, max_combination)
+        result_score = score(reservations, assignments, unseated)
+        if required and all(pk in assignments for pk in required):
+            return assignments, unseated
+        if best is None or result_score < best[0]:
+            best = (result_score, assignments, unseated)
+        if not best[2] or clock.monotonic() >= deadline:
+            return best[1], best[2]
+        # Perturbation : taille du groupe bruitée, les grands groupes restent globalement en tête
+        order = sorted(reservations, key=lambda reservation: -reservation[2] - rng.uniform(0, 3))
+
+
+# ======================
+# Lecture et écriture du plan en base
+# ======================
+
+def active_tables():
+    return list(Table.objects.filter(is_active=True).order_by('capacity', 'id'))
+
+
+def lock_service(day, service, skip_locked=False):
+    """
+    Ligne SeatingPlan du service, verrouillée jusqu'à la fin de la transaction.
+
+    Un seul calcul de placement à la fois par service : deux replanifications
+    concurrentes ne peuvent pas attribuer la même table sur le même horaire,
+    et les changements sur d'autres services ne les attendent pas.
+    Avec `skip_locked`, None si un autre processus tient déjà le verrou.
+    """
+    SeatingPlan.objects.get_or_create(date=day, service=service)
+    return SeatingPlan.objects.select_for_update(skip_locked=skip_locked).filter(date=day, service=service).first()
+
+
+def accepted_reservations(day, service, services):
+    """Réservations acceptées du service [(id, time, party_size), ...], lues via l'index (date, time)."""
+    return list(
+        Reservation.objects.filter(date=day, time__in=services[service]['slots'], status='accepted')
+        .order_by('time', 'id')
+        .values_list('id', 'time', 'party_size')
+    )
+
+
+def save_assignments(day, service, assignments):
+    TableAssignment.objects.bulk_create([
+        TableAssignment(reservation_id=reservation_id, table=table, date=day, service=service)
+        for reservation_id, tables in assignments.items()
+        for table in tables
+    ])
+
+
+def replan(day, service, tables, services, changed_ids=()):
+    """
+    Recalcule tout le plan du service (service déjà verrouillé par l'appelant, `lock_service`).
+
+    Avec `changed_ids`, le nouveau plan n'est retenu que s'il place ces réservations
+    sans placer moins de couverts que le plan actuel (sinon None, rien ne bouge).
+    """
+    reservations = accepted_reservations(day, service, services)
+    required = {reservation[0] for reservation in reservations} & set(changed_ids)
+    assignments, unseated = solve(reservations, tables, services[service]['table_duration'], required=required)
+    if changed_ids:
+        sizes = {reservation[0]: reservation[2] for reservation in reservations}
+        current = dict(TableAssignment.objects.filter(date=day, service=service).values_list('reservation_id', 'reservation__party_size'))
+        if not required.issubset(assignments) or sum(sizes[pk] for pk in assignments) < sum(current.values()):
+            return None
+    TableAssignment.objects.filter(date=day, service=service).delete()
+    save_assignments(day, service, assignments)
+    return assignments, unseated
+
+
+def clear_request(plan):
+    plan.replan_requested_at = None
+    plan.pending_ids = []
+    plan.save(update_fields=['replan_requested_at', 'pending_ids'])
+
+
+def plan_service(day, service):
+    """
+    Plan complet d'un service : toutes les attributions du service sont recalculées.
+
+    Retourne ({reservation_id: [table, ...]}, [réservations non placées]).
+    """
+    services = get_services()
+    with transaction.atomic():
+        plan = lock_service(day, service)
+        result = replan(day, service, active_tables(), services)
+        clear_request(plan)  # Recalcul en attente devenu inutile
+    return result
+
+
+def request_replan(plan, changed_ids):
+    """Demande au worker un recalcul complet du service, qui devra placer `changed_ids`."""
+    plan.replan_requested_at = plan.replan_requested_at or timezone.now()
+    plan.pending_ids = sorted(set(plan.pending_ids) | set(changed_ids))
+    plan.save(update_fields=['replan_requested_at', 'pending_ids'])
+
+
+def process_replans(batch_size=10):
+    """
+    Recalculs complets demandés par `reseat`, exécutés par le worker (`process_seating_queue`).
+
+    - Plus anciennes demandes d'abord ; un service verrouillé par un autre worker
+      ou par une modification en cours est laissé pour le passage suivant
+    - Même règle que la replanification en ligne : le nouveau plan n'est retenu que
+      s'il place les réservations modifiées sans placer moins de couverts
+
+    Retourne le nombre de services traités.
+    """
+    services = get_services()
+    processed = 0
+    pending = list(
+        SeatingPlan.objects.filter(replan_requested_at__isnull=False)
+        .order_by('replan_requested_at')
+        .values_list('date', 'service')[:batch_size]
+    )
+    for day, service in pending:
+        with transaction.atomic():
+            plan = lock_service(day, service, skip_locked=True)
+            if plan is None or plan.replan_requested_at is None:
+                continue  # Traité entre-temps
+            if service in services:
+                replan(day, service, active_tables(), services, plan.pending_ids)
+            clear_request(plan)
+        processed += 1
+    return processed
+
+
+def relocate(tables, duration, seated, reservation, max_combination):
+    """
+    Place `reservation` en déplaçant au plus un groupe déjà placé sur son horaire.
+
+    `seated` : {reservation_id: (time, party_size, [table_id, ...])}. Les groupes
+    qui gaspillent le plus de places sont essayés d'abord. Retourne les nouvelles
+    attributions {reservation_id: [table, ...]} (la réservation et le groupe
+    déplacé), ou None.
+    """
+    capacities = {table.id: table.capacity for table in tables}
+    start = to_minutes(reservation[1])
+    candidates = sorted(
+        (
+            (other_id, other_time, other_size)
+            for other_id, (other_time, other_size, table_ids) in seated.items()
+            if abs(to_minutes(other_time) - start) < duration
+        ),
+        key=lambda other: (other[2] - sum(capacities.get(pk, 0) for pk in seated[other[0]][2]), other[0]),
+    )
+    for other_id, other_time, other_size in candidates:
+        floor = Floor(tables, duration)
+        for pk, (slot_time, _, table_ids) in seated.items():
+            if pk != other_id:
+                floor.occupy(table_ids, slot_time)
+        found = floor.find(reservation[2], reservation[1], max_combination)
+        if found is None:
+            continue
+        floor.occupy([table.id for table in found], reservation[1])
+        moved = floor.find(other_size, other_time, max_combination)
+        if moved is not None:
+            return {reservation[0]: found, other_id: moved}
+    return None
+
+
+def room_can_fit(tables, duration, seated, reservation):
+    """
+    Condition nécessaire pour qu'un plan complet place `reservation` sans retirer personne :
+    à chaque instant de son horaire, couverts déjà placés + groupe <= places de la salle.
+    Évite un recalcul complet (tout le budget de temps) voué à l'échec.
+    """
+    seats = sum(table.capacity for table in tables)
+    start = to_minutes(reservation[1])
+    placed = [(to_minutes(slot_time), party_size) for slot_time, party_size, _ in seated.values()]
+    for instant in {start} | {other for other, _ in placed if start <= other < start + duration}:
+        busy = sum(party_size for other, party_size in placed if other <= instant < other + duration)
+        if busy + reservation[2] > seats:
+            return False
+    return True
+
+
+def fill_service(day, service, tables, services, changed_ids):
+    """
+    Place les réservations acceptées sans table autour des attributions existantes.
+
+    - Les groupes déjà placés ne bougent pas, sauf un au plus par réservation
+      modifiée qui ne trouve pas de place autrement (`relocate`)
+    - Retourne False si une des réservations modifiées (`changed_ids`) reste sans table
+      alors qu'un plan complet pourrait la placer (`room_can_fit`) ; une salle simplement
+      pleine la laisse sans table, sans déplacer les autres groupes
+    """
+    duration = services[service]['table_duration']
+    max_combination = settings.SEATING_MAX_COMBINATION
+    seated = {}
+    for reservation_id, table_id, slot_time, party_size in TableAssignment.objects.filter(date=day, service=service).values_list(
+        'reservation_id', 'table_id', 'reservation__time', 'reservation__party_size'
+    ):
+        seated.setdefault(reservation_id, (slot_time, party_size, []))[2].append(table_id)
+    floor = Floor(tables, duration)
+    for slot_time, _, table_ids in seated.values():
+        floor.occupy(table_ids, slot_time)
+
+    waiting = [reservation for reservation in accepted_reservations(day, service, services) if reservation[0] not in seated]
+    waiting.sort(key=lambda reservation: (-reservation[2], reservation[1], reservation[0]))
+    assignments, unseated = place(floor, waiting, max_combination)
+    for reservation in waiting:
+        if reservation[0] in assignments:
+            seated[reservation[0]] = (reservation[1], reservation[2], [table.id for table in assignments[reservation[0]]])
+
+    for reservation in unseated:
+        if reservation[0] not in changed_ids:
+            continue
+        moves = relocate(tables, duration, seated, reservation, max_combination)
+        if moves is None:
+            if room_can_fit(tables, duration, seated, reservation):
+                return False
+            continue
+        for reservation_id, found in moves.items():
+            if reservation_id not in assignments:
+                TableAssignment.objects.filter(reservation_id=reservation_id).delete()
+            assignments[reservation_id] = found
+            slot_time, party_size = seated[reservation_id][:2] if reservation_id in seated else reservation[1:]
+            seated[reservation_id] = (slot_time, party_size, [table.id for table in found])
+    save_assignments(day, service, assignments)
+    return True
+
+
+def reseat(reservation_ids):
+    """
+    Replanification incrémentale après le changement de quelques réservations
+    (statut, date, heure ou taille du groupe), appelée sur le chemin de la requête.
+
+    - Seuls les services touchés sont verrouillés (`lock_service`, dans l'ordre pour
+      éviter les interblocages) ; les tables des réservations modifiées sont libérées
+    - Les réservations acceptées sans table du service sont placées dans les
+      trous existants, les autres groupes ne bougent pas
+    - Si une réservation modifiée ne trouve pas de place ainsi, le recalcul complet
+      du service (`solve`, jusqu'à SEATING_TIME_BUDGET) est confié au worker
+      (`process_replans`) au lieu d'être fait pendant la requête
+
+    Retourne la liste des services [(date, service), ...] mis en attente de recalcul complet.
+    """
+    changed_ids = set(reservation_ids)
+    services = get_services()
+    with transaction.atomic():
+        touched = set(TableAssignment.objects.filter(reservation_id__in=changed_ids).values_list('date', 'service'))
+        for day, slot_time in Reservation.objects.filter(pk__in=changed_ids, status='accepted').values_list('date', 'time'):
+            service = service_for_time(slot_time, services)
+            if service is not None:
+                touched.add((day, service))
+        touched = sorted((day, service) for day, service in touched if service in services)
+
+        plans = {(day, service): lock_service(day, service) for day, service in touched}
+        TableAssignment.objects.filter(reservation_id__in=changed_ids).delete()
+        tables = active_tables()
+        queued = []
+        for day, service in touched:
+            if not fill_service(day, service, tables, services, changed_ids):
+                request_replan(plans[(day, service)], changed_ids)
+                queued.append((day, service))
+    return queued
+
+
+def service_plan(day, service):
+    """Plan de salle d'un service : tables avec leurs réservations, et réservations sans table."""
+    services = get_services()
+    reservations = {
+        row['id']: row
+        for row in Reservation.objects.filter(date=day, time__in=services[service]['slots'], status='accepted')
+        .order_by('time', 'id')
+        .values('id', 'name', 'time', 'party_size')
+    }
+    by_table = defaultdict(list)
+    for reservation_id, table_id in TableAssignment.objects.filter(date=day, service=service).values_list('reservation_id', 'table_id'):
+        if reservation_id in reservations:
+            by_table[table_id].append(reservation_id)
+
+    seated = {reservation_id for reservation_ids in by_table.values() for reservation_id in reservation_ids}
+    tables = []
+    for table in Table.objects.filter(is_active=True).order_by('name'):
+        tables.append({
+            'id': table.id,
+            'name': table.name,
+            'capacity': table.capacity,
+            'reservations': [format_reservation(reservations[pk]) for pk in sorted(by_table[table.id], key=lambda pk: reservations[pk]['time'])],
+        })
+    unseated = [format_reservation(row) for pk, row in reservations.items() if pk not in seated]
+    covers = sum(row['party_size'] for row in reservations.values())
+    return {
+        'date': day.isoformat(),
+        'service': service,
+        # Recalcul complet en attente du worker : le plan affiché peut encore changer
+        'replan_pending': SeatingPlan.objects.filter(date=day, service=service, replan_requested_at__isnull=False).exists(),
+        'covers': covers,
+        'seated_covers': covers - sum(row['party_size'] for row in unseated),
+        'tables': tables,
+        'unseated': unseated,
+    }
+
+
+def format_reservation(row):
+    return {'id': row['id'], 'name': row['name'], 'time': row['time'].strftime('%H:%M'), 'party_size': row['party_size']}
@@ -1,17 +1,124 @@
 # backoffice/serializers.py
 
 from rest_framework import serializers
-from .models import Reservation, ExceptionalSchedule
-from datetime import date
+from .models import Reservation, ExceptionalSchedule, Table, WaitlistEntry
+from .filters import RESERVATION_FILTERS
+from .opening_calendar import REGULAR_CLOSED_WEEKDAYS
+from django.conf import settings
+from datetime import date, time
+from functools import cached_property
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
 
-class ReservationSerializer(serializers.ModelSerializer):
+from backoffice.metrics import timed_serialization
+
+
+class TimedSerializerMixin:
+    """Compte le temps de sérialisation et de validation dans les métriques de la requête."""
+
+    def to_representation(self, instance):
+        return timed_serialization(super().to_representation, instance)
+
+    def run_validation(self, data=empty):
+        return timed_serialization(super().run_validation, data)
+
+
+class ReservationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Reservation
         fields = ['id', 'name', 'date', 'time', 'party_size', 'status', 'created_at']
         read_only_fields = ['created_at']
 
 
-class ExceptionalScheduleSerializer(serializers.ModelSerializer):
+class ReservationImportSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Ligne d'import en masse de réservations (aucune requête en base à la validation)."""
+
+    class Meta:
+        model = Reservation
+        fields = ['name', 'email', 'phone', 'date', 'time', 'party_size', 'status']
+        extra_kwargs = {'email': {'required': True}}
+
+    def validate_party_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Le nombre de personnes doit être au moins 1.")
+        return value
+
+
+class BulkStatusSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Changement de statut groupé : une liste d'ids ou un filtre, et le statut cible."""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=1000)
+    filter = serializers.DictField(child=serializers.CharField(), required=False, allow_empty=False)
+    status = serializers.ChoiceField(choices=Reservation.STATUS_CHOICES)
+
+    def validate_filter(self, value):
+        # Une clé inconnue (faute de frappe) serait ignorée et le changement s'appliquerait à tout
+        unknown = set(value) - set(RESERVATION_FILTERS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Filtre(s) inconnu(s) : {', '.join(sorted(unknown))}. Filtres acceptés : {', '.join(RESERVATION_FILTERS)}."
+            )
+        return value
+
+    def validate(self, data):
+        if ('ids' in data) == ('filter' in data):
+            raise serializers.ValidationError({"detail": "Indiquer soit 'ids', soit 'filter'."})
+        return data
+
+
+class BookingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Données saisies par un client pour réserver en ligne."""
+
+    class Meta:
+        model = Reservation
+        fields = ['name', 'email', 'phone', 'date', 'time', 'party_size']
+        extra_kwargs = {'email': {'required': True}}
+
+    def validate_party_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Le nombre de personnes doit être au moins 1.")
+        if value > settings.BOOKING_MAX_PARTY_SIZE:
+            raise serializers.ValidationError(
+                f"Pour plus de {settings.BOOKING_MAX_PARTY_SIZE} personnes, merci de contacter le restaurant."
+            )
+        return value
+
+
+class TableSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Table
+        fields = ['id', 'name', 'capacity', 'combinable', 'is_active']
+
+    def validate_capacity(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Une table doit avoir au moins une place.")
+        return value
+
+
+class WaitlistJoinSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Inscription d'un client sur la liste d'attente d'un créneau (mêmes règles que la réservation en ligne)."""
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ['name', 'email', 'phone', 'date', 'time', 'party_size']
+
+    validate_party_size = BookingSerializer.validate_party_size
+
+
+class WaitlistEntrySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = ['id', 'name', 'email', 'phone', 'date', 'time', 'party_size', 'status', 'reservation', 'created_at', 'promoted_at']
+        read_only_fields = ['reservation', 'created_at', 'promoted_at']
+
+    def validate_status(self, value):
+        if value == 'promoted' and (self.instance is None or self.instance.status != 'promoted'):
+            raise serializers.ValidationError("Une entrée n'est promue que lorsqu'une place se libère.")
+        return value
+
+
+class ExceptionalScheduleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     mode = serializers.CharField(write_only=True, required=True)
 
     class Meta:
@@ -52,24 +159,119 @@ class ExceptionalScheduleSerializer(serializers.ModelSerializer):
         # --- Validation des jours de la semaine ---
         if start_date:
             weekday = start_date.weekday()  # Lundi=0, Dimanche=6
-            if schedule_type == 'open' and weekday not in [0, 6]:
+            if schedule_type == 'open' and weekday not in REGULAR_CLOSED_WEEKDAYS:
                 raise serializers.ValidationError({"start_date": "Une ouverture exceptionnelle doit être un dimanche ou un lundi."})
-            elif schedule_type == 'closed' and weekday in [0, 6]:
+            elif schedule_type == 'closed' and weekday in REGULAR_CLOSED_WEEKDAYS:
                 raise serializers.ValidationError({"start_date": "Une fermeture exceptionnelle doit être un jour de semaine (mardi à samedi)."})
             elif schedule_type not in ['open', 'closed']:
                 raise serializers.ValidationError({"type": "Type invalide. Doit être 'open' ou 'closed'."})
 
         # --- Vérification de chevauchement avec les horaires existants ---
-        instance = self.instance  # Pour exclure l'instance actuelle lors de la mise à jour
-
-        overlapping = ExceptionalSchedule.objects.filter(
-            start_date__lte=end_date_for_check,
-            end_date__gte=start_date
-        ).exclude(pk=instance.pk if instance else None)
+        # Import en masse : index en mémoire fourni par le contexte au lieu d'une requête par ligne
+        # Midi et soir d'un même jour ne se chevauchent pas ; la journée entière chevauche tout
+        moment_for_check = data.get('moment', 'full_day')
+        interval_index = self.context.get('interval_index')
+        if interval_index is not None:
+            overlaps = interval_index.overlaps(start_date, end_date_for_check, moment_for_check)
+        else:
+            instance = self.instance  # Pour exclure l'instance actuelle lors de la mise à jour
+            overlaps = ExceptionalSchedule.objects.overlapping(
+                start_date, end_date_for_check, moment_for_check
+            ).exclude(pk=instance.pk if instance else None).exists()
 
-        if overlapping.exists():
+        if overlaps:
             raise serializers.ValidationError({
                 "detail": "Cette période chevauche une ouverture ou une fermeture exceptionnelle existante."
             })
 
-        return data
\ No newline at end of file
+        return data
+
+# ======================
+# Sérialisation rapide en lecture (listes et détail)
+# ======================
+
+# Champs dont la représentation d'une valeur lue en base est la valeur elle-même
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.ReadOnlyField,
+)
+
+
+class ValuesRepresentation:
+    """
+    Représentation identique à celle d'un ModelSerializer, construite à partir de lignes `.values()`.
+
+    - Pas d'instances de modèle ni de parcours des champs DRF par ligne
+    - Convertisseurs calculés une fois : identité pour les textes / nombres /
+      choix, isoformat pour les dates et heures au format ISO,
+      to_representation du champ DRF sinon (dates-heures, ...)
+    - Champs pris en charge : attributs simples du modèle (ni source imbriquée,
+      ni SerializerMethodField, ni sérialiseur imbriqué)
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def plan(self):
+        """(colonnes, [(nom, champ DRF)] des colonnes à convertir) ; identité pour les autres."""
+        names, converted = [], []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source != name or isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)):
+                raise ImproperlyConfigured(f"{self.serializer_class.__name__}.{name} : champ non pris en charge par ValuesRepresentation.")
+            names.append(name)
+            if not isinstance(field, IDENTITY_FIELDS):
+                converted.append((name, field))
+        return names, converted
+
+    def get_converters(self):
+        """Convertisseurs de l'appel en cours (le fuseau horaire courant est résolu une seule fois)."""
+        return [(name, self.get_converter(field)) for name, field in self.plan[1]]
+
+    @staticmethod
+    def get_converter(field):
+        output_format = getattr(field, 'format', None)
+        if isinstance(field, serializers.DateTimeField) and (output_format or api_settings.DATETIME_FORMAT).lower() == ISO_8601:
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if field_timezone is not None:
+                # Même résultat que DateTimeField.to_representation pour une valeur lue en base (USE_TZ)
+                def convert(value):
+                    value = value.astimezone(field_timezone).isoformat()
+                    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+                return convert
+        if isinstance(field, serializers.DateField) and (output_format or api_settings.DATE_FORMAT).lower() == ISO_8601:
+            return date.isoformat
+        if isinstance(field, serializers.TimeField) and (output_format or api_settings.TIME_FORMAT).lower() == ISO_8601:
+            return time.isoformat
+        return field.to_representation
+
+    def values(self, queryset):
+        """Queryset de dicts limité aux colonnes sérialisées."""
+        return queryset.values(*self.plan[0])
+
+    def to_representation(self, row):
+        return self.many([row])[0]
+
+    def many(self, rows):
+        return timed_serialization(self.convert_rows, rows)
+
+    def convert_rows(self, rows):
+        converters = self.get_converters()
+        result = []
+        for row in rows:
+            item = row.copy()  # Les lignes d'origine restent intactes (positions de pagination)
+            for name, convert in converters:
+                value = item[name]
+                if value is not None:
+                    item[name] = convert(value)
+            result.append(item)
+        return result
+
+
+RESERVATION_VALUES = ValuesRepresentation(ReservationSerializer)
+SCHEDULE_VALUES = ValuesRepresentation(ExceptionalScheduleSerializer)
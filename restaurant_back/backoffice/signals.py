@@ -0,0 +1,102 @@
+# backoffice/signals.py
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from backoffice.booking import refresh_slots
+from backoffice.models import ExceptionalSchedule, Reservation, Tombstone
+from backoffice.opening_calendar import rebuild_for_schedule
+from backoffice import schedule_cache, seating
+from backoffice.waitlist import schedule_promotion
+from backoffice.authentication import invalidate_user
+
+# Champs d'une réservation qui influent sur l'occupation d'un créneau
+SLOT_FIELDS = ('date', 'time', 'status', 'party_size')
+
+
+@receiver(post_save, sender=ExceptionalSchedule)
+def refresh_opening_calendar(sender, instance, **kwargs):
+    """Met à jour le calendrier d'ouverture pour le seul horaire enregistré.
+
+    La suppression est gérée par le CASCADE de OpeningCalendarDay.schedule.
+    """
+    rebuild_for_schedule(instance)
+
+
+@receiver(post_save, sender=ExceptionalSchedule)
+@receiver(post_delete, sender=ExceptionalSchedule)
+def invalidate_schedule_cache(sender, **kwargs):
+    """Invalide le cache des horaires une fois la modification validée en base."""
+    transaction.on_commit(schedule_cache.invalidate)
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_previous_slot(sender, instance, **kwargs):
+    """Mémorise l'état en base avant modification pour recalculer l'ancien créneau."""
+    instance._previous_slot_state = None
+    if instance.pk and not getattr(instance, '_skip_slot_refresh', False):
+        instance._previous_slot_state = (
+            Reservation.objects.filter(pk=instance.pk).values_list(*SLOT_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=Reservation)
+def refresh_slot_occupancy(sender, instance, created, **kwargs):
+    """Recalcule le compteur des créneaux touchés par une création ou une modification."""
+    if getattr(instance, '_skip_slot_refresh', False):
+        return
+    current = tuple(getattr(instance, field) for field in SLOT_FIELDS)
+    previous = getattr(instance, '_previous_slot_state', None)
+    if not created and previous == current:
+        return
+    slots = {(instance.date, instance.time)}
+    if previous:
+        slots.add(previous[:2])
+    # Couverts libérés (refus, groupe réduit, changement de créneau) : liste d'attente
+    schedule_promotion(refresh_slots(slots))
+
+
+@receiver(post_save, sender=Reservation)
+def reseat_reservation(sender, instance, created, **kwargs):
+    """
+    Replace la réservation dans le plan de salle si elle y entre, en sort ou y change
+    (après validation en base, et sans recalculer tout le service si possible).
+    """
+    previous = getattr(instance, '_previous_slot_state', None)
+    was_accepted = previous is not None and previous[2] == 'accepted'
+    if instance.status != 'accepted' and not was_accepted:
+        return
+    if not created and previous == tuple(getattr(instance, field) for field in SLOT_FIELDS):
+        return
+    transaction.on_commit(lambda: seating.reseat([instance.pk]))
+
+
+@receiver(post_delete, sender=Reservation)
+def release_slot_occupancy(sender, instance, **kwargs):
+    """Libère les couverts d'une réservation supprimée et les propose à la liste d'attente."""
+    schedule_promotion(refresh_slots({(instance.date, instance.time)}))
+
+
+@receiver(post_delete, sender=Reservation)
+@receiver(post_delete, sender=ExceptionalSchedule)
+def record_tombstone(sender, instance, **kwargs):
+    """Garde une trace de la suppression pour les appareils en synchronisation incrémentale."""
+    Tombstone.objects.create(
+        model='reservation' if sender is Reservation else 'schedule',
+        object_id=instance.pk,
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_tokens(sender, instance, update_fields=None, **kwargs):
+    """
+    Oublie les tokens vérifiés de l'utilisateur modifié (mot de passe, droits, désactivation).
+
+    La mise à jour de last_login à la connexion ne change rien aux droits : ignorée.
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
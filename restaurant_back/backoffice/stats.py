@@ -0,0 +1,75 @@
+# backoffice/stats.py
+
+from django.db.models import Case, CharField, Count, Q, Sum, Value, When
+
+from backoffice.availability import get_services
+from backoffice.models import Reservation
+
+STATUSES = [value for value, _ in Reservation.STATUS_CHOICES]
+
+
+def service_expression():
+    """
+    Service d'une réservation calculé en SQL à partir de son heure.
+
+    Une réservation appartient au dernier service dont le premier créneau
+    est antérieur ou égal à son heure (le premier service sinon).
+    """
+    starts = sorted((conf['slots'][0], name) for name, conf in get_services().items())
+    whens = [When(time__gte=start, then=Value(name)) for start, name in reversed(starts[1:])]
+    return Case(*whens, default=Value(starts[0][1]), output_field=CharField())
+
+
+def empty_counters():
+    return {'reservations': 0, 'covers': 0, **{status: 0 for status in STATUSES}}
+
+
+def add_counters(target, row):
+    target['reservations'] += row['reservations']
+    target['covers'] += row['covers'] or 0
+    for status in STATUSES:
+        target[status] += row[status]
+
+
+def acceptance_ratio(counters):
+    decided = counters['accepted'] + counters['rejected']
+    return round(counters['accepted'] / decided, 4) if decided else None
+
+
+def compute_stats(start, end):
+    """
+    Agrégats par jour et par service sur [start, end] en une seule requête GROUP BY (date, service).
+
+    Les totaux par jour et sur la période sont additionnés en Python (au plus
+    un groupe par service et par jour).
+    """
+    rows = (
+        Reservation.objects.filter(date__range=(start, end))
+        .annotate(service=service_expression())
+        .values('date', 'service')
+        .annotate(
+            reservations=Count('id'),
+            covers=Sum('party_size'),
+            **{status: Count('id', filter=Q(status=status)) for status in STATUSES},
+        )
+        .order_by('date', 'service')
+    )
+
+    totals = empty_counters()
+    days = {}
+    for row in rows:
+        day = days.setdefault(row['date'], {**empty_counters(), 'services': {}})
+        service = day['services'].setdefault(row['service'], empty_counters())
+        for counters in (service, day, totals):
+            add_counters(counters, row)
+
+    totals['acceptance_ratio'] = acceptance_ratio(totals)
+    return {
+        'date_from': start.isoformat(),
+        'date_to': end.isoformat(),
+        'totals': totals,
+        'days': [
+            {'date': day.isoformat(), **counters, 'acceptance_ratio': acceptance_ratio(counters)}
+            for day, counters in days.items()
+        ],
+    }
@@ -0,0 +1,145 @@
+# backoffice/streams.py
+
+import asyncio
+import json
+import logging
+import math
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework.exceptions import AuthenticationFailed
+
+from backoffice.authentication import CachedJWTAuthentication
+from backoffice.feeds import InvalidCursor, changes_since, decode_cursor, head_cursor
+from backoffice.serializers import ReservationSerializer
+
+logger = logging.getLogger(__name__)
+
+# Intervalle entre deux commentaires « keep-alive » quand rien ne change
+HEARTBEAT_INTERVAL = 15
+
+# Réservations lues au plus par requête sur le flux
+CHANGE_FEED_LIMIT = 100
+
+
+def authenticate_admin(request):
+    """
+    Authentification JWT du flux : en-tête Authorization ou paramètre ?access_token=
+    (EventSource ne permet pas d'envoyer d'en-tête). Retourne l'utilisateur admin ou None.
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get('access_token')
+    if not raw_token:
+        return None
+    try:
+        user, _ = authentication.authenticate_token(raw_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    return user if user.is_active and user.is_staff else None
+
+
+def fetch_changes(cursor):
+    """[(curseur, réservation sérialisée), ...] après `cursor` (au plus CHANGE_FEED_LIMIT)."""
+    reservations, cursors = changes_since(cursor, CHANGE_FEED_LIMIT)
+    return list(zip(cursors, ReservationSerializer(reservations, many=True).data))
+
+
+async def event_stream(cursor):
+    """Événements SSE : une ligne `id:` par réservation pour reprendre via Last-Event-ID."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.CHANGE_FEED_STREAM_DURATION
+    last_event = loop.time()
+
+    yield f"retry: {int(settings.CHANGE_FEED_POLL_INTERVAL * 1000)}\n\n"
+    while loop.time() < deadline:
+        changes = await sync_to_async(fetch_changes)(cursor)
+        for event_id, data in changes:
+            yield f"id: {event_id}\nevent: reservation\ndata: {json.dumps(data)}\n\n"
+        if changes:
+            cursor = changes[-1][0]
+            last_event = loop.time()
+        elif loop.time() - last_event >= HEARTBEAT_INTERVAL:
+            yield ": keep-alive\n\n"
+            last_event = loop.time()
+        await asyncio.sleep(settings.CHANGE_FEED_POLL_INTERVAL)
+
+
+async def reservation_event_stream(request):
+    """
+    Flux Server-Sent Events des réservations créées ou modifiées.
+
+    - Réservé aux administrateurs (JWT)
+    - Reprise à partir de l'en-tête Last-Event-ID ou du paramètre ?cursor=
+    - Nécessite le serveur ASGI : en WSGI, utiliser reservations/changes/ (long-poll)
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'Flux disponible uniquement en ASGI, utiliser /backoffice/api/reservations/changes/.'},
+            status=501,
+        )
+
+    user = await sync_to_async(authenticate_admin)(request)
+    if user is None:
+        return JsonResponse({'detail': "Informations d'authentification non fournies ou invalides."}, status=401)
+
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('cursor')
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    else:
+        cursor = await sync_to_async(head_cursor)()
+
+    logger.info(f"Ouverture du flux des réservations pour l'utilisateur ID {user.id}")
+    response = StreamingHttpResponse(event_stream(cursor), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Pas de mise en tampon par un éventuel proxy nginx
+    return response
+
+
+@require_GET
+async def reservation_changes(request):
+    """
+    Long-poll des réservations créées ou modifiées depuis un curseur (repli du flux SSE).
+
+    - Réservé aux administrateurs (JWT), comme le flux SSE
+    - Sans curseur : renvoie immédiatement le curseur courant
+    - Avec curseur : attend au plus `timeout` secondes (CHANGE_FEED_MAX_WAIT) une modification
+    - Vue async : sous ASGI, l'attente (asyncio.sleep) n'occupe aucun thread ; en WSGI
+      elle bloque le thread du worker, d'où une attente courte
+    """
+    user = await sync_to_async(authenticate_admin)(request)
+    if user is None:
+        return JsonResponse({'detail': "Informations d'authentification non fournies ou invalides."}, status=401)
+
+    cursor = request.GET.get('cursor')
+    if not cursor:
+        return JsonResponse({'cursor': await sync_to_async(head_cursor)(), 'results': []})
+    try:
+        decode_cursor(cursor)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    try:
+        timeout = float(request.GET.get('timeout', settings.CHANGE_FEED_MAX_WAIT))
+    except ValueError:
+        timeout = math.nan
+    if not math.isfinite(timeout):
+        return JsonResponse({'error': 'Timeout invalide.'}, status=400)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(timeout, settings.CHANGE_FEED_MAX_WAIT)
+    while True:
+        changes = await sync_to_async(fetch_changes)(cursor)
+        if changes or loop.time() >= deadline:
+            break
+        await asyncio.sleep(settings.CHANGE_FEED_POLL_INTERVAL)
+
+    return JsonResponse({
+        'cursor': changes[-1][0] if changes else cursor,
+        'results': [data for _, data in changes],
+    })
@@ -0,0 +1,109 @@
+# backoffice/sync.py
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from backoffice.models import ExceptionalSchedule, Reservation, Tombstone
+from backoffice.serializers import ExceptionalScheduleSerializer, ReservationSerializer
+
+# Modèles synchronisés : clé de la réponse -> (queryset, sérialiseur)
+SYNCED_MODELS = {
+    'reservations': (Reservation.objects.all(), ReservationSerializer),
+    'schedules': (ExceptionalSchedule.objects.all(), ExceptionalScheduleSerializer),
+}
+
+
+class InvalidSyncCursor(ValueError):
+    """Curseur de synchronisation illisible."""
+
+
+def encode_sync_cursor(state):
+    raw = json.dumps({
+        'since': state['since'].isoformat() if state['since'] else None,
+        'until': state['until'].isoformat(),
+        'full': state['full'],
+        'positions': {
+            name: [position[0].isoformat(), position[1]] if position else None
+            for name, position in state['positions'].items()
+        },
+    })
+    return urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+
+def decode_sync_cursor(value):
+    try:
+        raw = json.loads(urlsafe_b64decode(value.encode('ascii')).decode('ascii'))
+        return {
+            'since': datetime.fromisoformat(raw['since']) if raw['since'] else None,
+            'until': datetime.fromisoformat(raw['until']),
+            'full': bool(raw['full']),
+            'positions': {
+                name: (datetime.fromisoformat(raw['positions'][name][0]), int(raw['positions'][name][1]))
+                if raw['positions'][name] else None
+                for name in SYNCED_MODELS
+            },
+        }
+    except (TypeError, ValueError, KeyError, IndexError, UnicodeError):
+        raise InvalidSyncCursor("Curseur invalide.")
+
+
+def page_after(queryset, position, limit):
+    """Au plus `limit` lignes après `position` (updated_at, id), dans l'ordre de l'index ; et s'il en reste."""
+    if position is not None:
+        updated_at, pk = position
+        queryset = queryset.filter(Q(updated_at__gte=updated_at) & (Q(updated_at__gt=updated_at) | Q(id__gt=pk)))
+    rows = list(queryset.order_by('updated_at', 'id')[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def build_sync_payload(since=None, cursor=None):
+    """
+    Modifications depuis `since` : réservations et horaires créés ou modifiés,
+    ids supprimés (traces de suppression).
+
+    Synchronisation complète (`full`) si `since` est absent ou plus ancien que
+    la durée de conservation des traces. `server_time` est à renvoyer comme
+    prochain `since` ; il est légèrement en retard sur l'heure réelle pour
+    couvrir les transactions encore en cours, d'où quelques doublons possibles.
+
+    Réponse paginée (SYNC_PAGE_SIZE lignes au plus par modèle) : tant que `next`
+    n'est pas nul, le rappeler avec ?cursor=<next>. Les pages suivantes portent sur
+    les mêmes bornes [since, server_time] ; une ligne modifiée entre-temps arrive
+    à la synchronisation suivante. Les suppressions sont dans la première page.
+
+    Lève InvalidSyncCursor pour un curseur illisible.
+    """
+    if cursor is None:
+        now = timezone.now()
+        state = {
+            'since': since,
+            'until': now - timedelta(seconds=settings.CHANGE_FEED_SETTLE),
+            'full': since is None or since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS),
+            'positions': dict.fromkeys(SYNCED_MODELS),
+        }
+    else:
+        state = decode_sync_cursor(cursor)
+
+    payload = {'server_time': state['until'].isoformat(), 'full': state['full']}
+    has_more = False
+    for name, (queryset, serializer_class) in SYNCED_MODELS.items():
+        queryset = queryset.filter(updated_at__lte=state['until'])
+        if not state['full']:
+            queryset = queryset.filter(updated_at__gte=state['since'])
+        rows, more = page_after(queryset, state['positions'][name], settings.SYNC_PAGE_SIZE)
+        if rows:
+            state['positions'][name] = (rows[-1].updated_at, rows[-1].pk)
+        has_more = has_more or more
+        payload[name] = serializer_class(rows, many=True).data
+
+    deleted = {'reservations': [], 'schedules': []}
+    if cursor is None and not state['full']:
+        for model, object_id in Tombstone.objects.filter(deleted_at__gte=state['since']).values_list('model', 'object_id'):
+            deleted['reservations' if model == 'reservation' else 'schedules'].append(object_id)
+    payload['deleted'] = deleted
+    payload['next'] = encode_sync_cursor(state) if has_more else None
+    return payload
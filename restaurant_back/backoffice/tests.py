@@ -1,3 +1,1156 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import threading
+import uuid
+from importlib import import_module
+from datetime import time, timedelta
+from smtplib import SMTPException
+from unittest import mock, skipUnless
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Sum
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import path
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from backoffice import async_views, importers, schedule_cache, seating
+from backoffice.authentication import CachedJWTAuthentication, token_cache
+from backoffice.availability import ACTIVE_STATUSES, compute_availability, get_services
+from backoffice.export import stream_csv, stream_ndjson
+from backoffice.feeds import changes_since, encode_cursor
+from backoffice.intervals import IntervalIndex
+from backoffice.mail_queue import claim_batch, drain, enqueue_email, send_batch
+from backoffice.models import (
+    CacheVersion, ExceptionalSchedule, IdempotencyKey, OpeningCalendarDay, OutboundEmail, PasswordResetToken, ReminderLog,
+    Reservation, SeatingPlan, SlotOccupancy, Table, TableAssignment, WaitlistEntry,
+)
+from backoffice.booking import refresh_slots
+from backoffice.opening_calendar import get_overrides, is_open
+from backoffice.reminders import queue_reminders
+from backoffice.throttling import BookingRateThrottle, hit, slot_ident
+from backoffice.views import BookingView
+from backoffice.waitlist import promote, schedule_promotion
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """Backend de test : chaque envoi échoue comme un serveur SMTP indisponible."""
+
+    def send_messages(self, email_messages):
+        raise SMTPException("Serveur indisponible")
+
+
+# ======================
+# File d'envoi des e-mails
+# ======================
+
+@override_settings(EMAIL_QUEUE_RETRY_DELAY=60, EMAIL_QUEUE_MAX_ATTEMPTS=3, EMAIL_QUEUE_LEASE=300)
+class MailQueueTests(TestCase):
+
+    def test_enqueue_does_not_send(self):
+        email = enqueue_email("Sujet", "Corps", ["client@example.com"])
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.recipients, ["client@example.com"])
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_batch_marks_sent(self):
+        enqueue_email("Sujet", "Corps", ["client@example.com"], "resto@example.com")
+        self.assertEqual(send_batch(10), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].from_email, "resto@example.com")
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, 'sent')
+        self.assertIsNotNone(email.sent_at)
+
+    def test_claim_batch_leases_rows(self):
+        for i in range(3):
+            enqueue_email("Sujet", "Corps", [f"client{i}@example.com"])
+        claimed = claim_batch(2)
+        self.assertEqual(len(claimed), 2)
+        # Lot réservé : un autre worker ne reçoit que la ligne restante
+        remaining = claim_batch(10)
+        self.assertEqual(len(remaining), 1)
+        self.assertNotIn(remaining[0].pk, [email.pk for email in claimed])
+        self.assertEqual(claim_batch(10), [])
+        leased_until = OutboundEmail.objects.get(pk=claimed[0].pk).next_attempt_at
+        self.assertGreater(leased_until, timezone.now() + timedelta(seconds=250))
+
+    def test_drain_empties_queue(self):
+        for i in range(5):
+            enqueue_email("Sujet", "Corps", [f"client{i}@example.com"])
+        self.assertEqual(drain(2), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+
+    @override_settings(EMAIL_BACKEND='backoffice.tests.FailingEmailBackend')
+    def test_failure_is_retried_with_backoff(self):
+        email = enqueue_email("Sujet", "Corps", ["client@example.com"])
+        before = timezone.now()
+        send_batch(10)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn("Serveur indisponible", email.last_error)
+        self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=60))
+
+        # Deuxième échec : délai doublé
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        before = timezone.now()
+        send_batch(10)
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 2)
+        self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=120))
+        self.assertLess(email.next_attempt_at, before + timedelta(seconds=180))
+
+    @override_settings(EMAIL_BACKEND='backoffice.tests.FailingEmailBackend')
+    def test_failure_gives_up_after_max_attempts(self):
+        email = enqueue_email("Sujet", "Corps", ["client@example.com"])
+        for _ in range(3):
+            OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+            send_batch(10)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 3))
+        # Abandonné : plus jamais réclamé
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_batch(10), 0)
+
+
+# ======================
+# Réservation en ligne
+# ======================
+
+def next_open_day(service):
+    day = timezone.localdate() + timedelta(days=1)
+    while not is_open(day, service):
+        day += timedelta(days=1)
+    return day
+
+
+class AvailabilityTests(TestCase):
+
+    def test_availability_reads_booking_counter(self):
+        """Places annoncées = places réservables, même si des réservations contournent les signaux."""
+        service = get_services()['dinner']
+        slot_time = service['slots'][0]
+        day = next_open_day('dinner')
+        Reservation.objects.bulk_create([
+            Reservation(name='Client', email='client@example.com', date=day, time=slot_time, party_size=4),
+        ])
+        SlotOccupancy.objects.create(date=day, time=slot_time, booked_covers=service['capacity'])
+
+        dinner = next(s for s in compute_availability(day, day)[0]['services'] if s['service'] == 'dinner')
+        self.assertEqual(dinner['slots'][0]['remaining'], 0)
+        with mock.patch.object(BookingView, 'throttle_classes', []):
+            response = APIClient().post('/backoffice/api/bookings/', {
+                'name': 'Client', 'email': 'client@example.com', 'date': day.isoformat(),
+                'time': slot_time.strftime('%H:%M'), 'party_size': 2,
+            }, format='json')
+        self.assertEqual(response.status_code, 409)
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Réservations simultanées du même créneau : jamais au-delà de la capacité."""
+    threads = 30
+    party_size = 2
+
+    def test_parallel_bookings_never_overbook(self):
+        service = get_services()['dinner']
+        slot_time = service['slots'][0]
+        capacity = service['capacity']
+        day = next_open_day('dinner')
+        payload = {
+            'name': 'Client', 'email': 'client@example.com', 'date': day.isoformat(),
+            'time': slot_time.strftime('%H:%M'), 'party_size': self.party_size,
+        }
+        barrier = threading.Barrier(self.threads)
+        results = []
+        lock = threading.Lock()
+
+        def worker():
+            client = APIClient()
+            barrier.wait()
+            try:
+                code = client.post('/backoffice/api/bookings/', payload, format='json').status_code
+            except Exception as e:
+                code = type(e).__name__
+            finally:
+                connection.close()
+            with lock:
+                results.append(code)
+
+        with mock.patch.object(BookingView, 'throttle_classes', []):
+            threads = [threading.Thread(target=worker) for _ in range(self.threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        booked = Reservation.objects.filter(
+            date=day, time=slot_time, status__in=ACTIVE_STATUSES
+        ).aggregate(total=Sum('party_size'))['total']
+        self.assertLessEqual(booked, capacity)
+        self.assertEqual(results.count(201), capacity // self.party_size)
+        self.assertEqual(results.count(409), self.threads - capacity // self.party_size)
+        self.assertEqual(SlotOccupancy.objects.get(date=day, time=slot_time).booked_covers, booked)
+
+
+# ======================
+# Cache des horaires exceptionnels
+# ======================
+
+class ScheduleCacheTests(TestCase):
+
+    def test_version_bump_from_another_process_invalidates_local_cache(self):
+        day = next_open_day('dinner')
+        self.assertTrue(schedule_cache.is_open(day, 'dinner'))
+
+        # Fermeture enregistrée sans invalidation dans ce processus (on_commit non exécuté)
+        ExceptionalSchedule.objects.create(type='closed', start_date=day, moment='dinner')
+        self.assertTrue(schedule_cache.is_open(day, 'dinner'))
+
+        # Version changée en base par un autre processus : cache local de ce processus ignoré
+        CacheVersion.objects.filter(name=schedule_cache.VERSION_NAME).update(etag=uuid.uuid4().hex)
+        self.assertFalse(schedule_cache.is_open(day, 'dinner'))
+
+    def test_invalidate_on_commit(self):
+        day = next_open_day('dinner')
+        self.assertTrue(schedule_cache.is_open(day, 'dinner'))
+        with self.captureOnCommitCallbacks(execute=True):
+            ExceptionalSchedule.objects.create(type='closed', start_date=day, moment='full_day')
+        self.assertFalse(schedule_cache.is_open(day, 'dinner'))
+
+
+# ======================
+# Export des réservations
+# ======================
+
+class ExportTests(TestCase):
+
+    def test_csv_and_ndjson_write_same_values(self):
+        reservation = Reservation.objects.create(
+            name='Client', email='client@example.com', date=timezone.localdate(), time=time(19, 30), party_size=2,
+        )
+        queryset = Reservation.objects.all()
+        csv_row = next(csv.DictReader(io.StringIO(''.join(stream_csv(queryset)))))
+        ndjson_row = json.loads(''.join(stream_ndjson(queryset)))
+        self.assertEqual(csv_row['created_at'], reservation.created_at.isoformat())
+        self.assertEqual(ndjson_row['created_at'], reservation.created_at.isoformat())
+        self.assertEqual({field: str(value) for field, value in ndjson_row.items() if value is not None},
+                         {field: value for field, value in csv_row.items() if value})
+
+    async def test_asgi_export_is_streamed_asynchronously(self):
+        admin = await get_user_model().objects.acreate(username='admin', email='admin@example.com', is_staff=True)
+        await Reservation.objects.acreate(
+            name='Client', email='client@example.com', date=timezone.localdate(), time=time(19, 30), party_size=2,
+        )
+        response = await AsyncClient().get(
+            '/backoffice/api/reservations/export/?format=ndjson', headers={'Authorization': f'Bearer {AccessToken.for_user(admin)}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        # Itérateur async : pas de lecture complète par sync_to_async(list) avant l'envoi
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(json.loads(content)['name'], 'Client')
+
+
+# ======================
+# Import en masse
+# ======================
+
+class ImportSchedulesTests(TestCase):
+
+    def test_rolled_back_batch_does_not_block_later_rows(self):
+        day = next_open_day('dinner')  # Fermeture exceptionnelle : jour habituellement ouvert
+        rows = [
+            {'type': 'closed', 'start_date': day.isoformat()},
+            {'type': 'closed', 'start_date': day.isoformat()},
+        ]
+        real_save = importers.save_in_bulk
+        calls = []
+
+        def fail_first_batch(model, instances):
+            calls.append(len(instances))
+            if len(calls) == 1:
+                raise IntegrityError("chevauchement concurrent")
+            return real_save(model, instances)
+
+        with mock.patch.object(importers, 'save_in_bulk', side_effect=fail_first_batch):
+            report = importers.import_schedules(rows, batch_size=1)
+
+        self.assertEqual([error['row'] for error in report.errors], [1])
+        self.assertEqual(ExceptionalSchedule.objects.filter(start_date=day).count(), 1)
+
+
+# ======================
+# Liste des réservations
+# ======================
+
+class ReservationListTests(TestCase):
+
+    def setUp(self):
+        admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+        today = timezone.localdate()
+        self.reservations = [
+            Reservation.objects.create(
+                name=f'Client {number}', email='client@example.com', date=today + timedelta(days=day_offset),
+                time=slot_time, party_size=party_size, status=reservation_status,
+            )
+            for number, (day_offset, slot_time, party_size, reservation_status) in enumerate([
+                (-1, time(19, 0), 2, 'accepted'),
+                (0, time(19, 0), 4, 'accepted'),
+                (0, time(19, 0), 2, 'pending'),
+                (0, time(12, 0), 6, 'rejected'),
+                (1, time(20, 0), 3, 'accepted'),
+            ])
+        ]
+
+    def list_ids(self, **params):
+        response = self.api.get('/backoffice/api/reservations/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_cursor_walks_every_row_once_in_order(self):
+        expected = [reservation.pk for reservation in sorted(self.reservations, key=lambda r: (r.date, r.time, r.pk))]
+        pages = []
+        response = self.api.get('/backoffice/api/reservations/', {'page_size': 2})
+        while True:
+            pages.append([row['id'] for row in response.data['results']])
+            if not response.data['next']:
+                break
+            response = self.api.get(response.data['next'])
+        self.assertEqual(pages, [expected[0:2], expected[2:4], expected[4:]])
+        # Retour en arrière depuis la dernière page
+        previous = self.api.get(response.data['previous'])
+        self.assertEqual([row['id'] for row in previous.data['results']], expected[2:4])
+
+    def test_invalid_cursor(self):
+        response = self.api.get('/backoffice/api/reservations/', {'cursor': 'nimportequoi'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_filters(self):
+        today = timezone.localdate()
+        upcoming_accepted = self.list_ids(status='accepted', date_from=today.isoformat())
+        self.assertEqual(upcoming_accepted, [self.reservations[1].pk, self.reservations[4].pk])
+        self.assertEqual(self.list_ids(date=today.isoformat(), status='pending,rejected'), [self.reservations[3].pk, self.reservations[2].pk])
+        self.assertEqual(self.list_ids(party_size_min=3, party_size_max=4), [self.reservations[1].pk, self.reservations[4].pk])
+        self.assertEqual(self.list_ids(date_to=(today - timedelta(days=1)).isoformat()), [self.reservations[0].pk])
+
+    def test_invalid_filters(self):
+        for params in (
+            {'date': '13/06/2025'},
+            {'date_from': '2025-06-13', 'date_to': '2025-06-12'},
+            {'status': 'unknown'},
+            {'party_size_min': '0'},
+        ):
+            self.assertEqual(self.api.get('/backoffice/api/reservations/', params).status_code, 400, params)
+
+
+# ======================
+# Flux des réservations modifiées
+# ======================
+
+@override_settings(CHANGE_FEED_SETTLE=0, CHANGE_FEED_POLL_INTERVAL=0.01)
+class ChangeFeedTests(TestCase):
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.admin)}'}
+
+    def create_reservation(self, name):
+        return Reservation.objects.create(
+            name=name, email='client@example.com', date=next_open_day('dinner'), time=time(19, 0), party_size=2,
+        )
+
+    async def changes(self, **params):
+        return await AsyncClient().get('/backoffice/api/reservations/changes/', params, headers=self.headers)
+
+    async def test_cursor_returns_each_change_once(self):
+        head = (await self.changes()).json()
+        self.assertEqual(head['results'], [])
+        first = await sync_to_async(self.create_reservation)('Premier')
+        second = await sync_to_async(self.create_reservation)('Second')
+
+        body = (await self.changes(cursor=head['cursor'], timeout=0)).json()
+        self.assertEqual([row['id'] for row in body['results']], [first.pk, second.pk])
+        # Rien de nouveau : même curseur après l'attente
+        again = (await self.changes(cursor=body['cursor'], timeout=0.05)).json()
+        self.assertEqual((again['results'], again['cursor']), ([], body['cursor']))
+
+    @override_settings(CHANGE_FEED_SETTLE=60)
+    def test_recent_rows_wait_for_settle_window(self):
+        cursor = encode_cursor(timezone.now() - timedelta(days=1), 0)
+        reservation = self.create_reservation('Client')
+        self.assertEqual(changes_since(cursor)[0], [])
+        Reservation.objects.filter(pk=reservation.pk).update(updated_at=timezone.now() - timedelta(seconds=61))
+        self.assertEqual([row.pk for row in changes_since(cursor)[0]], [reservation.pk])
+
+    async def test_invalid_parameters(self):
+        cursor = encode_cursor(timezone.now(), 0)
+        self.assertEqual((await self.changes(cursor='nimportequoi')).status_code, 400)
+        for timeout in ('abc', 'nan', 'inf'):
+            self.assertEqual((await self.changes(cursor=cursor, timeout=timeout)).status_code, 400)
+
+    async def test_feeds_require_admin_token(self):
+        client = AsyncClient()
+        customer = await get_user_model().objects.acreate(username='client', email='client@example.com', is_staff=False)
+        for url in ('/backoffice/api/reservations/changes/', '/backoffice/api/reservations/stream/'):
+            self.assertEqual((await client.get(url)).status_code, 401)
+            self.assertEqual((await client.get(url, {'access_token': 'invalide'})).status_code, 401)
+            self.assertEqual((await client.get(url, {'access_token': str(AccessToken.for_user(customer))})).status_code, 401)
+
+    async def test_stream_accepts_query_token(self):
+        response = await AsyncClient().get(
+            '/backoffice/api/reservations/stream/', {'access_token': str(AccessToken.for_user(self.admin))},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = aiter(response.streaming_content)
+        self.assertTrue((await anext(content)).startswith(b'retry:'))
+        await content.aclose()
+        bad_cursor = await AsyncClient().get(
+            '/backoffice/api/reservations/stream/', {'cursor': 'nimportequoi'}, headers=self.headers,
+        )
+        self.assertEqual(bad_cursor.status_code, 400)
+
+
+# ======================
+# Statistiques
+# ======================
+
+class StatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+        services = get_services()
+        lunch, dinner = services['lunch']['slots'][0], services['dinner']['slots'][0]
+        self.day = timezone.localdate() + timedelta(days=1)
+        Reservation.objects.bulk_create([
+            Reservation(name='Client', email='client@example.com', date=day, time=slot_time, party_size=party_size, status=reservation_status)
+            for day, slot_time, party_size, reservation_status in [
+                (self.day, lunch, 2, 'accepted'),
+                (self.day, lunch, 4, 'rejected'),
+                (self.day, dinner, 3, 'pending'),
+                (self.day + timedelta(days=1), dinner, 5, 'pending'),
+                (self.day + timedelta(days=2), dinner, 6, 'accepted'),  # Hors période
+            ]
+        ])
+
+    def stats(self, **params):
+        response = self.api.get('/backoffice/api/stats/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_aggregates_by_day_service_and_status(self):
+        stats = self.stats(date_from=self.day.isoformat(), date_to=(self.day + timedelta(days=1)).isoformat())
+        self.assertEqual(stats['totals'], {
+            'reservations': 4, 'covers': 14, 'pending': 2, 'accepted': 1, 'rejected': 1, 'acceptance_ratio': 0.5,
+        })
+        first, second = stats['days']
+        self.assertEqual((first['date'], first['reservations'], first['covers']), (self.day.isoformat(), 3, 9))
+        self.assertEqual(first['services']['lunch'], {'reservations': 2, 'covers': 6, 'pending': 0, 'accepted': 1, 'rejected': 1})
+        self.assertEqual(first['services']['dinner']['pending'], 1)
+        # Aucune décision ce jour-là : pas de taux d'acceptation
+        self.assertEqual((second['covers'], second['acceptance_ratio']), (5, None))
+
+    def test_empty_period(self):
+        stats = self.stats(date_from=(self.day - timedelta(days=10)).isoformat(), date_to=(self.day - timedelta(days=5)).isoformat())
+        self.assertEqual((stats['days'], stats['totals']['reservations'], stats['totals']['acceptance_ratio']), ([], 0, None))
+
+    def test_invalid_periods(self):
+        for params in (
+            {'date_from': 'demain'},
+            {'date_from': self.day.isoformat(), 'date_to': (self.day - timedelta(days=1)).isoformat()},
+            {'date_from': self.day.isoformat(), 'date_to': (self.day + timedelta(days=400)).isoformat()},
+        ):
+            self.assertEqual(self.api.get('/backoffice/api/stats/', params).status_code, 400, params)
+
+
+# ======================
+# Synchronisation incrémentale
+# ======================
+
+@override_settings(CHANGE_FEED_SETTLE=0)
+class SyncTests(TestCase):
+
+    def setUp(self):
+        admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+
+    def create_reservation(self, name='Client'):
+        return Reservation.objects.create(
+            name=name, email='client@example.com', date=next_open_day('dinner'), time=time(19, 0), party_size=2,
+        )
+
+    def sync(self, **params):
+        response = self.api.get('/backoffice/api/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_incremental_sync_since_previous_server_time(self):
+        kept = self.create_reservation('Inchangé')
+        deleted = self.create_reservation('Supprimé')
+        first = self.sync()
+        self.assertTrue(first['full'])
+        self.assertEqual({row['id'] for row in first['reservations']}, {kept.pk, deleted.pk})
+
+        added = self.create_reservation('Nouveau')
+        deleted_id = deleted.pk
+        deleted.delete()
+        second = self.sync(since=first['server_time'])
+        self.assertFalse(second['full'])
+        self.assertEqual([row['id'] for row in second['reservations']], [added.pk])
+        self.assertEqual(second['deleted'], {'reservations': [deleted_id], 'schedules': []})
+
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_full_sync_is_paged(self):
+        reservations = [self.create_reservation(f'Client {number}') for number in range(5)]
+        ExceptionalSchedule.objects.create(type='closed', start_date=next_open_day('dinner'), moment='full_day')
+        pages = [self.sync()]
+        while pages[-1]['next']:
+            pages.append(self.sync(cursor=pages[-1]['next']))
+        self.assertEqual(len(pages), 3)
+        self.assertEqual([row['id'] for page in pages for row in page['reservations']], [r.pk for r in reservations])
+        self.assertEqual(sum(len(page['schedules']) for page in pages), 1)
+        self.assertEqual({page['server_time'] for page in pages}, {pages[0]['server_time']})
+
+    def test_malformed_parameters(self):
+        for params in ({'since': 'hier'}, {'since': '2025-13-45T00:00:00'}, {'cursor': 'nimportequoi'}):
+            self.assertEqual(self.api.get('/backoffice/api/sync/', params).status_code, 400, params)
+
+
+# ======================
+# Changement de statut groupé
+# ======================
+
+class BulkStatusTests(TestCase):
+
+    def setUp(self):
+        admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+        self.day = next_open_day('dinner')
+        self.reservations = [
+            Reservation.objects.create(
+                name=f'Client {number}', email='client@example.com', date=self.day + timedelta(days=number),
+                time=time(19, 0), party_size=2,
+            )
+            for number in range(2)
+        ]
+
+    def post(self, payload):
+        return self.api.post('/backoffice/api/reservations/bulk-status/', payload, format='json')
+
+    def test_unknown_filter_key_is_rejected(self):
+        response = self.post({'filter': {'typo': '1'}, 'status': 'rejected'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('filter', response.data)
+        self.assertFalse(Reservation.objects.filter(status='rejected').exists())
+
+    def test_filter_requires_a_criterion(self):
+        for payload in ({'filter': {}, 'status': 'rejected'}, {'filter': {'status': ','}, 'status': 'rejected'}, {'status': 'rejected'}):
+            self.assertEqual(self.post(payload).status_code, 400)
+        self.assertFalse(Reservation.objects.filter(status='rejected').exists())
+
+    def test_filter_and_ids(self):
+        response = self.post({'filter': {'date': self.day.isoformat()}, 'status': 'accepted'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{'id': self.reservations[0].pk, 'result': 'updated'}])
+        response = self.post({'ids': [self.reservations[0].pk, self.reservations[1].pk, 999999], 'status': 'accepted'})
+        self.assertEqual([result['result'] for result in response.data['results']], ['unchanged', 'updated', 'not_found'])
+
+
+# ======================
+# Horaires exceptionnels
+# ======================
+
+class OpeningCalendarTests(TestCase):
+
+    def setUp(self):
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday())  # Habituellement fermé
+        self.tuesday = self.monday + timedelta(days=1)
+
+    def save(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ExceptionalSchedule.objects.create(**fields)
+
+    def opening(self, start, end=None):
+        """{(date, service): ouvert} renvoyé par l'endpoint public des disponibilités."""
+        response = self.client.get('/backoffice/api/availability/', {'start': start.isoformat(), 'end': (end or start).isoformat()})
+        self.assertEqual(response.status_code, 200)
+        return {(day['date'], service['service']): service['open'] for day in response.json()['days'] for service in day['services']}
+
+    def test_regular_week_without_exceptions(self):
+        opening = self.opening(self.monday, self.tuesday)
+        self.assertFalse(opening[(self.monday.isoformat(), 'lunch')])
+        self.assertTrue(opening[(self.tuesday.isoformat(), 'dinner')])
+
+    def test_per_moment_exceptions_override_weekly_rule(self):
+        self.save(type='open', start_date=self.monday, moment='lunch')
+        self.save(type='closed', start_date=self.tuesday, moment='dinner')
+        self.assertEqual(self.opening(self.monday, self.tuesday), {
+            (self.monday.isoformat(), 'lunch'): True,
+            (self.monday.isoformat(), 'dinner'): False,
+            (self.tuesday.isoformat(), 'lunch'): True,
+            (self.tuesday.isoformat(), 'dinner'): False,
+        })
+
+    def test_range_is_followed_on_update_and_delete(self):
+        wednesday = self.tuesday + timedelta(days=1)
+        schedule = self.save(type='closed', start_date=self.tuesday, end_date=wednesday, moment='full_day')
+        self.assertFalse(any(self.opening(self.tuesday, wednesday).values()))
+
+        schedule.start_date = wednesday
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.save()
+        opening = self.opening(self.tuesday, wednesday)
+        self.assertTrue(opening[(self.tuesday.isoformat(), 'lunch')])
+        self.assertFalse(opening[(wednesday.isoformat(), 'dinner')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.delete()
+        self.assertTrue(all(self.opening(self.tuesday, wednesday).values()))
+
+    def test_rebuild_command_restores_calendar(self):
+        self.save(type='open', start_date=self.monday, moment='dinner')
+        self.save(type='closed', start_date=self.tuesday, moment='lunch')
+        expected = get_overrides(self.monday, self.tuesday)
+        OpeningCalendarDay.objects.all().delete()
+        call_command('rebuild_opening_calendar', stdout=io.StringIO())
+        self.assertEqual(get_overrides(self.monday, self.tuesday), expected)
+        self.assertEqual(len(expected), 2)
+
+
+class ScheduleOverlapTests(TestCase):
+
+    def setUp(self):
+        admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+        self.day = next_open_day('dinner')
+
+    def create(self, moment, **extra):
+        payload = {'type': 'closed', 'mode': 'single', 'start_date': self.day.isoformat(), 'moment': moment, **extra}
+        return self.api.post('/backoffice/api/schedules/', payload, format='json')
+
+    def test_lunch_and_dinner_coexist(self):
+        self.assertEqual(self.create('lunch').status_code, 201)
+        self.assertEqual(self.create('dinner').status_code, 201)
+        self.assertEqual(self.create('lunch').status_code, 400)
+        self.assertEqual(self.create('full_day').status_code, 400)
+        self.assertFalse(is_open(self.day, 'lunch'))
+        self.assertFalse(is_open(self.day, 'dinner'))
+
+    def test_full_day_and_range_conflict_with_any_moment(self):
+        self.assertEqual(self.create('full_day').status_code, 201)
+        self.assertEqual(self.create('dinner').status_code, 400)
+        response = self.create('lunch', mode='range', start_date=(self.day - timedelta(days=1)).isoformat(), end_date=self.day.isoformat())
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_uses_moments(self):
+        rows = [
+            {'type': 'closed', 'start_date': self.day.isoformat(), 'moment': 'lunch'},
+            {'type': 'closed', 'start_date': self.day.isoformat(), 'moment': 'dinner'},
+            {'type': 'closed', 'start_date': self.day.isoformat()},
+        ]
+        report = importers.import_schedules(rows)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([error['row'] for error in report.errors], [3])
+
+    def test_migration_keeps_newest_schedule_without_aborting(self):
+        """Chevauchements hérités : moments masqués retirés des anciens horaires, calendrier inchangé."""
+        resolve_overlaps = import_module('backoffice.migrations.0008_exceptionalschedule_overlap').resolve_overlaps
+        start, end = self.day, self.day + timedelta(days=4)
+        middle = self.day + timedelta(days=2)
+        ExceptionalSchedule.objects.create(type='closed', start_date=start, end_date=end, moment='full_day')
+        ExceptionalSchedule.objects.create(type='closed', start_date=middle, moment='full_day')
+        ExceptionalSchedule.objects.create(type='closed', start_date=start, moment='full_day')
+        ExceptionalSchedule.objects.create(type='open', start_date=start, moment='lunch')
+        before = get_overrides(start, end)
+
+        # Modèles historiques (sans signaux), à l'état actuel du schéma de test
+        historical_apps = MigrationExecutor(connection).loader.project_state().apps
+        resolve_overlaps(historical_apps, None)
+
+        self.assertEqual(get_overrides(start, end), before)
+        spans = sorted(ExceptionalSchedule.objects.values_list('start_date', 'end_date', 'moment'))
+        self.assertEqual(spans, [
+            (start, None, 'dinner'),
+            (start, None, 'lunch'),
+            (start + timedelta(days=1), None, 'full_day'),
+            (middle, None, 'full_day'),
+            (middle + timedelta(days=1), end, 'full_day'),
+        ])
+        for schedule in ExceptionalSchedule.objects.all():
+            self.assertFalse(
+                ExceptionalSchedule.objects.overlapping(schedule.start_date, schedule.end_date or schedule.start_date, schedule.moment)
+                .exclude(pk=schedule.pk).exists()
+            )
+
+    @skipUnless(connection.vendor == 'postgresql', "Contrainte d'exclusion PostgreSQL")
+    def test_database_constraint_follows_moments(self):
+        ExceptionalSchedule.objects.create(type='closed', start_date=self.day, moment='lunch')
+        ExceptionalSchedule.objects.create(type='closed', start_date=self.day, moment='dinner')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ExceptionalSchedule.objects.create(type='closed', start_date=self.day, moment='full_day')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ExceptionalSchedule.objects.create(type='closed', start_date=self.day, end_date=self.day + timedelta(days=1), moment='dinner')
+
+
+# ======================
+# Authentification JWT
+# ======================
+
+class TokenCacheTests(TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.raw_token = str(AccessToken.for_user(self.admin))
+
+    def authenticate(self):
+        user, _ = CachedJWTAuthentication().authenticate_token(self.raw_token.encode())
+        return user
+
+    def test_cached_token_skips_user_lookup(self):
+        self.authenticate()
+        # Époque seule, même sans le cache Django (propre à chaque processus)
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate().pk, self.admin.pk)
+
+    def assert_invalidated(self, change):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            change(self.admin)
+        return self.authenticate()
+
+    def test_demotion_is_seen_at_once(self):
+        def demote(user):
+            user.is_staff = False
+            user.save()
+        self.assertFalse(self.assert_invalidated(demote).is_staff)
+
+    def test_deactivation_rejects_token(self):
+        def deactivate(user):
+            user.is_active = False
+            user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.assert_invalidated(deactivate)
+
+    def test_password_change_invalidates_entry(self):
+        def change_password(user):
+            user.set_password('nouveau')
+            user.save()
+        user = self.assert_invalidated(change_password)
+        self.assertTrue(user.check_password('nouveau'))
+
+    def test_last_login_update_keeps_entry(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.last_login = timezone.now()
+            self.admin.save(update_fields=['last_login'])
+        with self.assertNumQueries(1):
+            self.authenticate()
+
+
+# ======================
+# Métriques
+# ======================
+
+class MetricsEndpointTests(TestCase):
+
+    @override_settings(METRICS_ENABLED=True, METRICS_TOKEN='')
+    def test_hidden_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+    @override_settings(METRICS_ENABLED=True, METRICS_TOKEN='secret')
+    def test_requires_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+
+# ======================
+# Détail des réservations et horaires
+# ======================
+
+class ValuesRetrieveTests(TestCase):
+
+    def setUp(self):
+        admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+
+    def test_malformed_pk_is_404(self):
+        for url in ('/backoffice/api/reservations/abc/', '/backoffice/api/schedules/abc/'):
+            self.assertEqual(self.api.get(url).status_code, 404, url)
+
+    def test_retrieve_reservation(self):
+        reservation = Reservation.objects.create(
+            name='Client', email='client@example.com', date=timezone.localdate(), time=time(19, 30), party_size=2,
+        )
+        response = self.api.get(f'/backoffice/api/reservations/{reservation.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], reservation.pk)
+        self.assertEqual(self.api.get(f'/backoffice/api/reservations/{reservation.pk + 1}/').status_code, 404)
+
+
+# ======================
+# Plan de salle
+# ======================
+
+class SeatingTests(TestCase):
+
+    def setUp(self):
+        Table.objects.bulk_create([Table(name='T1', capacity=2), Table(name='T2', capacity=4)])
+        self.day = next_open_day('dinner')
+        self.slot_time = get_services()['dinner']['slots'][0]
+
+    def accept(self, party_size):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Reservation.objects.create(
+                name='Client', email='client@example.com', date=self.day, time=self.slot_time,
+                party_size=party_size, status='accepted',
+            )
+
+    def test_accepted_reservation_is_seated_on_best_fit_table(self):
+        reservation = self.accept(3)
+        self.assertEqual(list(TableAssignment.objects.filter(reservation=reservation).values_list('table__name', flat=True)), ['T2'])
+        self.assertFalse(seating.service_plan(self.day, 'dinner')['replan_pending'])
+
+    def test_full_replan_is_left_to_the_worker(self):
+        with mock.patch.object(seating, 'fill_service', return_value=False), \
+                mock.patch.object(seating, 'replan', wraps=seating.replan) as replan:
+            reservation = self.accept(2)
+            replan.assert_not_called()
+            plan = SeatingPlan.objects.get(date=self.day, service='dinner')
+            self.assertIsNotNone(plan.replan_requested_at)
+            self.assertEqual(plan.pending_ids, [reservation.pk])
+            self.assertTrue(seating.service_plan(self.day, 'dinner')['replan_pending'])
+
+            self.assertEqual(seating.process_replans(), 1)
+            replan.assert_called_once()
+        plan.refresh_from_db()
+        self.assertIsNone(plan.replan_requested_at)
+        self.assertTrue(TableAssignment.objects.filter(reservation=reservation).exists())
+        self.assertEqual(seating.process_replans(), 0)
+
+    def test_interval_index_merges_overlapping_inserts(self):
+        index = IntervalIndex()
+        index.add(10, 100)
+        index.add(20, 30)  # Contenu dans le précédent
+        index.add(95, 120)
+        self.assertEqual((index.starts, index.ends), ([10], [120]))
+        self.assertTrue(index.overlaps(105, 110))
+        self.assertFalse(index.overlaps(121, 130))
+
+    def test_overlapping_existing_assignments_do_not_free_the_table(self):
+        """Attributions existantes qui se recouvrent (durée de table allongée) : la table reste occupée."""
+        slots = get_services()['dinner']['slots']
+        tables = {table.name: table for table in Table.objects.all()}
+        existing = Reservation.objects.bulk_create([
+            Reservation(name='Client', email='client@example.com', date=self.day, time=slot_time, party_size=2, status='accepted')
+            for slot_time in slots[:2]
+        ])
+        TableAssignment.objects.bulk_create([
+            TableAssignment(reservation=reservation, table=tables['T1'], date=self.day, service='dinner') for reservation in existing
+        ])
+        floor = seating.Floor(list(tables.values()), get_services()['dinner']['table_duration'])
+        floor.occupy([tables['T1'].id], slots[1])
+        floor.occupy([tables['T1'].id], slots[0])
+        self.assertEqual(floor.find(2, slots[2], 1), [tables['T2']])
+
+        self.slot_time = slots[2]
+        reservation = self.accept(2)
+        self.assertEqual(list(TableAssignment.objects.filter(reservation=reservation).values_list('table__name', flat=True)), ['T2'])
+
+
+# ======================
+# Liste d'attente
+# ======================
+
+class WaitlistPromotionTests(TestCase):
+
+    def setUp(self):
+        self.day = next_open_day('dinner')
+        self.slot_time = get_services()['dinner']['slots'][0]
+        self.capacity = get_services()['dinner']['capacity']
+        self.reservation = Reservation.objects.create(
+            name='Groupe', email='groupe@example.com', date=self.day, time=self.slot_time, party_size=self.capacity,
+        )
+        self.entries = {
+            size: WaitlistEntry.objects.create(
+                name=f'Client {size}', email=f'client{size}@example.com', date=self.day, time=self.slot_time, party_size=size,
+            )
+            for size in (6, 3, 2)
+        }
+
+    def test_full_slot_promotes_nobody(self):
+        self.assertEqual(promote(self.day, self.slot_time), [])
+
+    def test_freed_covers_promote_largest_fitting_party(self):
+        self.reservation.party_size = self.capacity - 4
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reservation.save()
+
+        statuses = {size: WaitlistEntry.objects.get(pk=entry.pk).status for size, entry in self.entries.items()}
+        self.assertEqual(statuses, {6: 'waiting', 3: 'promoted', 2: 'waiting'})  # 1 place restante : personne d'autre
+        promoted = WaitlistEntry.objects.get(pk=self.entries[3].pk)
+        self.assertEqual((promoted.reservation.status, promoted.reservation.party_size), ('pending', 3))
+        self.assertEqual(SlotOccupancy.objects.get(date=self.day, time=self.slot_time).booked_covers, self.capacity - 1)
+        self.assertTrue(OutboundEmail.objects.filter(recipients=['client3@example.com']).exists())
+
+    def test_rejection_promotes_in_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Reservation.objects.filter(pk=self.reservation.pk).update(status='rejected')
+            schedule_promotion(refresh_slots({(self.day, self.slot_time)}))
+        self.assertFalse(WaitlistEntry.objects.filter(status='waiting').exists())
+        self.assertEqual(SlotOccupancy.objects.get(date=self.day, time=self.slot_time).booked_covers, 11)
+
+# ======================
+# Clés d'idempotence
+# ======================
+
+class IdempotencyTests(TestCase):
+
+    def setUp(self):
+        admin = get_user_model().objects.create_user(username='admin', email='admin@example.com', password='x', is_staff=True)
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+        self.payload = {
+            'name': 'Client', 'date': next_open_day('dinner').isoformat(), 'time': '19:00', 'party_size': 2,
+        }
+
+    def test_retry_replays_first_response(self):
+        first = self.api.post('/backoffice/api/reservations/', self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        second = self.api.post('/backoffice/api/reservations/', self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual((first.status_code, second.status_code), (201, 201))
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_key_reused_for_other_body_is_rejected(self):
+        self.api.post('/backoffice/api/reservations/', self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        response = self.api.post(
+            '/backoffice/api/reservations/', {**self.payload, 'party_size': 4}, format='json', HTTP_IDEMPOTENCY_KEY='abc',
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_expired_key_runs_again(self):
+        self.api.post('/backoffice/api/reservations/', self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.api.post('/backoffice/api/reservations/', self.payload, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_without_header_nothing_is_stored(self):
+        self.api.post('/backoffice/api/reservations/', self.payload, format='json')
+        self.api.post('/backoffice/api/reservations/', self.payload, format='json')
+        self.assertEqual(Reservation.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+# ======================
+# Limitation des requêtes
+# ======================
+
+@override_settings(SHARED_THROTTLE_RATES={'booking_ip': '2/min', 'booking_email': '1/min', 'booking_slot': '3/min'})
+class ThrottleTests(TestCase):
+
+    def setUp(self):
+        self.day = next_open_day('dinner').isoformat()
+
+    def allow(self, email, ip='10.0.0.1', time_value='19:00'):
+        request = RequestFactory().post('/', REMOTE_ADDR=ip)
+        return BookingRateThrottle().allow(request, {'email': email, 'date': self.day, 'time': time_value})
+
+    def test_limit_reached_then_sliding_window(self):
+        self.assertTrue(hit('key', 2, 60, now=0))
+        self.assertTrue(hit('key', 2, 60, now=1))
+        self.assertFalse(hit('key', 2, 60, now=2))
+        # Début de la fenêtre suivante : la précédente compte encore presque entièrement
+        self.assertFalse(hit('key', 2, 60, now=61))
+        self.assertTrue(hit('key', 2, 60, now=90))
+
+    def test_slot_ident_parsed_like_serializer(self):
+        idents = {slot_ident({'date': self.day, 'time': value}) for value in ('19:00', '19:00:00', '19:0')}
+        self.assertEqual(idents, {f'{self.day}T19:00'})
+        self.assertIsNone(slot_ident({'date': self.day, 'time': '03:00'}))
+        self.assertIsNone(slot_ident({'date': 'demain', 'time': '19:00'}))
+
+    def test_rejected_client_does_not_count_on_slot(self):
+        self.assertTrue(self.allow('a@example.com'))
+        # Refusé sur l'email : ni l'IP ni le créneau ne sont comptés
+        for _ in range(5):
+            self.assertFalse(self.allow('a@example.com'))
+        self.assertTrue(self.allow('b@example.com', ip='10.0.0.2'))
+
+    def test_slot_ceiling_across_clients(self):
+        for number in range(3):
+            self.assertTrue(self.allow(f'{number}@example.com', ip=f'10.0.1.{number}', time_value='19:00:00'))
+        self.assertFalse(self.allow('other@example.com', ip='10.0.2.1'))
+        # Autre créneau : plafond distinct
+        self.assertTrue(self.allow('next@example.com', ip='10.0.2.2', time_value='20:00'))
+
+
+# ======================
+# Rappels
+# ======================
+
+class ReminderTests(TestCase):
+
+    def setUp(self):
+        self.day = next_open_day('dinner')
+        self.reservation = Reservation.objects.create(
+            name='Client', email='client@example.com', date=self.day, time=time(19, 0), party_size=2, status='accepted',
+        )
+
+    def test_second_run_queues_nothing(self):
+        self.assertEqual(queue_reminders(self.day), 1)
+        self.assertEqual(queue_reminders(self.day), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.recipients, ['client@example.com'])
+        self.assertEqual(ReminderLog.objects.get().email, email)
+
+    def test_moved_reservation_gets_new_reminder(self):
+        queue_reminders(self.day)
+        Reservation.objects.filter(pk=self.reservation.pk).update(time=time(20, 0))
+        self.assertEqual(queue_reminders(self.day), 1)
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_time_range_and_status_filter(self):
+        Reservation.objects.create(
+            name='Refusé', email='refuse@example.com', date=self.day, time=time(19, 0), party_size=2, status='rejected',
+        )
+        self.assertEqual(queue_reminders(self.day, start=time(20, 0)), 0)
+        self.assertEqual(queue_reminders(self.day, start=time(19, 0), end=time(20, 0)), 1)
+
+
+# ======================
+# Tokens de réinitialisation du mot de passe
+# ======================
+
+class PasswordResetTokenTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='client', email='client@example.com', password='x')
+        self.valid = PasswordResetToken.objects.create(user=self.user, token='valide')
+        self.expired = PasswordResetToken.objects.create(user=self.user, token='expire')
+        PasswordResetToken.objects.filter(pk=self.expired.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_expires_at_set_on_create(self):
+        self.assertAlmostEqual(
+            self.valid.expires_at, self.valid.created_at + timedelta(seconds=3600), delta=timedelta(seconds=5),
+        )
+
+    def test_confirm_page_rejects_expired_token(self):
+        response = self.client.get(f'/reset-password/{self.user.id}/expire/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(f'/reset-password/{self.user.id}/valide/').status_code, 200)
+        # Token d'un autre utilisateur : refusé aussi
+        self.assertEqual(self.client.get(f'/reset-password/{self.user.id + 1}/valide/').status_code, 404)
+
+    def test_purge_deletes_only_expired_tokens(self):
+        out = io.StringIO()
+        call_command('purge_expired', 'password_reset_tokens', stdout=out)
+        self.assertEqual(list(PasswordResetToken.objects.values_list('token', flat=True)), ['valide'])
+        self.assertIn('password_reset_tokens : 1 ligne(s) supprimée(s)', out.getvalue())
+
+
+# ======================
+# Vues async (serveur ASGI)
+# ======================
+
+# Vues async routées directement : en test, ASYNC_VIEWS est faux et `select_view` retient les vues DRF
+urlpatterns = [
+    path('api/password-reset/', async_views.password_reset_request),
+    path('api/password-reset/<int:user_id>/<str:token>/', async_views.password_reset_confirm),
+]
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    SHARED_THROTTLE_RATES={'password_reset_ip': '3/min', 'password_reset_email': '2/min'},
+)
+class AsyncPasswordResetTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='client', email='client@example.com', password='ancien')
+        self.async_client = AsyncClient()
+
+    def post(self, url, data, **kwargs):
+        return self.async_client.post(url, json.dumps(data), content_type='application/json', **kwargs)
+
+    async def test_request_creates_token_and_queues_email(self):
+        response = await self.post('/api/password-reset/', {'email': 'client@example.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(await PasswordResetToken.objects.filter(user=self.user).acount(), 1)
+        email = await OutboundEmail.objects.aget()
+        self.assertEqual(email.recipients, ['client@example.com'])
+
+    async def test_request_unknown_email_same_answer(self):
+        response = await self.post('/api/password-reset/', {'email': 'inconnu@example.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(await PasswordResetToken.objects.aexists())
+
+    async def test_request_bad_body(self):
+        response = await self.async_client.post('/api/password-reset/', '{pas du json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': 'JSON invalide.'})
+        response = await self.post('/api/password-reset/', ['client@example.com'])
+        self.assertEqual(response.status_code, 400)
+        response = await self.post('/api/password-reset/', {})
+        self.assertEqual(response.json(), {'error': 'Email requis'})
+        self.assertEqual((await self.async_client.get('/api/password-reset/')).status_code, 405)
+
+    async def test_request_throttled_by_email_then_ip(self):
+        for _ in range(2):
+            self.assertEqual((await self.post('/api/password-reset/', {'email': 'client@example.com'})).status_code, 200)
+        response = await self.post('/api/password-reset/', {'email': 'client@example.com'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+        # Limite par email atteinte : la demande refusée ne compte pas sur l'IP
+        self.assertEqual((await self.post('/api/password-reset/', {'email': 'autre@example.com'})).status_code, 200)
+        self.assertEqual((await self.post('/api/password-reset/', {'email': 'encore@example.com'})).status_code, 429)
+        self.assertEqual(await PasswordResetToken.objects.acount(), 2)
+
+    async def test_confirm_updates_password_and_consumes_token(self):
+        await PasswordResetToken.objects.acreate(user=self.user, token='valide')
+        url = f'/api/password-reset/{self.user.id}/valide/'
+        response = await self.post(url, {'new_password': 'nouveau'})
+        self.assertEqual(response.status_code, 200)
+        await self.user.arefresh_from_db()
+        self.assertTrue(await sync_to_async(self.user.check_password)('nouveau'))
+        self.assertFalse(await PasswordResetToken.objects.aexists())
+        # Token déjà utilisé
+        self.assertEqual((await self.post(url, {'new_password': 'encore'})).status_code, 400)
+
+    async def test_confirm_rejects_expired_token_and_bad_body(self):
+        token = await PasswordResetToken.objects.acreate(user=self.user, token='expire')
+        await PasswordResetToken.objects.filter(pk=token.pk).aupdate(expires_at=timezone.now() - timedelta(seconds=1))
+        url = f'/api/password-reset/{self.user.id}/expire/'
+        response = await self.post(url, {'new_password': 'nouveau'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Token invalide ou expiré'})
+        response = await self.async_client.post(url, 'null', content_type='application/json')
+        self.assertEqual(response.json(), {'detail': 'JSON invalide.'})
+        self.assertEqual((await self.post(url, {})).json(), {'error': 'Mot de passe requis'})
+        await self.user.arefresh_from_db()
+        self.assertTrue(await sync_to_async(self.user.check_password)('ancien'))
@@ -0,0 +1,151 @@
+# backoffice/throttling.py
+
+import hashlib
+import math
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.throttling import BaseThrottle
+
+from backoffice.availability import service_for_time
+from backoffice.models import ThrottleCounter
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'20/hour' -> (20, 3600), même format que les taux DRF."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def hit(key, limit, window, now=None):
+    """
+    Compte une requête pour `key` si la limite n'est pas atteinte ; retourne False sinon.
+
+    Fenêtre glissante approchée : requêtes de la fenêtre courante + celles de la
+    fenêtre précédente au prorata du temps qui en reste dans la période glissante.
+    Coût constant : une lecture (fenêtre précédente) et un UPDATE conditionnel
+    (count < reste autorisé), atomique entre workers ; un INSERT à l'ouverture
+    d'une fenêtre, qui supprime aussi les fenêtres périmées de la clé.
+    """
+    now = time.time() if now is None else now
+    window_start = int(now // window) * window
+    elapsed = (now - window_start) / window
+    previous = ThrottleCounter.objects.filter(key=key, window_start=window_start - window).values_list('count', flat=True).first() or 0
+    allowed = limit - math.ceil(previous * (1 - elapsed))
+    if allowed <= 0:
+        return False
+
+    current = ThrottleCounter.objects.filter(key=key, window_start=window_start, count__lt=allowed)
+    if current.update(count=F('count') + 1):
+        return True
+    if ThrottleCounter.objects.filter(key=key, window_start=window_start).exists():
+        return False  # Limite atteinte sur la fenêtre courante
+    try:
+        with transaction.atomic():
+            ThrottleCounter.objects.create(
+                key=key,
+                window_start=window_start,
+                count=1,
+                expires_at=datetime.fromtimestamp(window_start + 2 * window, tz=dt_timezone.utc),
+            )
+    except IntegrityError:
+        # Fenêtre ouverte au même instant par un autre worker
+        return bool(current.update(count=F('count') + 1))
+    ThrottleCounter.objects.filter(key=key, window_start__lt=window_start - window).delete()
+    return True
+
+
+def slot_ident(data):
+    """
+    Créneau demandé « AAAA-MM-JJTHH:MM », lu avec les champs DRF de BookingSerializer :
+    « 19:0 », « 19:00 » et « 19:00:00 » comptent pour le même créneau.
+    None si la date ou l'heure est invalide ou ne correspond à aucun créneau
+    (requête refusée ensuite par la vue, sans créer de compteur).
+    """
+    try:
+        day = serializers.DateField().to_internal_value(data.get('date'))
+        slot_time = serializers.TimeField().to_internal_value(data.get('time'))
+    except serializers.ValidationError:
+        return None
+    if service_for_time(slot_time) is None:
+        return None
+    return f"{day.isoformat()}T{slot_time.strftime('%H:%M')}"
+
+
+def retry_after(window, now=None):
+    """Secondes avant l'ouverture de la fenêtre suivante."""
+    now = time.time() if now is None else now
+    return window - now % window
+
+
+class SharedRateThrottle(BaseThrottle):
+    """
+    Limitation partagée par tous les workers (compteurs ThrottleCounter en base).
+
+    - `scope` : préfixe des taux dans settings.SHARED_THROTTLE_RATES
+    - `keys` : compteurs à vérifier dans l'ordre, parmi ip, email et slot (date + heure du corps).
+      Une requête refusée n'est pas comptée sur les clés suivantes : du plus précis au plus
+      large, un client qui réessaie n'épuise pas le quota de son IP ni celui du créneau
+    - slot est commun à tous les clients : il vient en dernier, n'est compté qu'une fois
+      les limites par client passées, et son taux est un plafond anti-abus élevé, pas une
+      limite par client (la capacité du créneau est garantie par la réservation elle-même)
+    - Une clé sans identifiant (email absent, créneau invalide) ou sans taux n'est pas comptée
+
+    `allow(request, data)` sert aussi aux vues async, hors DRF.
+    """
+    scope = None
+    keys = ('ip',)
+
+    def allow_request(self, request, view):
+        return self.allow(request, request.data)
+
+    def allow(self, request, data):
+        self.wait_seconds = None
+        now = time.time()
+        for kind in self.keys:
+            rate = settings.SHARED_THROTTLE_RATES.get(f'{self.scope}_{kind}')
+            ident = self.get_key_ident(kind, request, data)
+            if not rate or ident is None:
+                continue
+            limit, window = parse_rate(rate)
+            key = hashlib.sha256(f'{self.scope}:{kind}:{ident}'.encode()).hexdigest()
+            if not hit(key, limit, window, now):
+                self.wait_seconds = retry_after(window, now)
+                return False
+        return True
+
+    def get_key_ident(self, kind, request, data):
+        if kind == 'ip':
+            return self.get_ident(request)
+        if kind == 'email':
+            email = data.get('email')
+            return email.strip().lower() if isinstance(email, str) and email.strip() else None
+        if kind == 'slot':
+            return slot_ident(data)
+        raise ValueError(f"Type de clé de limitation inconnu : {kind}")
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class PasswordResetRateThrottle(SharedRateThrottle):
+    """Demandes de réinitialisation du mot de passe : par IP et par email."""
+    scope = 'password_reset'
+    keys = ('email', 'ip')
+
+
+class BookingRateThrottle(SharedRateThrottle):
+    """Réservations publiques : par IP, par email et par créneau."""
+    scope = 'booking'
+    keys = ('email', 'ip', 'slot')
+
+
+class WaitlistRateThrottle(SharedRateThrottle):
+    """Inscriptions publiques en liste d'attente : par IP, par email et par créneau."""
+    scope = 'waitlist'
+    keys = ('email', 'ip', 'slot')
@@ -7,19 +7,54 @@ from .views import (
     ExceptionalScheduleViewSet,
     PasswordResetRequestView,
     PasswordResetConfirmView,
+    AvailabilityView,
+    BookingView,
+    ReservationStatsView,
+    SyncView,
+    ImportView,
+    TableViewSet,
+    SeatingView,
+    WaitlistJoinView,
+    WaitlistEntryViewSet,
 )
+from .streams import reservation_changes, reservation_event_stream
+from . import async_views
+from .async_views import select_view
 
 # Création du routeur pour les ViewSets DRF
 router = DefaultRouter()
 router.register(r'schedules', ExceptionalScheduleViewSet, basename='schedule')
 router.register(r'reservations', ReservationViewSet, basename='reservation')
+router.register(r'tables', TableViewSet, basename='table')
+router.register(r'waitlist-entries', WaitlistEntryViewSet, basename='waitlist-entry')
 
 # Routes supplémentaires
 urlpatterns = [
     # Réinitialisation du mot de passe
-    path('password-reset/', PasswordResetRequestView.as_view(), name='password_reset_request'),
-    path('password-reset/<int:user_id>/<str:token>/', PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
+    path('password-reset/', select_view(PasswordResetRequestView.as_view(), async_views.password_reset_request), name='password_reset_request'),
+    path('password-reset/<int:user_id>/<str:token>/', select_view(PasswordResetConfirmView.as_view(), async_views.password_reset_confirm), name='password_reset_confirm'),
 
-    # Routes via router DRF (schedules, réservations)
+    # Disponibilités publiques
+    path('availability/', AvailabilityView.as_view(), name='availability'),
+    path('bookings/', BookingView.as_view(), name='booking'),
+    path('waitlist/', WaitlistJoinView.as_view(), name='waitlist_join'),
+
+    # Statistiques des réservations (admin)
+    path('stats/', ReservationStatsView.as_view(), name='reservation_stats'),
+
+    # Synchronisation incrémentale (admin)
+    path('sync/', SyncView.as_view(), name='sync'),
+
+    # Import en masse CSV/JSON (admin)
+    path('import/', ImportView.as_view(), name='import'),
+
+    # Plan de salle d'un service (admin)
+    path('seating/', SeatingView.as_view(), name='seating'),
+
+    # Réservations modifiées : flux SSE (ASGI) et long-poll async, avant le routeur qui capterait « stream » comme un id
+    path('reservations/stream/', reservation_event_stream, name='reservation_stream'),
+    path('reservations/changes/', reservation_changes, name='reservation_changes'),
+
+    # Routes via router DRF (schedules, réservations, tables, liste d'attente)
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -3,20 +3,44 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAdminUser, AllowAny
-from rest_framework.throttling import AnonRateThrottle  # Protection anti-spam
-from django.core.mail import send_mail
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404  # Http404 aussi pour un identifiant mal formé
+from rest_framework.parsers import JSONParser, MultiPartParser
 from django.conf import settings
-from django.utils.crypto import get_random_string
 from django.contrib.auth import get_user_model
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotFound, JsonResponse, StreamingHttpResponse
 from django.middleware.csrf import get_token
-from django.db import transaction  # Pour éviter les états inconsistants
+from django.db import IntegrityError, transaction  # Pour éviter les états inconsistants
+from django.shortcuts import render
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from datetime import date, timedelta
 import logging  # <- Import du logger
-
-from backoffice.models import ExceptionalSchedule, PasswordResetToken, Reservation
-from backoffice.serializers import ExceptionalScheduleSerializer, ReservationSerializer
+import time
+
+from backoffice import metrics, schedule_cache, seating
+from backoffice.models import ExceptionalSchedule, PasswordResetToken, Reservation, Table, WaitlistEntry
+from backoffice.serializers import BookingSerializer, BulkStatusSerializer, ExceptionalScheduleSerializer, ReservationSerializer, TableSerializer
+from backoffice.serializers import RESERVATION_VALUES, SCHEDULE_VALUES, WaitlistEntrySerializer, WaitlistJoinSerializer
+from backoffice.filters import filter_reservations, filter_waitlist
+from backoffice.idempotency import idempotent
+from backoffice.pagination import ReservationCursorPagination
+from backoffice.availability import ACTIVE_STATUSES, compute_availability, get_services
+from backoffice.password_reset import consume_token, create_reset_request, valid_tokens
+from backoffice.booking import SlotFull, SlotUnavailable, book, check_slot, refresh_slots
+from backoffice.throttling import BookingRateThrottle, PasswordResetRateThrottle, WaitlistRateThrottle  # Protection anti-spam
+from backoffice.waitlist import promote, schedule_promotion
+from backoffice.stats import compute_stats
+from backoffice.sync import InvalidSyncCursor, build_sync_payload
+from backoffice.export import EXPORT_CONTENT_TYPES, EXPORT_STREAMS, IgnoreClientContentNegotiation, async_stream
+from backoffice.importers import IMPORTERS, load_rows
 
 # Initialisation du logger
 logger = logging.getLogger(__name__)  # <- Logger initialisé
@@ -31,13 +55,14 @@ User = get_user_model()
 class PasswordResetRequestView(APIView):
     """
     Vue permettant de demander une réinitialisation de mot de passe.
-    Envoie un email avec un lien contenant un token unique.
+    Met en file un email avec un lien contenant un token unique
+    (envoyé en arrière-plan par `process_email_queue`).
     
     - Aucune authentification requise
     - Limitation du nombre de requêtes (rate limiting)
     """
     permission_classes = [AllowAny]
-    throttle_classes = [AnonRateThrottle]  # Limite à 5 tentatives/h pour anonymes
+    throttle_classes = [PasswordResetRateThrottle]  # Par IP et par email, commun à tous les workers
 
     def post(self, request):
         email = request.data.get('email')
@@ -58,42 +83,14 @@ class PasswordResetRequestView(APIView):
             logger.warning(f"Aucun utilisateur trouvé pour l'email {email}")
             return Response({'message': 'Si cet email existe, un lien a été envoyé'}, status=status.HTTP_200_OK)
 
-        # 🔐 Génération du token
-        token = get_random_string(60)
-        logger.debug(f"Token généré : {token}")  # <- Log du token généré
-
-        # 🌐 Lien vers ton frontend de réinitialisation
-        protocol = "https" if not settings.DEBUG else "http"
-        domain = settings.DOMAIN_NAME  # Doit être défini dans settings.py
-        reset_link = f"{protocol}://{domain}/reset-password/{user.id}/{token}/"
-        logger.info(f"Lien de réinitialisation généré : {reset_link}")  # <- Log du lien généré
-
-        # 📨 Préparation de l'email
-        subject = "Réinitialisation de votre mot de passe"
-        message = f"""
-Bonjour {user.username},
-
-Vous avez demandé à réinitialiser votre mot de passe. Veuillez cliquer sur le lien suivant pour continuer :
-{reset_link}
-
-Ce lien est valide pendant 1 heure.
-
-L'équipe du restaurant
-        """
-        from_email = settings.DEFAULT_FROM_EMAIL
-        recipient_list = [email]
-
-        # 📧 Envoi de l'email
+        # 🔐 Génération du token et 💾 mise en file atomique de l'email (envoi par le worker)
         try:
-            send_mail(subject, message, from_email, recipient_list, fail_silently=False)
-            logger.info(f"E-mail envoyé à {email} avec le lien : {reset_link}")  # <- Log succès envoi
-            # 💾 Création atomique du token
-            with transaction.atomic():
-                PasswordResetToken.objects.create(user=user, token=token)
-            logger.info(f"Token stocké en base pour l'utilisateur ID {user.id}")  # <- Log stockage token
+            reset_link = create_reset_request(user, email)
+            logger.info(f"Lien de réinitialisation généré : {reset_link}")  # <- Log du lien généré
+            logger.info(f"Token stocké et e-mail mis en file pour l'utilisateur ID {user.id}")  # <- Log mise en file
             return Response({'message': 'Un email vous a été envoyé avec un lien de réinitialisation.'}, status=status.HTTP_200_OK)
         except Exception as e:
-            logger.error(f"Échec de l'envoi de l'email à {email} : {str(e)}", exc_info=True)  # <- Log erreur
+            logger.error(f"Échec de la mise en file de l'email pour {email} : {str(e)}", exc_info=True)  # <- Log erreur
             return Response({'error': 'Une erreur est survenue lors de l\'envoi de l\'email.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -117,21 +114,15 @@ class PasswordResetConfirmView(APIView):
             return Response({'error': 'Mot de passe requis'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # 🔍 Recherche du token en base
-            reset_token = PasswordResetToken.objects.select_related('user').get(token=token, user_id=user_id)
-            if not reset_token.is_valid():
-                logger.warning(f"Token expiré pour l'utilisateur ID {user_id}", extra={'token': token})  # <- Log expiration
-                return Response({'error': 'Le token a expiré ou est invalide'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # ✅ Token valide, mise à jour du mot de passe
-            user = reset_token.user
-            user.set_password(new_password)
-            user.save()
-            reset_token.delete()  # <- Token utilisé, suppression
+            # 🔍 Recherche du token en base (tokens expirés écartés par la requête)
+            reset_token = valid_tokens(user_id, token).get()
+
+            # ✅ Token valide, mise à jour du mot de passe et suppression du token utilisé
+            consume_token(reset_token, new_password)
             logger.info(f"Mot de passe mis à jour pour l'utilisateur ID {user_id}")  # <- Log succès
             return Response({'message': 'Votre mot de passe a été mis à jour.'}, status=status.HTTP_200_OK)
         except PasswordResetToken.DoesNotExist:
-            logger.warning(f"Token introuvable pour l'utilisateur ID {user_id}", extra={'token': token})  # <- Log token introuvable
+            logger.warning(f"Token introuvable ou expiré pour l'utilisateur ID {user_id}", extra={'token': token})  # <- Log token introuvable
             return Response({'error': 'Token invalide ou expiré'}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Erreur lors de la réinitialisation du mot de passe : {str(e)}", exc_info=True)  # <- Log erreur globale
@@ -141,26 +132,489 @@ class PasswordResetConfirmView(APIView):
 # Gestion Backoffice (réservations, horaires exceptionnels)
 # ======================
 
-class ReservationViewSet(ModelViewSet):
+class ValuesRetrieveMixin:
+    """Détail sérialisé depuis une ligne .values() via `values_representation` (sans instance de modèle)."""
+    values_representation = None
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.values_representation.to_representation(self.get_values_row()))
+
+    def get_values_row(self):
+        """Équivalent de get_object() pour une ligne .values() (mêmes recherche, 404 et permissions)."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = self.values_representation.values(self.filter_queryset(self.get_queryset()))
+        row = get_object_or_404(rows, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(self.request, row)
+        return row
+
+
+class ReservationViewSet(ValuesRetrieveMixin, ModelViewSet):
     """
     Vue CRUD pour les réservations.
     
     - Accès uniquement aux administrateurs
+    - Liste paginée par curseur sur (date, time), filtrable par
+      date / date_from / date_to / status / party_size_min / party_size_max
+    - Changement de statut groupé via POST bulk-status/
+    - Flux des modifications : reservations/changes/ (long-poll) et reservations/stream/ (SSE), vues async de streams.py
+    - Export CSV / NDJSON en streaming via GET export/?format=csv|ndjson
+    - Liste et détail sérialisés depuis .values() (même schéma que ReservationSerializer)
+    - Création et PATCH rejouables sans doublon avec l'en-tête Idempotency-Key
     """
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = ReservationCursorPagination
+    values_representation = RESERVATION_VALUES
+    bulk_status_max_rows = 1000
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'export'):
+            queryset = filter_reservations(queryset, self.request.query_params)
+        return queryset
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @idempotent
+    def partial_update(self, request, *args, **kwargs):
+        return super().partial_update(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        rows = self.values_representation.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.values_representation.many(page))
+        return Response(self.values_representation.many(rows))
+
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """
+        Applique un statut à plusieurs réservations en un seul UPDATE.
+
+        Corps : {"ids": [1, 2, ...], "status": "accepted"}
+             ou {"filter": {"date": "2025-06-13", "status": "pending"}, "status": "accepted"}
+        Filtres : ceux de la liste, au moins un ; une clé inconnue est refusée (400).
+        Retourne le résultat par id : updated / unchanged / not_found.
+        """
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target = serializer.validated_data['status']
+        ids = serializer.validated_data.get('ids')
+
+        with transaction.atomic():
+            if ids is not None:
+                queryset = Reservation.objects.filter(pk__in=ids)
+            else:
+                queryset = filter_reservations(Reservation.objects.all(), serializer.validated_data['filter'])
+            rows = list(queryset.select_for_update().order_by('pk').values_list('id', 'date', 'time', 'status')[:self.bulk_status_max_rows + 1])
+            if len(rows) > self.bulk_status_max_rows:
+                return Response({'error': f'Le filtre dépasse {self.bulk_status_max_rows} réservations.'}, status=status.HTTP_400_BAD_REQUEST)
+
+            to_update = [row for row in rows if row[3] != target]
+            if to_update:
+                Reservation.objects.filter(pk__in=[row[0] for row in to_update]).update(status=target, updated_at=timezone.now())  # update() ne gère pas auto_now
+                # Seuls les créneaux dont l'occupation change (ex. refus) sont recalculés,
+                # les couverts libérés sont proposés à la liste d'attente
+                schedule_promotion(refresh_slots({
+                    (row[1], row[2]) for row in to_update
+                    if (row[3] in ACTIVE_STATUSES) != (target in ACTIVE_STATUSES)
+                }))
+                # Plan de salle : seules les réservations qui entrent ou sortent des acceptées
+                reseated = [row[0] for row in to_update if 'accepted' in (row[3], target)]
+                if reseated:
+                    transaction.on_commit(lambda: seating.reseat(reseated))
+
+        updated_ids = {row[0] for row in to_update}
+        found_ids = {row[0] for row in rows}
+        requested_ids = ids if ids is not None else [row[0] for row in rows]
+        results = [
+            {'id': pk, 'result': 'updated' if pk in updated_ids else 'unchanged' if pk in found_ids else 'not_found'}
+            for pk in dict.fromkeys(requested_ids)
+        ]
+        logger.info(f"Changement de statut groupé vers '{target}' : {len(updated_ids)} réservation(s) mise(s) à jour")
+        return Response({'status': target, 'updated': len(updated_ids), 'results': results})
+
+    @action(detail=False, methods=['get'], url_path='export', content_negotiation_class=IgnoreClientContentNegotiation)
+    def export(self, request):
+        """
+        Export des réservations en streaming, avec les mêmes filtres que la liste.
+
+        - format=csv (défaut) ou format=ndjson
+        - Lecture par morceaux (iterator + values_list) : mémoire constante quel que soit le volume,
+          en WSGI comme en ASGI (itérateur async)
+        """
+        export_format = request.query_params.get('format', 'csv')
+        if export_format not in EXPORT_STREAMS:
+            return Response({'error': "Format invalide. Doit être 'csv' ou 'ndjson'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        logger.info(f"Export {export_format} des réservations demandé", extra={'user_id': request.user.id})
+        stream = EXPORT_STREAMS[export_format](queryset)
+        if isinstance(request._request, ASGIRequest):
+            # Sous ASGI, un itérateur synchrone serait lu en entier (sync_to_async(list)) avant l'envoi
+            stream = async_stream(stream)
+        response = StreamingHttpResponse(stream, content_type=EXPORT_CONTENT_TYPES[export_format])
+        filename = f"reservations_{timezone.localdate().isoformat()}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ReservationStatsView(APIView):
+    """
+    Statistiques des réservations par jour et par service, calculées en SQL.
+
+    - Accès uniquement aux administrateurs
+    - Paramètres : date_from (défaut aujourd'hui), date_to (défaut date_from + 30 jours)
+    - Résultat mis en cache quelques secondes (STATS_CACHE_TIMEOUT)
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            date_from = date.fromisoformat(request.query_params['date_from']) if request.query_params.get('date_from') else timezone.localdate()
+            date_to = date.fromisoformat(request.query_params['date_to']) if request.query_params.get('date_to') else date_from + timedelta(days=30)
+        except ValueError:
+            return Response({'error': 'Date invalide, format attendu : AAAA-MM-JJ.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if date_to < date_from:
+            return Response({'error': 'La date de fin ne peut pas être antérieure à la date de début.'}, status=status.HTTP_400_BAD_REQUEST)
+        if date_to - date_from >= timedelta(days=settings.STATS_MAX_DAYS):
+            return Response({'error': f'La période ne peut pas dépasser {settings.STATS_MAX_DAYS} jours.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        cache_key = f'reservation-stats:{date_from.isoformat()}:{date_to.isoformat()}'
+        stats = cache.get(cache_key)
+        if stats is None:
+            stats = compute_stats(date_from, date_to)
+            cache.set(cache_key, stats, settings.STATS_CACHE_TIMEOUT)
+        return Response(stats)
+
+
+class SyncView(APIView):
+    """
+    Synchronisation incrémentale des tablettes : tout ce qui a changé depuis `since`.
+
+    - Accès uniquement aux administrateurs
+    - Paramètre : since (date-heure ISO 8601, le `server_time` de la synchronisation précédente)
+    - Sans `since`, ou s'il est trop ancien : synchronisation complète
+    - Réponse paginée : pages suivantes via ?cursor=<next> jusqu'à `next` nul
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                return Response(build_sync_payload(cursor=cursor))
+            except InvalidSyncCursor as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                return Response({'error': 'Date invalide, format attendu : ISO 8601.'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        return Response(build_sync_payload(since or None))
+
+
+class ImportView(APIView):
+    """
+    Import en masse de réservations ou d'horaires exceptionnels.
+
+    - Accès uniquement aux administrateurs
+    - Paramètres : kind (reservations | schedules), dry_run (validation seule)
+    - Données : fichier `file` (CSV avec en-tête ou JSON) ou liste `rows` en JSON
+    - Les lignes valides sont importées, les erreurs renvoyées avec leur numéro de ligne
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [JSONParser, MultiPartParser]
+
+    def post(self, request):
+        kind = request.data.get('kind')
+        if kind not in IMPORTERS:
+            return Response({'error': f"Type d'import invalide. Doit être parmi : {', '.join(IMPORTERS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
 
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                file_format = request.data.get('format') or ('json' if upload.name.lower().endswith('.json') else 'csv')
+                rows = load_rows(upload.read().decode('utf-8-sig'), file_format)
+            else:
+                rows = request.data.get('rows')
+                if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                    return Response({'error': "Fournir un fichier `file` ou une liste `rows`."}, status=status.HTTP_400_BAD_REQUEST)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({'error': f"Fichier illisible : {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(rows) > settings.IMPORT_MAX_ROWS:
+            return Response({'error': f"Import limité à {settings.IMPORT_MAX_ROWS} lignes par requête."}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = IMPORTERS[kind](rows, dry_run=dry_run)
+        logger.info(f"📥 Import {kind} par l'utilisateur ID {request.user.id} : {report.created} ligne(s), {len(report.errors)} erreur(s)")
+        return Response(report.as_dict(), status=status.HTTP_200_OK if dry_run or report.errors else status.HTTP_201_CREATED)
 
-class ExceptionalScheduleViewSet(ModelViewSet):
+
+class ExceptionalScheduleViewSet(ValuesRetrieveMixin, ModelViewSet):
     """
     Vue CRUD pour les horaires exceptionnels.
     
     - Accès uniquement aux administrateurs
+    - Liste servie depuis le cache, avec ETag / Last-Modified (réponses 304)
+    - Liste et détail sérialisés depuis .values() (même schéma que ExceptionalScheduleSerializer)
     """
     queryset = ExceptionalSchedule.objects.all()
     serializer_class = ExceptionalScheduleSerializer
     permission_classes = [IsAdminUser]
+    values_representation = SCHEDULE_VALUES
+
+    def list(self, request, *args, **kwargs):
+        version = schedule_cache.get_version()
+        etag = f'"{version["etag"]}"'
+        headers = {
+            'ETag': etag,
+            'Last-Modified': http_date(version['last_modified']),
+            'Cache-Control': 'private, no-cache',
+        }
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=version['last_modified'])
+        if not_modified is not None:
+            for name, value in headers.items():
+                not_modified[name] = value
+            return not_modified
+
+        data = schedule_cache.cached('list', lambda: self.values_representation.many(self.values_representation.values(self.get_queryset())))
+        return Response(data, headers=headers)
+
+    def perform_create(self, serializer):
+        self.save_without_overlap(serializer)
+
+    def perform_update(self, serializer):
+        self.save_without_overlap(serializer)
+
+    def save_without_overlap(self, serializer):
+        """
+        Enregistre l'horaire ; un chevauchement passé entre la validation et
+        l'écriture (requêtes concurrentes) est rejeté par la contrainte d'exclusion.
+        """
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            logger.warning("Chevauchement d'horaires rejeté par la base de données")
+            raise ValidationError({
+                "detail": "Cette période chevauche une ouverture ou une fermeture exceptionnelle existante."
+            })
+
+
+# ======================
+# Tables et plan de salle
+# ======================
+
+class TableViewSet(ModelViewSet):
+    """
+    Vue CRUD pour les tables de la salle.
+
+    - Accès uniquement aux administrateurs
+    - Modifier les tables ne recalcule pas les plans existants : POST seating/ pour un service
+    """
+    queryset = Table.objects.all()
+    serializer_class = TableSerializer
+    permission_classes = [IsAdminUser]
+
+
+class SeatingView(APIView):
+    """
+    Plan de salle d'un service : réservations acceptées attribuées aux tables.
+
+    - Accès uniquement aux administrateurs
+    - GET ?date=AAAA-MM-JJ&service=dinner : plan courant (tenu à jour à chaque changement de réservation,
+      `replan_pending` tant qu'un recalcul complet attend le worker `process_seating_queue`)
+    - POST {"date": ..., "service": ...} : recalcul complet du service
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return self.respond(request.query_params, replan=False)
+
+    def post(self, request):
+        return self.respond(request.data, replan=True)
+
+    def respond(self, params, replan):
+        try:
+            day = date.fromisoformat(params.get('date') or '')
+        except (TypeError, ValueError):
+            return Response({'error': 'Date invalide, format attendu : AAAA-MM-JJ.'}, status=status.HTTP_400_BAD_REQUEST)
+        service = params.get('service')
+        if service not in settings.RESTAURANT_SERVICES:
+            return Response({'error': f"Service invalide. Doit être parmi : {', '.join(settings.RESTAURANT_SERVICES)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if replan:
+            start = time.perf_counter()
+            assignments, unseated = seating.plan_service(day, service)
+            logger.info(
+                f"🪑 Plan de salle recalculé pour le {day} ({service}) : {len(assignments)} réservation(s) placée(s), "
+                f"{len(unseated)} sans table, en {(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+        return Response(seating.service_plan(day, service))
+
+
+# ======================
+# Disponibilités et réservation en ligne (public)
+# ======================
+
+class AvailabilityView(APIView):
+    """
+    Vue publique renvoyant les créneaux réservables sur une période.
+
+    - Aucune authentification requise
+    - Paramètres : start (AAAA-MM-JJ, défaut aujourd'hui), end (défaut start)
+    - Capacité par service, couverts réservés et horaires exceptionnels combinés
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        try:
+            start = date.fromisoformat(request.query_params['start']) if request.query_params.get('start') else timezone.localdate()
+            end = date.fromisoformat(request.query_params['end']) if request.query_params.get('end') else start
+        except ValueError:
+            return Response({'error': 'Date invalide, format attendu : AAAA-MM-JJ.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if end < start:
+            return Response({'error': 'La date de fin ne peut pas être antérieure à la date de début.'}, status=status.HTTP_400_BAD_REQUEST)
+        if end - start >= timedelta(days=settings.AVAILABILITY_MAX_DAYS):
+            return Response({'error': f'La période ne peut pas dépasser {settings.AVAILABILITY_MAX_DAYS} jours.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'days': compute_availability(start, end),
+        })
+
+
+class BookingView(APIView):
+    """
+    Vue publique de réservation en ligne.
+
+    - Aucune authentification requise, limitation par IP, par email et par créneau
+    - Réservation créée « en attente », jamais au-delà de la capacité du créneau
+    - Refusée si le service est fermé (horaires habituels ou exceptionnels)
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    throttle_classes = [BookingRateThrottle]
+
+    def post(self, request):
+        serializer = BookingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            reservation = book(**serializer.validated_data)
+        except SlotUnavailable as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except SlotFull as e:
+            logger.info(f"Créneau complet : {serializer.validated_data['date']} {serializer.validated_data['time']}")
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+
+        logger.info(f"Réservation en ligne créée (ID {reservation.id})")
+        return Response(ReservationSerializer(reservation).data, status=status.HTTP_201_CREATED)
+
+
+class WaitlistJoinView(APIView):
+    """
+    Vue publique d'inscription en liste d'attente sur un créneau complet.
+
+    - Aucune authentification requise, limitation par IP, par email et par créneau
+    - Une inscription active par email et par créneau
+    - Si des places sont déjà libres, l'entrée est promue aussitôt (réservation « en attente »)
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    throttle_classes = [WaitlistRateThrottle]
+
+    def post(self, request):
+        serializer = WaitlistJoinSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            check_slot(data['date'], data['time'], get_services())
+        except SlotUnavailable as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                entry = serializer.save()
+        except IntegrityError:
+            return Response({'error': "Vous êtes déjà inscrit sur la liste d'attente de ce créneau."}, status=status.HTTP_409_CONFLICT)
+
+        promote(entry.date, entry.time)
+        entry.refresh_from_db()
+        logger.info(f"Inscription en liste d'attente (ID {entry.id}, {entry.date} {entry.time}) : {entry.status}")
+        return Response(
+            {'id': entry.id, 'status': entry.status, 'date': entry.date, 'time': entry.time, 'party_size': entry.party_size},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class WaitlistEntryViewSet(ModelViewSet):
+    """
+    Vue CRUD pour la liste d'attente.
+
+    - Accès uniquement aux administrateurs
+    - Filtres : date, status
+    - Une entrée remise en attente est aussitôt proposée aux places libres du créneau
+    """
+    queryset = WaitlistEntry.objects.all()
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = filter_waitlist(queryset, self.request.query_params)
+        return queryset
+
+    def perform_create(self, serializer):
+        self.save_entry(serializer)
+
+    def perform_update(self, serializer):
+        self.save_entry(serializer)
+
+    def save_entry(self, serializer):
+        try:
+            with transaction.atomic():
+                entry = serializer.save()
+        except IntegrityError:
+            raise ValidationError({"detail": "Ce client est déjà en attente sur ce créneau."})
+        if entry.status == 'waiting':
+            schedule_promotion({(entry.date, entry.time)})
+
+
+# ======================
+# Métriques de performance (format Prometheus)
+# ======================
+
+def metrics_view(request):
+    """
+    Métriques agrégées de tous les workers, au format texte Prometheus.
+
+    - Protégée par METRICS_TOKEN (Authorization: Bearer ...)
+    - Sans jeton configuré (ou métriques désactivées) : 404, jamais d'accès ouvert par défaut
+    """
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        return HttpResponseNotFound('Not Found', content_type='text/plain')
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not constant_time_compare(request.headers.get('Authorization', ''), expected):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 # ======================
@@ -191,19 +645,19 @@ def get_csrf_token(request):
     csrf_token = get_token(request)
     return JsonResponse({'csrfToken': csrf_token})
 
-from django.shortcuts import render
-from django.http import HttpResponseNotFound
+
+# ======================
+# Page HTML de réinitialisation du mot de passe
+# ======================
 
 def password_reset_confirm_html(request, user_id, token):
     """
     Vue serve-side pour afficher la page de réinitialisation du mot de passe.
     """
     try:
-        reset_token = PasswordResetToken.objects.select_related('user').get(user_id=user_id, token=token)
-        if not reset_token.is_valid():
-            return HttpResponseNotFound("Lien expiré ou invalide.")
+        PasswordResetToken.objects.get(user_id=user_id, token=token, expires_at__gt=timezone.now())
     except PasswordResetToken.DoesNotExist:
-        return HttpResponseNotFound("Lien invalide.")
+        return HttpResponseNotFound("Lien expiré ou invalide.")
 
     return render(request, 'password_reset_confirm.html', {
         'user_id': user_id,
@@ -0,0 +1,104 @@
+# backoffice/waitlist.py
+
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from backoffice.availability import get_services
+from backoffice.booking import SlotFull, SlotUnavailable, check_slot, reserve_covers
+from backoffice.mail_queue import enqueue_email
+from backoffice.models import Reservation, SlotOccupancy, WaitlistEntry
+
+logger = logging.getLogger(__name__)
+
+PROMOTION_SUBJECT = "Une place s'est libérée pour votre réservation"
+
+
+def build_promotion_message(entry):
+    return f"""
+Bonjour {entry.name},
+
+Une place s'est libérée le {entry.date.strftime('%d/%m/%Y')} à {entry.time.strftime('%H:%M')} pour {entry.party_size} personne(s).
+Votre demande de réservation est enregistrée et attend la confirmation du restaurant.
+
+L'équipe du restaurant
+        """
+
+
+def next_entry(day, slot_time, free_covers):
+    """
+    Prochaine entrée à promouvoir : le plus grand groupe qui tient dans les places libres,
+    le plus ancien à taille égale.
+
+    Une seule ligne lue en parcourant l'index (date, time, status, party_size, created_at)
+    à rebours à partir de `free_covers` ; les entrées verrouillées par une promotion
+    concurrente sont sautées (SKIP LOCKED).
+    """
+    return (
+        WaitlistEntry.objects.select_for_update(skip_locked=True)
+        .filter(date=day, time=slot_time, status='waiting', party_size__lte=free_covers)
+        .order_by('-party_size', 'created_at')
+        .first()
+    )
+
+
+def promote(day, slot_time):
+    """
+    Attribue les couverts libres du créneau aux groupes de la liste d'attente.
+
+    - Chaque promotion est une transaction : entrée réclamée par un UPDATE conditionnel
+      (status='waiting'), couverts réservés par `reserve_covers`, réservation « en attente »
+      créée et e-mail mis en file. Deux promotions concurrentes ne peuvent ni promouvoir
+      la même entrée deux fois ni dépasser la capacité.
+    - S'arrête dès qu'aucun groupe ne tient dans les places restantes.
+
+    Retourne les entrées promues.
+    """
+    services = get_services()
+    try:
+        service = check_slot(day, slot_time, services)
+    except SlotUnavailable:
+        return []
+    capacity = services[service]['capacity']
+
+    promoted = []
+    while True:
+        booked = SlotOccupancy.objects.filter(date=day, time=slot_time).values_list('booked_covers', flat=True).first() or 0
+        if booked >= capacity:
+            break
+        try:
+            with transaction.atomic():
+                entry = next_entry(day, slot_time, capacity - booked)
+                if entry is None:
+                    break
+                now = timezone.now()
+                if not WaitlistEntry.objects.filter(pk=entry.pk, status='waiting').update(status='promoted', promoted_at=now):
+                    continue  # Promue entre-temps par un autre worker
+                if not reserve_covers(day, slot_time, entry.party_size, capacity):
+                    raise SlotFull  # Places prises entre-temps : annule la réclamation, nouvel essai
+                reservation = Reservation(
+                    name=entry.name, email=entry.email, phone=entry.phone,
+                    date=day, time=slot_time, party_size=entry.party_size,
+                )
+                reservation._skip_slot_refresh = True  # Compteur déjà incrémenté ci-dessus
+                reservation.save()
+                WaitlistEntry.objects.filter(pk=entry.pk).update(reservation=reservation)
+                enqueue_email(PROMOTION_SUBJECT, build_promotion_message(entry), [entry.email], settings.DEFAULT_FROM_EMAIL)
+        except SlotFull:
+            continue
+        promoted.append(entry)
+        logger.info(f"Liste d'attente : entrée {entry.pk} promue (réservation {reservation.pk}, {day} {slot_time})")
+    return promoted
+
+
+def promote_slots(slots):
+    """Promotion sur chaque créneau {(date, time), ...} dont des couverts se sont libérés."""
+    for day, slot_time in sorted(slots):
+        promote(day, slot_time)
+
+
+def schedule_promotion(slots):
+    """Promotion après validation de la transaction en cours (les couverts libérés sont alors visibles)."""
+    if slots:
+        transaction.on_commit(lambda: promote_slots(slots))
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'restaurant_back.settings')
+# Déploiement ASGI, lu par les réglages avant toute variable d'environnement : pool de connexions
+# à la place des connexions persistantes et vues async (réinitialisation du mot de passe, check-admin, CSRF) par défaut
+os.environ['ASGI_SERVER'] = 'True'
 
 application = get_asgi_application()
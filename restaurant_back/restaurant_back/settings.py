@@ -1,7 +1,9 @@
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 import dj_database_url  # <-- Ajouté pour gérer DATABASE_URL
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,6 +40,7 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    'backoffice.middleware.MetricsMiddleware',  # En premier : mesure toute la chaîne
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,21 +71,75 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'restaurant_back.wsgi.application'
 
+# Servi par asgi.py (gunicorn + UvicornWorker, cf. Procfile) : indiqué par asgi.py lui-même,
+# indépendamment de ASYNC_VIEWS, pour ne pas dépendre de l'environnement du déploiement
+ASGI_SERVER = os.getenv('ASGI_SERVER', 'False') == 'True'
+# Vues async (réinitialisation du mot de passe, check-admin, CSRF) : activées par défaut sous ASGI
+# (ASYNC_VIEWS=False pour garder les vues DRF synchrones) ; en WSGI les vues DRF restent utilisées
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', str(ASGI_SERVER)) == 'True'
+
 # Database
 # On utilise DATABASE_URL si elle existe (ex: Render), sinon on retombe sur les variables locales
+# Connexions persistantes : réutilisées par chaque worker pendant DB_CONN_MAX_AGE secondes
+# (0 = une connexion par requête), vérifiées avant réutilisation si DB_CONN_HEALTH_CHECKS.
+# Désactivées par défaut sous ASGI, vues async ou non (recommandation Django : une connexion
+# perdue par thread sinon) : remplacées par DB_POOL
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 0 if ASGI_SERVER else 60))
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True'
+# Pool de connexions PostgreSQL (Django 5.1+, psycopg 3 `psycopg[binary,pool]` dans requirements.txt) :
+# remplace les connexions persistantes (CONN_MAX_AGE forcé à 0). Activé par défaut sous ASGI,
+# où les connexions persistantes ne sont pas réutilisées d'une requête à l'autre.
+DB_POOL = os.getenv('DB_POOL', str(ASGI_SERVER)) == 'True'
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 2))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 10))  # attente maximale d'une connexion libre
+
 DATABASES = {
-    'default': dj_database_url.config(default=os.getenv('DATABASE_URL')) or {
+    'default': dj_database_url.config(
+        default=os.getenv('DATABASE_URL'),
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    ) or {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
         'OPTIONS': {
             'sslmode': 'require',
         },
     }
 }
+# SQLite (développement) : transactions IMMEDIATE, les écritures concurrentes attendent le verrou
+# au lieu d'échouer ; base de test sur fichier, la base en mémoire partagée entre threads
+# ne supportant pas les écritures parallèles (tests de réservation concurrente)
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {}).setdefault('transaction_mode', 'IMMEDIATE')
+    DATABASES['default']['OPTIONS'].setdefault('timeout', 20)
+    DATABASES['default'].setdefault('TEST', {}).setdefault('NAME', os.path.join(tempfile.gettempdir(), 'backoffice_test.sqlite3'))
+if DB_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+    }
+
+# Cache : mémoire locale par défaut ; pour partager le cache entre les workers gunicorn,
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache et CACHE_LOCATION=<dossier>.
+# Les versions des données en cache sont en base (CacheVersion) : une modification est vue
+# par tous les workers même avec un cache local
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+# Durée de vie des données dérivées des horaires exceptionnels (invalidées à chaque modification, dans tous les processus)
+SCHEDULE_CACHE_TIMEOUT = int(os.getenv('SCHEDULE_CACHE_TIMEOUT', 86400))
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -109,20 +166,39 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'backoffice.authentication.CachedJWTAuthentication',  # JWT avec cache des tokens vérifiés
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
 }
 
+# Limitation des requêtes publiques, partagée par tous les workers (compteurs en base, fenêtre glissante).
+# Clé « <portée>_<type> » : type ip, email ou slot (date + heure demandées). Taux absent = pas de limite.
+# slot est partagé par tous les clients d'un créneau : plafond anti-abus élevé, vérifié après ip et email
+SHARED_THROTTLE_RATES = {
+    'password_reset_ip': os.getenv('ANON_THROTTLE_RATE', '5/hour'),
+    'password_reset_email': os.getenv('PASSWORD_RESET_EMAIL_THROTTLE_RATE', '3/hour'),
+    'booking_ip': os.getenv('BOOKING_THROTTLE_RATE', '20/hour'),
+    'booking_email': os.getenv('BOOKING_EMAIL_THROTTLE_RATE', '5/hour'),
+    'booking_slot': os.getenv('BOOKING_SLOT_THROTTLE_RATE', '300/min'),
+    'waitlist_ip': os.getenv('WAITLIST_THROTTLE_RATE', '10/hour'),
+    'waitlist_email': os.getenv('WAITLIST_EMAIL_THROTTLE_RATE', '5/hour'),
+    'waitlist_slot': os.getenv('WAITLIST_SLOT_THROTTLE_RATE', '300/min'),
+}
+
+# Cache des tokens JWT vérifiés (par processus) : nombre d'entrées et durée de vie maximale (secondes)
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 1024))
+AUTH_TOKEN_CACHE_TTL = int(os.getenv('AUTH_TOKEN_CACHE_TTL', 60))
+
 # CORS Configuration
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:5173").split(",")
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "http://localhost:5173").split(",")
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
@@ -132,6 +208,68 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 SERVER_EMAIL = EMAIL_HOST_USER
 
+# File d'envoi des e-mails (traitée par `python manage.py process_email_queue`)
+EMAIL_QUEUE_BATCH_SIZE = int(os.getenv('EMAIL_QUEUE_BATCH_SIZE', 50))
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv('EMAIL_QUEUE_MAX_ATTEMPTS', 5))
+EMAIL_QUEUE_RETRY_DELAY = int(os.getenv('EMAIL_QUEUE_RETRY_DELAY', 60))  # secondes, doublé à chaque échec
+EMAIL_QUEUE_LEASE = int(os.getenv('EMAIL_QUEUE_LEASE', 300))  # secondes de réservation d'un lot par un worker
+EMAIL_QUEUE_POLL_INTERVAL = int(os.getenv('EMAIL_QUEUE_POLL_INTERVAL', 5))
+
+# Services du restaurant : créneaux proposés et capacité en couverts par créneau
+RESTAURANT_SERVICES = {
+    'lunch': {
+        'slots': os.getenv('LUNCH_SLOTS', '12:00,12:30,13:00,13:30').split(','),
+        'capacity': int(os.getenv('LUNCH_CAPACITY', 40)),
+        # Durée d'occupation d'une table (minutes), pour le plan de salle
+        'table_duration': int(os.getenv('LUNCH_TABLE_DURATION', 90)),
+    },
+    'dinner': {
+        'slots': os.getenv('DINNER_SLOTS', '19:00,19:30,20:00,20:30,21:00').split(','),
+        'capacity': int(os.getenv('DINNER_CAPACITY', 40)),
+        'table_duration': int(os.getenv('DINNER_TABLE_DURATION', 120)),
+    },
+}
+# Plan de salle : temps de calcul accordé au solveur (secondes) et nombre maximal de tables assemblées
+SEATING_TIME_BUDGET = float(os.getenv('SEATING_TIME_BUDGET', 0.5))
+SEATING_MAX_COMBINATION = int(os.getenv('SEATING_MAX_COMBINATION', 3))
+# Recalculs complets du plan de salle faits par `python manage.py process_seating_queue` : attente quand il n'y en a aucun
+SEATING_QUEUE_POLL_INTERVAL = int(os.getenv('SEATING_QUEUE_POLL_INTERVAL', 5))
+# Taille maximale d'un groupe pour la réservation en ligne
+BOOKING_MAX_PARTY_SIZE = int(os.getenv('BOOKING_MAX_PARTY_SIZE', 12))
+# Nombre maximal de jours renvoyés par l'endpoint de disponibilités
+AVAILABILITY_MAX_DAYS = int(os.getenv('AVAILABILITY_MAX_DAYS', 62))
+
+# Statistiques du backoffice : période maximale et durée de cache (secondes)
+STATS_MAX_DAYS = int(os.getenv('STATS_MAX_DAYS', 366))
+STATS_CACHE_TIMEOUT = int(os.getenv('STATS_CACHE_TIMEOUT', 30))
+
+# Flux des réservations modifiées (long-poll et Server-Sent Events)
+CHANGE_FEED_POLL_INTERVAL = float(os.getenv('CHANGE_FEED_POLL_INTERVAL', 1))  # secondes entre deux lectures
+# Attente maximale d'un long-poll (vue async : aucun thread occupé sous ASGI, mais un thread du worker
+# en WSGI), d'où une valeur courte ; les attentes longues passent par le flux SSE (ASGI)
+CHANGE_FEED_MAX_WAIT = int(os.getenv('CHANGE_FEED_MAX_WAIT', 5))
+CHANGE_FEED_STREAM_DURATION = int(os.getenv('CHANGE_FEED_STREAM_DURATION', 300))  # durée d'un flux SSE avant reconnexion
+CHANGE_FEED_SETTLE = float(os.getenv('CHANGE_FEED_SETTLE', 1))  # délai laissé aux transactions en cours
+
+# Synchronisation incrémentale : durée de conservation des traces de suppression
+# et lignes renvoyées au plus par modèle et par page
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+SYNC_PAGE_SIZE = int(os.getenv('SYNC_PAGE_SIZE', 500))
+
+# Clés d'idempotence (en-tête Idempotency-Key) : durée de conservation de la réponse rejouée, en secondes
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 24 * 3600))
+
+# Import en masse : nombre maximal de lignes par requête HTTP (la commande import_data n'est pas limitée)
+IMPORT_MAX_ROWS = int(os.getenv('IMPORT_MAX_ROWS', 20000))
+
+# Métriques (/metrics, format Prometheus)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+# Répertoire partagé par les workers gunicorn (un fichier par processus), à vider au démarrage
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))  # secondes entre deux écritures
+# Jeton attendu dans « Authorization: Bearer ... » ; vide = endpoint désactivé (404)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 # LOGIN REDIRECT
 LOGIN_REDIRECT_URL = '/backoffice/dashboard/'
 
@@ -3,8 +3,10 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from backoffice.views import check_admin, get_csrf_token, PasswordResetRequestView, PasswordResetConfirmView, password_reset_confirm_html
+from backoffice.views import check_admin, get_csrf_token, PasswordResetRequestView, PasswordResetConfirmView, password_reset_confirm_html, metrics_view
 from django.http import JsonResponse
+from backoffice import async_views
+from backoffice.async_views import select_view
 
 # Vue simple pour l'endpoint racine
 def api_root(request):
@@ -29,17 +31,20 @@ urlpatterns = [
     path('backoffice/api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
     # Vérification admin (protégée par IsAdminUser)
-    path('backoffice/api/check-admin/', check_admin, name='check_admin'),
+    path('backoffice/api/check-admin/', select_view(check_admin, async_views.check_admin), name='check_admin'),
 
     # API Backoffice : schedules, réservations, etc.
     path('backoffice/api/', include('backoffice.urls')),
 
-    # Réinitialisation du mot de passe
-    path('api/password-reset/', PasswordResetRequestView.as_view(), name='password_reset_request'),
-    path('backoffice/api/password-reset/<int:user_id>/<str:token>/', PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
+    # Réinitialisation du mot de passe (vues async sous ASGI, cf. ASYNC_VIEWS)
+    path('api/password-reset/', select_view(PasswordResetRequestView.as_view(), async_views.password_reset_request), name='password_reset_request'),
+    path('backoffice/api/password-reset/<int:user_id>/<str:token>/', select_view(PasswordResetConfirmView.as_view(), async_views.password_reset_confirm), name='password_reset_confirm'),
 
     # Récupération CSRF token
-    path('backoffice/api/get-csrf-token/', get_csrf_token, name='get_csrf_token'),
+    path('backoffice/api/get-csrf-token/', select_view(get_csrf_token, async_views.get_csrf_token), name='get_csrf_token'),
     
+    # Métriques de performance (Prometheus)
+    path('metrics', metrics_view, name='metrics'),
+
     path('reset-password/<int:user_id>/<str:token>/', password_reset_confirm_html, name='password_reset_confirm_html'),
 ]
\ No newline at end of file
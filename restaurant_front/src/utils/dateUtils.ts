@@ -0,0 +1,17 @@
+// src/utils/dateUtils.ts
+
+/**
+ * Date locale au format AAAA-MM-JJ attendu par l'API.
+ *
+ * Contrairement à toISOString(), qui donne la date UTC (la veille
+ * après minuit en heure française), la date est celle du navigateur.
+ *
+ * @param date - La date à formater (aujourd'hui par défaut)
+ * @returns La date au format AAAA-MM-JJ
+ */
+export function toLocalDateString(date: Date = new Date()): string {
+  const year = date.getFullYear()
+  const month = String(date.getMonth() + 1).padStart(2, '0')
+  const day = String(date.getDate()).padStart(2, '0')
+  return `${year}-${month}-${day}`
+}